@@ -0,0 +1,301 @@
+"""
+Article Fetcher
+證據強化：並行抓取搜尋結果的原文網頁，以 BeautifulSoup 擷取正文，
+挑出與 claim 最相關的段落取代 DuckDuckGo 的短摘要，供立場分析使用
+
+- 有上限的執行緒池 + 每個 host 的並行上限 + 單一請求逾時
+- 整批抓取有硬性時間預算，慢的網站直接略過，不會拖住整個 claim
+- 正文依標準化 URL 快取，並記錄內容雜湊
+"""
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+from search_backends import tokenize
+from token_budget import estimate_tokens, truncate_to_budget, split_sentences
+from singleflight import SingleFlight
+from evidence_pool import canonicalize_url
+
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))              # 同時抓取的網頁數
+FETCH_PER_HOST = int(os.getenv("FETCH_PER_HOST", "2"))            # 每個 host 同時抓取的上限
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", "4"))            # 單一網頁逾時（秒）
+FETCH_BUDGET = float(os.getenv("FETCH_BUDGET", "6"))              # 整批抓取的時間預算（秒）
+FETCH_MAX_BYTES = 2 * 1024 * 1024
+FETCH_CACHE_MAX_ENTRIES = int(os.getenv("FETCH_CACHE_MAX_ENTRIES", "500"))
+PASSAGE_TOKENS = 300                                             # 交給立場分析的段落長度上限
+
+USER_AGENT = "Mozilla/5.0 (compatible; FakeNewsAgent/1.0)"
+
+_NOISE_TAGS = ["script", "style", "noscript", "nav", "header", "footer", "aside", "form", "iframe", "svg"]
+
+
+def extract_main_text(html):
+    """
+    從 HTML 擷取正文
+    優先使用 <article> / <main>，否則取段落文字最多的區塊
+
+    Args:
+        html: 網頁 HTML
+
+    Returns:
+        正文文字（段落以換行分隔）
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(_NOISE_TAGS):
+        tag.decompose()
+
+    container = soup.find("article") or soup.find("main")
+    if container is None:
+        # 找出直接包含最多段落文字的區塊
+        best, best_len = None, 0
+        for p in soup.find_all("p"):
+            parent = p.parent
+            length = sum(len(c.get_text(strip=True)) for c in parent.find_all("p", recursive=False))
+            if length > best_len:
+                best, best_len = parent, length
+        container = best or soup.body or soup
+
+    paragraphs = [p.get_text(" ", strip=True) for p in container.find_all(["p", "h1", "h2", "h3", "li"])]
+    paragraphs = [p for p in paragraphs if len(p) >= 15]
+    if not paragraphs:
+        return " ".join(container.get_text(" ", strip=True).split())
+    return "\n".join(paragraphs)
+
+
+def select_relevant_passage(text, claim, max_tokens=PASSAGE_TOKENS):
+    """
+    以滑動視窗挑出與 claim 詞彙重疊最多的連續句子
+
+    Args:
+        text: 正文
+        claim: 待驗證的主張
+        max_tokens: 段落 token 上限
+
+    Returns:
+        最相關的段落（找不到重疊時返回開頭段落）
+    """
+    sentences = [s for s in split_sentences(text) if s.strip()]
+    if not sentences:
+        return ""
+
+    claim_tokens = set(tokenize(claim))
+    sentence_hits = [len(claim_tokens & set(tokenize(s))) for s in sentences]
+    sentence_tokens = [estimate_tokens(s) for s in sentences]
+
+    best_start, best_end, best_score = 0, 0, -1
+    end, window_tokens, window_score = 0, 0, 0
+    for start in range(len(sentences)):
+        # 在預算內盡量延伸視窗
+        while end < len(sentences) and window_tokens + sentence_tokens[end] <= max_tokens:
+            window_tokens += sentence_tokens[end]
+            window_score += sentence_hits[end]
+            end += 1
+        if end > start and window_score > best_score:
+            best_start, best_end, best_score = start, end, window_score
+        if end > start:
+            window_tokens -= sentence_tokens[start]
+            window_score -= sentence_hits[start]
+        else:
+            end = start + 1
+
+    if best_end <= best_start:
+        return truncate_to_budget(sentences[0], max_tokens)
+    return "".join(sentences[best_start:best_end]).strip()
+
+
+class ArticleFetcher:
+    """
+    並行網頁抓取器（含正文快取）
+    """
+
+    def __init__(self, workers=FETCH_WORKERS, per_host=FETCH_PER_HOST, timeout=FETCH_TIMEOUT,
+                 max_cache_entries=FETCH_CACHE_MAX_ENTRIES):
+        """
+        Args:
+            workers: 同時抓取的網頁數
+            per_host: 每個 host 同時抓取的上限
+            timeout: 單一網頁逾時（秒）
+            max_cache_entries: 正文快取筆數上限
+        """
+        self.timeout = timeout
+        self.per_host = per_host
+        self.max_cache_entries = max_cache_entries
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="article-fetch")
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=per_host)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._session.headers.update({"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"})
+
+        self._lock = threading.Lock()
+        self._host_limits = {}
+        self._cache = OrderedDict()   # canonical URL -> {"url", "text", "hash"}
+        # 同一篇文章的不同 URL 寫法（追蹤參數、www.）同時抓取時只下載一次
+        self._flight = SingleFlight("article_fetch")
+        self.hits = 0
+        self.misses = 0
+
+    def _host_semaphore(self, host):
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.Semaphore(self.per_host)
+            return self._host_limits[host]
+
+    def _cache_get(self, key):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def _cache_set(self, key, entry):
+        with self._lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cache_entries:
+                self._cache.popitem(last=False)
+
+    def fetch(self, url):
+        """
+        抓取單一網頁並擷取正文（使用快取）
+
+        Args:
+            url: 網頁 URL
+
+        Returns:
+            {"url": 標準化 URL, "text": 正文, "hash": 內容 SHA-256}；失敗則返回 None
+        """
+        key = canonicalize_url(url)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        return self._flight.do(key, self._download, url, key)
+
+    def _download(self, url, key):
+        """下載網頁、擷取正文並寫入快取（fetch 的實際工作）"""
+        host = urlparse(url).netloc.lower()
+        try:
+            with self._host_semaphore(host):
+                with self._session.get(url, timeout=self.timeout, stream=True) as r:
+                    r.raise_for_status()
+                    if "html" not in r.headers.get("Content-Type", "html"):
+                        return None
+                    raw = r.raw.read(FETCH_MAX_BYTES, decode_content=True)
+                    html = raw.decode(r.encoding or r.apparent_encoding or "utf-8", errors="replace")
+        except Exception as e:
+            print(f"     Fetch failed: {url} ({e})")
+            return None
+
+        text = extract_main_text(html)
+        if not text:
+            return None
+        entry = {
+            "url": key,
+            "text": text,
+            "hash": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        }
+        self._cache_set(key, entry)
+        return entry
+
+    def fetch_many(self, urls, budget=FETCH_BUDGET):
+        """
+        並行抓取多個網頁；超過時間預算仍未完成的網頁直接略過
+
+        Args:
+            urls: URL 列表
+            budget: 整批抓取的時間預算（秒）
+
+        Returns:
+            {url: fetch() 結果}（只包含成功且在預算內完成的網頁）
+        """
+        futures = {self._pool.submit(self.fetch, url): url for url in dict.fromkeys(urls) if url}
+        done, not_done = wait(futures, timeout=budget)
+        for future in not_done:
+            future.cancel()
+
+        results = {}
+        for future in done:
+            entry = future.result()
+            if entry:
+                results[futures[future]] = entry
+        return results
+
+    def stats(self):
+        """
+        Returns:
+            {"entries": int, "hits": int, "misses": int}
+        """
+        with self._lock:
+            return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_article_fetcher():
+    """取得程序共用的 ArticleFetcher（第一次呼叫時建立）"""
+    global _fetcher
+    if _fetcher is None:
+        with _fetcher_lock:
+            if _fetcher is None:
+                _fetcher = ArticleFetcher()
+    return _fetcher
+
+
+def enrich_with_article_text(results, claim, budget=FETCH_BUDGET):
+    """
+    抓取搜尋結果的原文，將 body 換成與 claim 最相關的正文段落
+    原本的摘要保留在 'snippet' 欄位；抓取失敗或逾時的結果維持原樣
+
+    Args:
+        results: 搜尋結果列表（會直接修改）
+        claim: 待驗證的主張
+        budget: 時間預算（秒）
+
+    Returns:
+        成功強化的結果數
+    """
+    start = time.time()
+    fetched = get_article_fetcher().fetch_many([r.get('href', '') for r in results], budget=budget)
+
+    enriched = 0
+    seen_hashes = set()
+    for r in results:
+        entry = fetched.get(r.get('href', ''))
+        if not entry or entry["hash"] in seen_hashes:
+            continue
+        seen_hashes.add(entry["hash"])
+        passage = select_relevant_passage(entry["text"], claim)
+        if passage:
+            r['snippet'] = r.get('body', '')
+            r['body'] = passage
+            r['content_hash'] = entry["hash"]
+            enriched += 1
+
+    print(f"     Article enrichment: {enriched}/{len(results)} sources in {time.time() - start:.1f}s")
+    return enriched
+
+
+if __name__ == "__main__":
+    # 離線示範正文擷取與段落挑選；抓取、預算與快取的行為見 test_article_fetcher.py
+    html = (
+        "<html><body><nav>首頁 | 國際 | 財經</nav><article>"
+        "<h1>台北今天凌晨發生規模6.0地震</h1>"
+        "<p>中央氣象署表示，台北市今天凌晨3點發生規模6.0地震，震央位於信義區。</p>"
+        "<p>地震造成多棟建築物受損，目前已知有50人受傷，消防局動員超過200名消防員。</p>"
+        "<p>氣象署提醒民眾留意餘震，未來一週仍可能發生規模4以上地震。</p>"
+        "</article><footer>版權所有</footer></body></html>"
+    )
+    text = extract_main_text(html)
+    print(text)
+    print("->", select_relevant_passage(text, "台北今天發生地震，50人受傷", max_tokens=60))
@@ -0,0 +1,242 @@
+"""
+Evidence Pool
+同一個請求（同一篇新聞的多個 detail / 多個 claim）共用的證據池
+
+- URL 標準化：移除追蹤參數、www.、AMP 版本（amp. 子網域、/amp 路徑、AMP cache 網址）
+- 每個標準化 URL 只保存一份搜尋結果
+- 與 claim 無關的衍生資料（發布日期、證據時間）每個 URL 只計算一次，之後的 claim 直接重用；
+  只有 claim 相關的立場判斷需要重新計算
+"""
+import re
+import threading
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+from singleflight import SingleFlight
+
+# 追蹤用的查詢參數，不影響內容
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src"}
+TRACKING_PREFIXES = ("utm_",)
+# AMP 版本的查詢參數
+AMP_PARAMS = {"amp", "outputtype", "amp_js_v", "usqp"}
+
+# Google AMP cache：https://www-example-com.cdn.ampproject.org/c/s/www.example.com/path
+_AMP_CACHE_RE = re.compile(r"^/[cv]/(?:s/)?(.+)$")
+# Google AMP viewer：https://www.google.com/amp/s/www.example.com/path
+_GOOGLE_AMP_RE = re.compile(r"^/amp/(?:s/)?(.+)$")
+# 常見的二層公共後綴（com.tw、co.uk、or.jp ...）
+_SECOND_LEVEL_SUFFIXES = {"com", "co", "net", "org", "gov", "edu", "ac", "or", "ne", "go", "gob", "gouv"}
+
+
+def _is_registrable(host):
+    """host 在公共後綴之外至少還有一個標籤（example.com、bbc.co.uk；dev、co.uk 則否）"""
+    labels = host.split(".")
+    if len(labels) >= 2 and len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL_SUFFIXES:
+        suffix_len = 2
+    else:
+        suffix_len = 1
+    return len(labels) > suffix_len
+
+
+def _strip_amp_path(path):
+    """移除路徑中的 AMP 標記：/news/123/amp、/amp/news/123、/news/123.amp(.html)"""
+    path = re.sub(r"/amp/?$", "", path)
+    path = re.sub(r"^/amp(?=/)", "", path)
+    path = re.sub(r"\.amp(?=\.html?$|$)", "", path)
+    return path
+
+
+def canonicalize_url(url):
+    """
+    標準化 URL：統一 scheme、小寫 host、移除 www.、預設埠、fragment、追蹤參數與 AMP 版本
+
+    Args:
+        url: 原始 URL
+
+    Returns:
+        標準化後的 URL（同一篇文章的不同網址寫法會得到相同結果）
+    """
+    try:
+        parsed = urlparse(url.strip())
+    except ValueError:
+        return url
+
+    host = (parsed.hostname or "").lower()
+    path = parsed.path
+
+    # AMP cache / Google AMP viewer：取出原始網址後重新標準化
+    if host.endswith(".cdn.ampproject.org") or (host.endswith("google.com") and path.startswith("/amp/")):
+        m = (_AMP_CACHE_RE if host.endswith(".cdn.ampproject.org") else _GOOGLE_AMP_RE).match(path)
+        if m:
+            inner = "https://" + m.group(1)
+            if parsed.query:
+                inner += "?" + parsed.query
+            return canonicalize_url(inner)
+
+    if host.startswith("www."):
+        host = host[4:]
+    # amp.example.com → example.com；amp.dev 本身就是網站，不可改寫
+    if host.startswith("amp.") and _is_registrable(host[4:]):
+        host = host[4:]
+    if parsed.port and parsed.port not in (80, 443):
+        host = f"{host}:{parsed.port}"
+
+    query = [
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS
+        and k.lower() not in AMP_PARAMS
+        and not k.lower().startswith(TRACKING_PREFIXES)
+    ]
+    path = _strip_amp_path(path).rstrip("/") or "/"
+    # http / https 視為同一篇文章
+    scheme = parsed.scheme.lower()
+    if scheme in ("", "http"):
+        scheme = "https"
+    return urlunparse((scheme, host, path, "", urlencode(sorted(query)), ""))
+
+
+class EvidencePool:
+    """
+    單一請求的證據池（執行緒安全）
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results = {}       # canonical URL -> 搜尋結果
+        self._derived = {}       # (canonical URL, name) -> 衍生資料
+        self._flight = SingleFlight("evidence_pool")
+        self.duplicates = 0
+        self.derived_hits = 0
+        self.derived_misses = 0
+
+    def add_results(self, results):
+        """
+        將搜尋結果加入證據池，並返回去重後的結果
+
+        Args:
+            results: 搜尋結果列表（[{'title', 'body', 'href', ...}]）
+
+        Returns:
+            去重後的結果列表；每筆是池中資料的副本，呼叫端可自由標註 claim 相關欄位
+        """
+        merged = []
+        seen = set()
+        with self._lock:
+            for r in results:
+                href = r.get('href', '')
+                if not href:
+                    merged.append(dict(r))
+                    continue
+                key = canonicalize_url(href)
+                if key in seen:
+                    self.duplicates += 1
+                    continue
+                seen.add(key)
+                stored = self._results.get(key)
+                if stored is None:
+                    stored = dict(r)
+                    stored['canonical_url'] = key
+                    self._results[key] = stored
+                else:
+                    self.duplicates += 1
+                    # 同一篇文章保留較完整的摘要
+                    if len(r.get('body', '')) > len(stored.get('body', '')):
+                        stored['body'] = r['body']
+                merged.append(dict(stored))
+        return merged
+
+    def derived(self, url, name, fn, *args):
+        """
+        取得 URL 的衍生資料；第一次呼叫時執行 fn(*args) 並保存結果
+
+        Args:
+            url: 證據 URL（原始或標準化皆可）
+            name: 衍生資料名稱（例如 'evidence_time'）
+            fn: 計算衍生資料的函式
+
+        Returns:
+            fn 的回傳值（同一 URL 只計算一次）
+        """
+        key = (canonicalize_url(url), name)
+        with self._lock:
+            if key in self._derived:
+                self.derived_hits += 1
+                return self._derived[key]
+            self.derived_misses += 1
+
+        # 並行的 claim 同時需要同一份資料時只計算一次
+        value = self._flight.do(key, fn, *args)
+        with self._lock:
+            self._derived[key] = value
+        return value
+
+    def derived_batch(self, urls, name, fn, items):
+        """
+        批次版本的 derived：只把池中還沒有的項目交給 fn 一次計算
+
+        Args:
+            urls: 證據 URL 列表
+            name: 衍生資料名稱
+            fn: 批次計算函式，fn(items) 返回與 items 順序相同的列表
+            items: 與 urls 對應的輸入資料
+
+        Returns:
+            與 urls 順序相同的衍生資料列表
+        """
+        keys = [(canonicalize_url(url), name) if url else None for url in urls]
+        values = [None] * len(urls)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key is not None and key in self._derived:
+                    self.derived_hits += 1
+                    values[i] = self._derived[key]
+                else:
+                    self.derived_misses += 1
+                    missing.append(i)
+
+        if missing:
+            computed = fn([items[i] for i in missing])
+            with self._lock:
+                for i, value in zip(missing, computed):
+                    values[i] = value
+                    if keys[i] is not None:
+                        self._derived[keys[i]] = value
+        return values
+
+    def stats(self):
+        """
+        Returns:
+            {"urls": int, "duplicates": int, "derived_hits": int, "derived_misses": int}
+        """
+        with self._lock:
+            return {
+                "urls": len(self._results),
+                "duplicates": self.duplicates,
+                "derived_hits": self.derived_hits,
+                "derived_misses": self.derived_misses,
+            }
+
+
+if __name__ == "__main__":
+    for u in [
+        "https://www.example.com/news/123?utm_source=fb&fbclid=abc#top",
+        "http://example.com/news/123/",
+        "https://amp.example.com/news/123/amp",
+        "https://example.com/amp/news/123",
+        "https://example.com/news/123.amp.html?outputType=amp",
+        "https://www-example-com.cdn.ampproject.org/c/s/www.example.com/news/123",
+        "https://www.google.com/amp/s/www.example.com/news/123",
+        "https://example.com/news?id=5&utm_medium=social",
+    ]:
+        print(f"{canonicalize_url(u):45} <- {u}")
+
+    pool = EvidencePool()
+    first = pool.add_results([{"title": "a", "body": "短", "href": "https://www.example.com/news/123?utm_source=x"}])
+    second = pool.add_results([
+        {"title": "a", "body": "較長的摘要", "href": "https://example.com/news/123/amp"},
+        {"title": "b", "body": "另一篇", "href": "https://example.com/news/456"},
+    ])
+    print([r["body"] for r in second])
+    calls = []
+    for r in first + second:
+        pool.derived(r["href"], "evidence_time", lambda href: calls.append(href) or len(calls), r["href"])
+    print(f"derived computed {len(calls)} times", pool.stats())
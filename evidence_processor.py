@@ -2,144 +2,259 @@
 Evidence Processor
 處理證據搜尋、過濾、分析和驗證
 """
-from llm_helpers import call_llm, parse_json_response
+import asyncio
+from llm_helpers import call_llm, async_call_llm, run_async, parse_json_response
 from qa_tool import web_search
 from temporal_checker import (
-    extract_time_from_claim,
-    extract_time_from_evidence,
-    normalize_time_expression,
-    is_temporally_relevant
+    extract_and_normalize_claim_time,
+    resolve_evidence_times_batch,
+    check_temporal_relevance_batch
 )
+from token_budget import TOKEN_BUDGETS, compact_evidence, record_savings
+from article_fetcher import enrich_with_article_text
+from relevance_scorer import filter_by_relevance
+from gazetteer import find_places, countries_of, is_unambiguous
+from source_tiers import get_source_tier
+import os
+import threading
 from datetime import datetime
-from urllib.parse import urlparse
-
-# 官方來源域名列表
-OFFICIAL_DOMAINS = {
-    # 政府域名（各國）
-    '.gov',         # 美國政府
-    '.gov.tw',      # 台灣政府
-    '.gov.uk',      # 英國政府
-    '.go.jp',       # 日本政府
-    '.gov.cn',      # 中國政府
-    '.gov.au',      # 澳洲政府
-    '.gouv.fr',     # 法國政府
-    '.gc.ca',       # 加拿大政府
-    '.gob.mx',      # 墨西哥政府
-    '.gob.es',      # 西班牙政府
-    '.gov.sg',      # 新加坡政府
-    '.go.kr',       # 韓國政府
-    
-    # 教育機構
-    '.edu',         # 美國教育機構
-    '.edu.tw',      # 台灣教育機構
-    '.ac.uk',       # 英國學術機構
-    '.ac.jp',       # 日本學術機構
-    '.edu.au',      # 澳洲教育機構
-}
-
-INTERNATIONAL_ORGS = [
-    'un.org',           # 聯合國
-    'who.int',          # 世界衛生組織
-    'imf.org',          # 國際貨幣基金
-    'worldbank.org',    # 世界銀行
-    'wto.org',          # 世界貿易組織
-    'oecd.org',         # 經濟合作暨發展組織
-    'unesco.org',       # 聯合國教科文組織
-]
+from concurrent.futures import ThreadPoolExecutor
+
+# 每個 verify_claim 請求的背景工作數：claim 時間解析、speculative 一般搜尋、時間檢查
+SEARCH_PHASE_WORKERS = 3
+
+# 逐一判斷立場時同時進行的 LLM 呼叫數
+STANCE_CONCURRENCY = int(os.getenv("STANCE_CONCURRENCY", "5"))
+
+# sequential 立場模式：k 個可信來源立場一致、且沒有相反立場時提前停止
+STANCE_EARLY_STOP_K = int(os.getenv("STANCE_EARLY_STOP_K", "3"))
+
+# 不計入提前停止條件的來源等級
+LOW_CREDIBILITY_TIERS = {"low-credibility"}
 
 
 def get_source_credibility_tier(url):
     """
-    判斷來源可信度等級
+    判斷來源可信度等級（網域規則見 data/source_tiers.tsv）
     
     Args:
         url: 證據來源 URL
     
     Returns:
-        "official": 政府機構或國際組織
-        "standard": 一般來源
+        "official": 政府機構、國際組織、學術研究機構
+        "wire": 通訊社
+        "established": 主要新聞媒體與學術期刊
+        "fact-checker": 事實查核組織
+        "low-credibility": 資料檔明確標記的低可信度網域（隨附資料未列出任何網域）
+        "standard": 其他來源
     """
-    try:
-        parsed = urlparse(url)
-        domain = parsed.netloc.lower()
-        
-        # 移除 www. 前綴
-        if domain.startswith('www.'):
-            domain = domain[4:]
-        
-        # 檢查政府域名後綴
-        for suffix in OFFICIAL_DOMAINS:
-            if domain.endswith(suffix):
-                return "official"
-        
-        # 檢查國際組織
-        for org in INTERNATIONAL_ORGS:
-            if org in domain:
-                return "official"
-        
-        return "standard"
-    except:
-        return "standard"
+    return get_source_tier(url)
 
 
-def generate_search_query(claim, search_mode='general'):
+def _tier_label(evidence_item):
+    """verdict 證據摘要中標示來源等級（一般來源不標示）"""
+    tier = evidence_item.get('source_tier', 'standard')
+    return "" if tier == 'standard' else f" (source: {tier})"
+
+
+# 關鍵字提取規則（generate_keyword_query 與 plan_search_queries 共用）
+KEYWORD_RULES = (
+    "CRITICAL: Keep the query in the SAME LANGUAGE as the claim.\n"
+    "- If claim is in Chinese → return Chinese keywords\n"
+    "- If claim is in English → return English keywords\n\n"
+    "Return ONLY 2-4 key terms that would help find relevant evidence.\n"
+    "Focus on:\n"
+    "- Names of people, organizations, places\n"
+    "- Specific events or policies\n"
+    "- Dates or time periods\n"
+    "- Core factual assertions\n\n"
+    "CRITICAL for location keywords:\n"
+    "- Keep COMPLETE place names with country/region prefix (e.g., '日本東北' not just '東北', 'Taiwan Taipei' not just 'Taipei')\n"
+    "- NEVER drop the country/region name before a location\n"
+    "- Examples: '日本岩手縣' ✓, '岩手縣' ✗ | 'Japan Iwate' ✓, 'Iwate' ✗\n\n"
+    "Remove: opinions, adjectives, unnecessary words.\n"
+)
+
+# 官方來源模式的 site: 過濾器
+OFFICIAL_SITES = [
+    "site:.gov", "site:.gov.tw", "site:.gov.uk", "site:.go.jp",
+    "site:.edu", "site:.edu.tw", "site:.ac.uk",
+    "site:who.int", "site:un.org", "site:imf.org", "site:worldbank.org"
+]
+
+
+def _clean_query(claim, query):
     """
-    從claim中提取最佳搜尋關鍵字
+    清理 LLM 產生的查詢，並補回 claim 中有但查詢中遺漏的地名
+    
+    Returns:
+        清理後的查詢；為空則返回 claim
+    """
+    # 清理回應，移除引號和多餘空白
+    query = " ".join(str(query).strip().strip('"').strip("'").split())
+    
+    # 強制加入地域關鍵字（claim 中有但 query 中沒有的地名，依 claim 中的順序加在前面）
+    # query 提到同一地點或其下層地點即視為已包含；國名只有 query 也寫出國名才算（「日本岩手縣」不能只剩「岩手縣」）
+    query_places = [p for m in find_places(query) for p in m["places"]]
+    missing = []
+    for m in find_places(claim):
+        if m["text"] in missing:
+            continue
+        covered = any(
+            qp["id"] == p["id"] if p["kind"] == "country"
+            else qp["country"] == p["country"] and p["name"] in qp["path"]
+            for p in m["places"] for qp in query_places
+        )
+        if not covered:
+            missing.append(m["text"])
+    if missing:
+        query = " ".join(missing + [query]).strip()
+    
+    return query if len(query) > 0 else claim
+
+
+def generate_keyword_query(claim):
+    """
+    從claim中提取最佳搜尋關鍵字（一般搜尋用，不含 site: 過濾器）
     
     Args:
         claim: 待驗證的主張
-        search_mode: 'official' (官方來源) 或 'general' (一般搜尋)
     
     Returns:
-        優化後的搜尋查詢字串
+        搜尋查詢字串；失敗時返回 claim
     """
     system = (
         "Extract the most important keywords for fact-checking this claim.\n"
-        "CRITICAL: Keep the query in the SAME LANGUAGE as the claim.\n"
-        "- If claim is in Chinese → return Chinese keywords\n"
-        "- If claim is in English → return English keywords\n\n"
-        "Return ONLY 2-4 key terms that would help find relevant evidence.\n"
-        "Focus on:\n"
-        "- Names of people, organizations, places\n"
-        "- Specific events or policies\n"
-        "- Dates or time periods\n"
-        "- Core factual assertions\n\n"
-        "CRITICAL for location keywords:\n"
-        "- Keep COMPLETE place names with country/region prefix (e.g., '日本東北' not just '東北', 'Taiwan Taipei' not just 'Taipei')\n"
-        "- NEVER drop the country/region name before a location\n"
-        "- Examples: '日本岩手縣' ✓, '岩手縣' ✗ | 'Japan Iwate' ✓, 'Iwate' ✗\n\n"
-        "Remove: opinions, adjectives, unnecessary words.\n"
+        + KEYWORD_RULES +
         "Return as a simple search query string (not JSON)."
     )
     
     try:
-        query = call_llm(system, f"Claim: {claim}")
-        # 清理回應，移除引號和多餘空白
-        query = query.strip().strip('"').strip("'")
-        
-        # 強制加入地域關鍵字（如果claim中有但query中沒有）
-        location_keywords = ['台北', '臺北', '台中', '臺中', '台南', '臺南', '高雄', '台灣', '臺灣', 'Taipei', 'Taichung', 'Tainan', 'Kaohsiung', 'Taiwan']
-        for loc in location_keywords:
-            if loc in claim and loc not in query:
-                query = f"{loc} {query}"
-                break
-        
-        # 官方來源模式：添加 site: 過濾器
-        if search_mode == 'official':
-            official_sites = [
-                "site:.gov", "site:.gov.tw", "site:.gov.uk", "site:.go.jp",
-                "site:.edu", "site:.edu.tw", "site:.ac.uk",
-                "site:who.int", "site:un.org", "site:imf.org", "site:worldbank.org"
-            ]
-            site_filter = " OR ".join(official_sites)
-            query = f"{query} ({site_filter})"
-        
-        return query if len(query) > 0 else claim
+        query = call_llm(system, f"Claim: {claim}", call_site="query_generation")
+        return _clean_query(claim, query)
     except Exception:
         # 備用：直接使用claim
         return claim
 
 
+def build_official_query(query):
+    """
+    由一般搜尋查詢產生官方來源查詢（附加 site: 過濾器，不需 LLM）
+    
+    Args:
+        query: 一般搜尋查詢
+    
+    Returns:
+        官方來源查詢字串
+    """
+    site_filter = " OR ".join(OFFICIAL_SITES)
+    return f"{query} ({site_filter})"
+
+
+def generate_search_query(claim, search_mode='general'):
+    """
+    從claim中提取最佳搜尋關鍵字
+    
+    Args:
+        claim: 待驗證的主張
+        search_mode: 'official' (官方來源) 或 'general' (一般搜尋)
+    
+    Returns:
+        優化後的搜尋查詢字串
+    """
+    query = generate_keyword_query(claim)
+    
+    # 官方來源模式：添加 site: 過濾器
+    if search_mode == 'official':
+        return build_official_query(query)
+    return query
+
+
+def plan_search_queries(title, details):
+    """
+    文章層級的查詢規劃：一次 LLM 呼叫為所有 detail 產生搜尋關鍵字
+    官方來源查詢由 build_official_query 在本地產生；模型漏掉的 detail 才個別呼叫 generate_keyword_query
+    
+    Args:
+        title: 新聞標題（一般文字模式可為 None）
+        details: detail / claim 列表
+    
+    Returns:
+        與 details 順序相同的搜尋查詢列表（不含 site: 過濾器）
+    """
+    if not details:
+        return []
+    
+    system = (
+        "For EACH numbered claim, extract the most important keywords for fact-checking it.\n"
+        "All claims come from the same article; use the title only as context (e.g. to keep place names complete).\n"
+        + KEYWORD_RULES +
+        "Return ONLY a JSON array with one object per claim, in order:\n"
+        '[{"id": 1, "query": "..."}, {"id": 2, "query": "..."}, ...]'
+    )
+    
+    user = f"Title: {title}\n\n" if title else ""
+    user += "Claims:\n"
+    for idx, detail in enumerate(details, 1):
+        user += f"[{idx}] {detail}\n"
+    
+    queries = [None] * len(details)
+    try:
+        planned = parse_json_response(call_llm(system, user, call_site="query_generation"))
+        if isinstance(planned, list):
+            for pos, item in enumerate(planned):
+                # 接受 {"id": n, "query": ...} 或純字串陣列
+                if isinstance(item, dict):
+                    idx, query = item.get("id", pos + 1), item.get("query", "")
+                else:
+                    idx, query = pos + 1, item
+                try:
+                    idx = int(idx)
+                except (TypeError, ValueError):
+                    continue
+                if 1 <= idx <= len(details) and queries[idx - 1] is None and str(query).strip():
+                    queries[idx - 1] = _clean_query(details[idx - 1], query)
+    except Exception as e:
+        print(f"  Query planning failed ({e}), generating queries per detail")
+    
+    # 補齊模型漏掉的 detail
+    for i, query in enumerate(queries):
+        if query is None:
+            queries[i] = generate_keyword_query(details[i])
+    
+    unique = len({q.lower() for q in queries})
+    print(f"  Query plan: {len(details)} details -> {unique} unique queries")
+    return queries
+
+
+# 會造成地點衝突的地點層級：國名常出現在機構名稱中（例如「美國地質調查局」），
+# 區級地名多為兩字短名、容易誤中一般詞彙，都不單獨作為過濾依據
+_CONFLICT_KINDS = {"region", "city"}
+
+# 只對提到這些國家地點的 claim 做地點預過濾：其他國家的新聞常順帶提到外國城市
+# （「川普訪問巴黎」），一律交給 LLM 判斷
+LOCATION_FILTER_COUNTRIES = {"TW"}
+
+
+def _is_foreign_place_conflict(match, evidence_places, evidence_text):
+    """
+    證據中的地名是否足以判定證據在講其他地點
+    兩字中文簡稱不夠明確時（「中環境」、「本州政府」），需要證據中另有國名或明確地名指向同一國家
+    """
+    countries = {p["country"] for p in match["places"] if p["kind"] in _CONFLICT_KINDS}
+    if not countries:
+        return False
+    if is_unambiguous(match, evidence_text):
+        return True
+    for other in evidence_places:
+        if other is match:
+            continue
+        if any(p["kind"] == "country" for p in other["places"]) or is_unambiguous(other, evidence_text):
+            if countries_of([other]) & countries:
+                return True
+    return False
+
+
 def is_evidence_potentially_relevant(claim, evidence_title, evidence_body):
     """
     快速預過濾：只過濾明顯錯誤地點的證據
@@ -154,26 +269,50 @@ def is_evidence_potentially_relevant(claim, evidence_title, evidence_body):
     """
     evidence_text = (evidence_title + " " + evidence_body)
     
-    # 檢測claim中的台灣相關地點
-    taiwan_locations = ['台北', '臺北', '台中', '臺中', '台南', '臺南', '高雄', '台灣', '臺灣', '新北']
-    has_taiwan_location = any(loc in claim for loc in taiwan_locations)
-    
-    # 如果claim提到台灣地點，但證據提到明顯不相關的國外地點，則過濾
-    if has_taiwan_location:
-        irrelevant_locations = [
-            'San Diego', 'Beijing', '北京', 'Shanghai', '上海', 
-            'Hong Kong', '香港', 'Tokyo', '東京', 'Seoul', '首爾',
-            'Singapore', '新加坡', 'London', 'New York', 'Paris'
-        ]
-        # 檢查是否有明顯衝突的地點（同時出現在證據中但不在claim中）
-        for irrelevant_loc in irrelevant_locations:
-            if irrelevant_loc in evidence_text and irrelevant_loc not in claim:
-                return False
+    # 檢測claim中地點所屬的國家
+    claim_countries = countries_of(find_places(claim))
+    
+    # 如果claim提到台灣地點，但證據明確提到其他國家的城市 / 行政區（完全沒提到claim的國家），則過濾
+    if claim_countries & LOCATION_FILTER_COUNTRIES:
+        evidence_places = find_places(evidence_text)
+        if not countries_of(evidence_places) & claim_countries:
+            for m in evidence_places:
+                if _is_foreign_place_conflict(m, evidence_places, evidence_text):
+                    return False
     
     # 預設：保留證據給LLM分析（寬鬆策略）
     return True
 
 
+def _normalize_stance(label):
+    """
+    將 LLM 回傳的立場文字標準化
+    
+    Returns:
+        "support" | "refute" | "irrelevant"，無法辨識則返回 None
+    """
+    label = str(label).strip().lower()
+    if "support" in label:
+        return "support"
+    elif "refute" in label or "contradict" in label:
+        return "refute"
+    elif "irrelevant" in label or "unrelated" in label:
+        return "irrelevant"
+    return None
+
+
+def _stance_prompts(claim, evidence_title, evidence_body):
+    """單一證據立場判斷的 (system, user) 提示詞"""
+    system = (
+        "Analyze if the evidence supports, refutes, or is irrelevant to the claim.\n"
+        "Return ONLY one word: support / refute / irrelevant\n"
+        "Do not explain, just return the single word."
+    )
+    
+    user = f"Claim: {claim}\n\nEvidence:\nTitle: {evidence_title}\nContent: {evidence_body}"
+    return system, user
+
+
 def analyze_evidence_stance(claim, evidence_title, evidence_body):
     """
     判斷單個證據與claim的關係：支持/反駁/無關
@@ -186,73 +325,187 @@ def analyze_evidence_stance(claim, evidence_title, evidence_body):
     Returns:
         "support" | "refute" | "irrelevant"
     """
-    system = (
-        "Analyze if the evidence supports, refutes, or is irrelevant to the claim.\n"
-        "Return ONLY one word: support / refute / irrelevant\n"
-        "Do not explain, just return the single word."
-    )
-    
-    user = f"Claim: {claim}\n\nEvidence:\nTitle: {evidence_title}\nContent: {evidence_body}"
+    system, user = _stance_prompts(claim, evidence_title, evidence_body)
     
     try:
-        result = call_llm(system, user).strip().lower()
+        result = call_llm(system, user, call_site="stance")
         # 標準化回應
-        if "support" in result:
-            return "support"
-        elif "refute" in result or "contradict" in result:
-            return "refute"
-        else:
-            return "irrelevant"
+        return _normalize_stance(result) or "irrelevant"
     except Exception:
         return "irrelevant"
 
 
-def verify_claim(claim, language="zh-TW", temporal_check=True, claim_reference_date=None):
+async def async_analyze_evidence_stance(claim, evidence_title, evidence_body):
     """
-    驗證單個主張
+    analyze_evidence_stance 的 asyncio 版本（透過 async_call_llm）
+    
+    Returns:
+        "support" | "refute" | "irrelevant"
+    """
+    system, user = _stance_prompts(claim, evidence_title, evidence_body)
+    
+    try:
+        result = await async_call_llm(system, user, call_site="stance")
+        return _normalize_stance(result) or "irrelevant"
+    except Exception:
+        return "irrelevant"
+
+
+def analyze_evidence_stances_parallel(claim, evidences, max_workers=None):
+    """
+    逐一判斷多個證據的立場（每個證據一次 LLM 呼叫）
+    以 async_call_llm 同時送出，不需要每個請求一條執行緒；
+    同時進行的呼叫數另受 AsyncLLMClient 的程序級上限（LLM_MAX_CONCURRENCY）限制
     
     Args:
         claim: 待驗證的主張
-        language: 回應語言
-        temporal_check: 是否進行時間相關性檢查（預設開啟）
-        claim_reference_date: claim 的發布日期（用於時間檢查），None 則使用今天
+        evidences: 搜尋結果列表（含 title, body）
+        max_workers: 同時進行的呼叫數（None 則使用 STANCE_CONCURRENCY）
     
     Returns:
-        {
-            "verdict": "Supported" | "Contradicted" | "Insufficient evidence" | "Temporal mismatch",
-            "explanation": str,
-            "evidence_count": int,
-            "search_query": str,
-            "evidence_breakdown": {"support": int, "refute": int, "irrelevant": int},
-            "temporal_warning": str (optional),
-            "source_type": "official" | "general" (optional),
-            "authoritative_override": bool (optional)
-        }
+        與 evidences 順序相同的立場列表；個別證據發生錯誤時標記為 "irrelevant"
     """
-    # 初始化預設值，避免變數未定義
-    search_query = claim
-    valid_results = []
+    if not evidences:
+        return []
     
-    # 提取 claim 中的時間資訊（如果啟用時間檢查）
-    claim_time_expression = None
-    claim_time_info = None
-    temporal_warnings = []
+    limit = asyncio.Semaphore(max(1, min(max_workers or STANCE_CONCURRENCY, len(evidences))))
     
-    if temporal_check:
-        try:
-            claim_time_expression = extract_time_from_claim(claim)
-            if claim_time_expression:
-                print(f"  -> 發現時間描述: {claim_time_expression}")
-                # 使用 claim 的發布日期作為參考點
-                ref_date = claim_reference_date or datetime.now().isoformat()
-                claim_time_info = normalize_time_expression(claim_time_expression, ref_date)
-                print(f"  -> 標準化時間: {claim_time_info.get('parsed_date')} ({claim_time_info.get('time_type')})")
-        except Exception as e:
-            print(f"  Warning: Time extraction failed ({e})")
+    async def analyze(r):
+        async with limit:
+            try:
+                return await async_analyze_evidence_stance(claim, r.get('title', ''), r.get('body', ''))
+            except Exception as e:
+                print(f"     Stance analysis failed for '{r.get('title', '')[:30]}' ({e})")
+                return "irrelevant"
+    
+    async def analyze_all():
+        # gather 依輸入順序返回結果
+        return await asyncio.gather(*(analyze(r) for r in evidences))
+    
+    return list(run_async(analyze_all()))
 
-    # === 第一階段：搜尋官方來源 ===
-    print(f"\n  [階段1] 搜尋官方來源...")
-    official_query = generate_search_query(claim, search_mode='official')
+
+def analyze_evidence_stances_sequential(claim, evidences, k=None, max_workers=None):
+    """
+    依搜尋排名順序判斷立場，符合決策規則時提前停止：
+    k 個可信來源（非低可信度等級）一致支持（或一致反駁），且沒有任何相反立場
+    
+    每一輪只判斷「還差幾個一致來源」數量的證據（同一輪內並行），出現相反立場後規則不可能成立，
+    剩下的證據一次判斷完
+    
+    Args:
+        claim: 待驗證的主張
+        evidences: 搜尋結果列表（依排名排列）
+        k: 需要的一致可信來源數（None 則使用 STANCE_EARLY_STOP_K）
+        max_workers: 每一輪同時進行的呼叫數（None 則使用 STANCE_CONCURRENCY）
+    
+    Returns:
+        與 evidences 順序相同的立場列表；提前停止而未判斷的項目為 None
+    """
+    k = max(1, k or STANCE_EARLY_STOP_K)
+    stances = [None] * len(evidences)
+    agreeing = {"support": 0, "refute": 0}
+    seen = {"support": 0, "refute": 0}
+    
+    pos = 0
+    while pos < len(evidences):
+        if seen["support"] and seen["refute"]:
+            # 已有相反立場：無法提前停止
+            wave = len(evidences) - pos
+        else:
+            wave = k - max(agreeing.values())
+        
+        batch = evidences[pos:pos + wave]
+        for offset, stance in enumerate(analyze_evidence_stances_parallel(claim, batch, max_workers)):
+            stances[pos + offset] = stance
+            if stance in seen:
+                seen[stance] += 1
+                if get_source_credibility_tier(batch[offset].get('href', '')) not in LOW_CREDIBILITY_TIERS:
+                    agreeing[stance] += 1
+        pos += len(batch)
+        
+        for stance, opposite in (("support", "refute"), ("refute", "support")):
+            if agreeing[stance] >= k and seen[opposite] == 0:
+                if pos < len(evidences):
+                    print(f"     Early stop: {agreeing[stance]} credible sources {stance}, "
+                          f"skipped {len(evidences) - pos} remaining")
+                return stances
+    
+    return stances
+
+
+def analyze_evidence_stances_batch(claim, evidences):
+    """
+    一次 LLM 呼叫判斷多個證據的立場
+    模型漏標或標記無法辨識的項目，才個別呼叫 analyze_evidence_stance 補判
+    
+    Args:
+        claim: 待驗證的主張
+        evidences: 搜尋結果列表（含 title, body）
+    
+    Returns:
+        與 evidences 順序相同的立場列表："support" | "refute" | "irrelevant"
+    """
+    if not evidences:
+        return []
+    
+    system = (
+        "For EACH numbered evidence, decide if it supports, refutes, or is irrelevant to the claim.\n"
+        "Return ONLY a JSON array with one object per evidence, in order:\n"
+        '[{"id": 1, "stance": "support"}, {"id": 2, "stance": "irrelevant"}, ...]\n'
+        "stance must be one of: support / refute / irrelevant\n"
+        "Do not explain."
+    )
+    
+    user = f"Claim: {claim}\n\nEvidence:\n"
+    for idx, r in enumerate(evidences, 1):
+        user += f"[{idx}] Title: {r.get('title', '')}\n    Content: {r.get('body', '')}\n"
+    
+    stances = [None] * len(evidences)
+    try:
+        labels = parse_json_response(call_llm(system, user, call_site="stance"))
+        if isinstance(labels, list):
+            for pos, item in enumerate(labels):
+                # 接受 {"id": n, "stance": ...} 或純字串陣列
+                if isinstance(item, dict):
+                    idx, label = item.get("id", pos + 1), item.get("stance", "")
+                else:
+                    idx, label = pos + 1, item
+                try:
+                    idx = int(idx)
+                except (TypeError, ValueError):
+                    continue
+                if 1 <= idx <= len(evidences) and stances[idx - 1] is None:
+                    stances[idx - 1] = _normalize_stance(label)
+    except Exception as e:
+        print(f"     Batch stance analysis failed ({e}), falling back to per-item calls")
+    
+    # 補判模型漏標的項目
+    missing = [i for i, stance in enumerate(stances) if stance is None]
+    if missing and len(missing) < len(evidences):
+        print(f"     Batch stance missed {len(missing)} item(s), analyzing individually")
+    for i, stance in zip(missing, analyze_evidence_stances_parallel(claim, [evidences[i] for i in missing])):
+        stances[i] = stance
+    
+    return stances
+
+
+def search_official_sources(claim, keyword_query=None):
+    """
+    第一階段：搜尋官方來源
+    找到官方來源且第一個官方來源明確支持/反駁時，直接以官方來源判定
+    
+    Args:
+        claim: 待驗證的主張
+        keyword_query: 已規劃好的搜尋關鍵字（None 則由 LLM 產生）
+    
+    Returns:
+        官方來源判定的驗證結果（格式同 verify_claim）；沒有決定性的官方證據則返回 None
+    """
+    if keyword_query:
+        official_query = build_official_query(keyword_query)
+    else:
+        official_query = generate_search_query(claim, search_mode='official')
     print(f"  -> 官方搜尋關鍵字: {official_query}")
     
     try:
@@ -315,24 +568,215 @@ def verify_claim(claim, language="zh-TW", temporal_check=True, claim_reference_d
     except Exception as e:
         print(f"  [官方來源] 搜尋失敗: {e}")
     
-    # === 第二階段：一般搜尋 ===
-    print(f"\n  [階段2] 進行一般搜尋...")
-    valid_results = []
+    return None
+
+
+def search_general_sources(claim, keyword_query=None, cancelled=None):
+    """
+    第二階段：一般搜尋（產生關鍵字並搜尋最多 10 個結果）
     
+    Args:
+        claim: 待驗證的主張
+        keyword_query: 已規劃好的搜尋關鍵字（None 則由 LLM 產生）
+        cancelled: threading.Event；speculative 模式下官方來源已有結論時設定，之後的步驟不再執行
+    
+    Returns:
+        (search_query, search_results)；被取消時 search_results 為空列表
+    """
+    if cancelled is not None and cancelled.is_set():
+        return keyword_query or claim, []
     try:
-        # 先生成更精準的搜尋查詢
-        search_query = generate_search_query(claim, search_mode='general')
+        # 先生成更精準的搜尋查詢（已有規劃好的查詢則直接使用）
+        search_query = keyword_query or generate_search_query(claim, search_mode='general')
         print(f"  -> 搜尋關鍵字: {search_query}")
     except Exception as e:
         print(f"  Warning: Search query generation failed ({e}), using original claim")
         search_query = claim
     
+    if cancelled is not None and cancelled.is_set():
+        return search_query, []
+    
+    # 搜尋至少10個結果
+    return search_query, web_search(search_query, max_results=10)
+
+
+def _resolve_claim_time(claim, ref_date):
+    """
+    提取並標準化 claim 的時間描述（在背景執行，失敗時返回 None）
+    
+    Returns:
+        normalize_time_expression 格式的結果，或 None
+    """
+    try:
+        claim_time_info = extract_and_normalize_claim_time(claim, ref_date)
+        if claim_time_info:
+            print(f"  -> 發現時間描述: {claim_time_info.get('original_expression')}")
+            print(f"  -> 標準化時間: {claim_time_info.get('parsed_date')} ({claim_time_info.get('time_type')})")
+        return claim_time_info
+    except Exception as e:
+        print(f"  Warning: Time extraction failed ({e})")
+        return None
+
+
+def _evaluate_temporal(results, claim_time_info, evidence_pool=None):
+    """
+    解析證據時間並檢查與 claim 的時間相關性（不修改 results，可在背景執行）
+    
+    Args:
+        results: 證據列表
+        claim_time_info: claim 的標準化時間
+        evidence_pool: 同一請求共用的 EvidencePool（可為 None）
+    
+    Returns:
+        與 results 順序相同的 is_temporally_relevant 格式結果列表（沒有時間資訊的項目為 None）
+    """
+    try:
+        # 證據時間與 claim 無關：一次批次解析所有證據（能在本地解析則不呼叫 LLM），
+        # 同一請求的證據池中每個 URL 只解析一次
+        temporal_items = [{"text": r.get('body', ''), "published": r.get('date')} for r in results]
+        if evidence_pool is not None:
+            evidence_time_infos = evidence_pool.derived_batch(
+                [r.get('href', '') for r in results], 'evidence_time',
+                resolve_evidence_times_batch, temporal_items
+            )
+        else:
+            evidence_time_infos = resolve_evidence_times_batch(temporal_items)
+        
+        return check_temporal_relevance_batch(claim_time_info, evidence_time_infos)
+    except Exception as e:
+        print(f"     Warning: Temporal check failed ({e})")
+        return [None] * len(results)
+
+
+def _merge_temporal(results, temporal_results, temporal_warnings):
+    """
+    將時間檢查結果標記到證據上（保留所有證據），並收集時間不符的警告
+    
+    Args:
+        results: 證據列表（會直接修改）
+        temporal_results: _evaluate_temporal 的輸出
+        temporal_warnings: 警告列表（會直接附加）
+    """
+    for r, temporal_result in zip(results, temporal_results):
+        if temporal_result:
+            r['temporal_status'] = temporal_result['status']
+            r['temporal_info'] = temporal_result
+            
+            if not temporal_result['is_relevant']:
+                temporal_warnings.append(
+                    f"⚠️ 證據 '{r.get('title', '')[:50]}...' 的時間 ({temporal_result['evidence_date']}) "
+                    f"不符合 claim 的時間範圍 ({temporal_result['expected_range']})，但仍保留供分析"
+                )
+        else:
+            # 無法提取時間的證據保留
+            r['temporal_status'] = 'no_constraint'
+
+
+def verify_claim(claim, language="zh-TW", temporal_check=True, claim_reference_date=None,
+                 stance_mode="batch", speculative=True, enrich_evidence=False,
+                 evidence_pool=None, search_query=None, temporal_mode="concurrent",
+                 stance_concurrency=None, early_stop_k=None, relevance_threshold=None):
+    """
+    驗證單個主張
+    
+    Args:
+        claim: 待驗證的主張
+        language: 回應語言
+        temporal_check: 是否進行時間相關性檢查（預設開啟）
+        claim_reference_date: claim 的發布日期（用於時間檢查），None 則使用今天
+        stance_mode: "batch"（一次 LLM 呼叫判斷所有證據）、"per_item"（逐一判斷，並行執行）或
+                     "sequential"（依排名判斷，k 個可信來源一致且無相反立場時提前停止）
+        speculative: 官方來源與一般搜尋同時進行（預設開啟）；關閉則依序執行兩階段
+        enrich_evidence: 抓取證據原文，以最相關的正文段落取代搜尋摘要（預設關閉，有時間預算）
+        evidence_pool: 同一請求共用的 EvidencePool；提供時搜尋結果依標準化 URL 去重，
+                       證據時間等衍生資料跨 claim 重用（立場仍依 claim 重新判斷）
+        search_query: plan_search_queries 規劃好的搜尋關鍵字；None 則由 LLM 產生
+        temporal_mode: "concurrent"（時間檢查與立場分析同時進行）或
+                       "lazy"（立場分析後只檢查支持/反駁的證據）
+        stance_concurrency: per_item / sequential 模式同時進行的立場判斷數（None 則使用 STANCE_CONCURRENCY）
+        early_stop_k: sequential 模式的提前停止門檻（None 則使用 STANCE_EARLY_STOP_K）
+        relevance_threshold: 本地相關性門檻，相對最高分的比例（None 則使用 RELEVANCE_THRESHOLD；claim 詞彙覆蓋率下限仍適用）
+    
+    Returns:
+        {
+            "verdict": "Supported" | "Contradicted" | "Insufficient evidence" | "Temporal mismatch",
+            "explanation": str,
+            "evidence_count": int,
+            "search_query": str,
+            "evidence_breakdown": {"support": int, "refute": int, "irrelevant": int, "skipped": int (sequential)},
+            "temporal_warning": str (optional),
+            "source_type": "official" | "general" (optional),
+            "authoritative_override": bool (optional)
+        }
+    """
+    # 背景工作（claim 時間解析、speculative 一般搜尋、時間檢查）使用這個請求自己的執行緒池：
+    # 每個請求最多同時 SEARCH_PHASE_WORKERS 個背景工作，不會排在其他請求被捨棄的搜尋後面
+    phase_pool = ThreadPoolExecutor(max_workers=SEARCH_PHASE_WORKERS, thread_name_prefix="search-phase")
     try:
-        # 搜尋至少10個結果
-        search_results = web_search(search_query, max_results=10)
+        return _verify_claim(
+            claim, language, temporal_check, claim_reference_date, stance_mode, speculative,
+            enrich_evidence, evidence_pool, search_query, temporal_mode, stance_concurrency,
+            early_stop_k, relevance_threshold, phase_pool
+        )
+    finally:
+        # 被捨棄的背景搜尋會自行結束，不需要等待
+        phase_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _verify_claim(claim, language, temporal_check, claim_reference_date, stance_mode, speculative,
+                  enrich_evidence, evidence_pool, search_query, temporal_mode, stance_concurrency,
+                  early_stop_k, relevance_threshold, phase_pool):
+    """verify_claim 的本體（參數見 verify_claim；phase_pool 為這個請求的背景執行緒池）"""
+    # 初始化預設值，避免變數未定義
+    keyword_query = search_query
+    search_query = keyword_query or claim
+    valid_results = []
+    
+    # 提取 claim 中的時間資訊（如果啟用時間檢查）
+    # 在背景與關鍵字產生、搜尋同時進行，時間檢查階段才取用結果
+    claim_time_info = None
+    claim_time_future = None
+    temporal_warnings = []
+    
+    if temporal_check:
+        # 使用 claim 的發布日期作為參考點
+        ref_date = claim_reference_date or datetime.now().isoformat()
+        claim_time_future = phase_pool.submit(_resolve_claim_time, claim, ref_date)
+
+    # 兩個搜尋階段使用相同關鍵字（官方查詢只多了 site: 過濾器），只需產生一次
+    if not keyword_query:
+        keyword_query = generate_keyword_query(claim)
+    
+    # === 第一階段：搜尋官方來源 ===
+    # speculative 模式下一般搜尋同時在背景開始，官方來源有決定性結果時直接捨棄
+    general_future = None
+    general_cancelled = threading.Event()
+    if speculative:
+        general_future = phase_pool.submit(search_general_sources, claim, keyword_query, general_cancelled)
+    
+    print(f"\n  [階段1] 搜尋官方來源...")
+    official_verdict = search_official_sources(claim, keyword_query)
+    if official_verdict:
+        if general_future:
+            # 還沒開始的一般搜尋不再送出；已送出的搜尋結果仍會進入搜尋快取
+            general_cancelled.set()
+            print(f"  [階段2] 官方來源已有結論，取消背景一般搜尋")
+        return official_verdict
+    
+    # === 第二階段：一般搜尋 ===
+    print(f"\n  [階段2] 進行一般搜尋...")
+    valid_results = []
+    
+    try:
+        if general_future:
+            search_query, search_results = general_future.result()
+        else:
+            search_query, search_results = search_general_sources(claim, keyword_query)
         
         # 過濾有效結果
         valid_results = [r for r in search_results if r.get('title') and r.get('body')]
+        if evidence_pool is not None:
+            valid_results = evidence_pool.add_results(valid_results)
     except Exception as e:
         print(f"  Error: Search failed ({e})")
         return {
@@ -368,58 +812,25 @@ def verify_claim(claim, language="zh-TW", temporal_check=True, claim_reference_d
         else:
             filtered_out += 1
     
+    # 本地詞彙相關性：過濾明顯離題的結果，其餘依相關性排序（不呼叫 LLM）
+    if filtered_results:
+        filtered_results, dropped = filter_by_relevance(claim, filtered_results, relevance_threshold)
+        filtered_out += dropped
+    
     if filtered_out > 0:
         print(f"     Pre-filtered {filtered_out} obviously irrelevant sources")
     
-    # 時間相關性過濾（如果啟用）
-    if temporal_check and claim_time_info and claim_time_info.get('time_type') != 'no_time_reference':
-        temporally_filtered = []
-        temporal_filtered_out = 0
-        
-        for r in filtered_results:
-            # 從證據中提取時間表達式和發布日期
-            evidence_time_data = extract_time_from_evidence(r.get('body', ''))
-            evidence_time_expr = evidence_time_data.get('time_expression')
-            evidence_pub_date = evidence_time_data.get('publish_date')
-            
-            if evidence_time_expr:
-                # 決定參考點：優先使用證據的發布日期，否則使用今天
-                if evidence_pub_date:
-                    try:
-                        # 嘗試標準化證據發布日期
-                        normalized_pub_date = normalize_time_expression(evidence_pub_date, datetime.now().isoformat())
-                        reference_date = normalized_pub_date.get('parsed_date', datetime.now().isoformat())
-                        print(f"     使用證據發布日期作為參考: {reference_date}")
-                    except:
-                        reference_date = datetime.now().isoformat()
-                        print(f"     證據發布日期標準化失敗，使用今天作為參考")
-                else:
-                    reference_date = datetime.now().isoformat()
-                
-                # 標準化證據時間（使用證據發布日期或今天作為參考點）
-                evidence_time_info = normalize_time_expression(evidence_time_expr, reference_date)
-                
-                # 檢查時間相關性（僅標記，不過濾）
-                temporal_result = is_temporally_relevant(claim_time_info, evidence_time_info)
-                
-                r['temporal_status'] = temporal_result['status']
-                r['temporal_info'] = temporal_result
-                
-                # 保留所有證據，只標記時間狀態
-                temporally_filtered.append(r)
-                
-                if not temporal_result['is_relevant']:
-                    temporal_warnings.append(
-                        f"⚠️ 證據 '{r.get('title', '')[:50]}...' 的時間 ({temporal_result['evidence_date']}) "
-                        f"不符合 claim 的時間範圍 ({temporal_result['expected_range']})，但仍保留供分析"
-                    )
-            else:
-                # 無法提取時間的證據保留
-                r['temporal_status'] = 'no_constraint'
-                temporally_filtered.append(r)
-        
-        # 移除 temporal_filtered_out 相關邏輯（不再過濾證據）
-        filtered_results = temporally_filtered
+    # 證據強化：以原文段落取代短摘要（超過時間預算的網頁維持原摘要）
+    if enrich_evidence and filtered_results:
+        enrich_with_article_text(filtered_results, claim)
+    
+    if claim_time_future is not None:
+        claim_time_info = claim_time_future.result()
+    
+    # 時間相關性檢查（如果啟用）：只標記時間狀態，不影響保留哪些證據
+    temporal_enabled = bool(
+        temporal_check and claim_time_info and claim_time_info.get('time_type') != 'no_time_reference'
+    )
     
     # === Step 5: 分析每個證據 ===    # 如果過濾後沒有結果，返回證據不足
     if len(filtered_results) == 0:
@@ -437,15 +848,41 @@ def verify_claim(claim, language="zh-TW", temporal_check=True, claim_reference_d
         "irrelevant": []
     }
     
-    for r in filtered_results:
+    # concurrent 模式：時間檢查在背景與立場分析同時進行，最後再合併
+    temporal_future = None
+    if temporal_enabled and temporal_mode != "lazy":
+        temporal_future = phase_pool.submit(_evaluate_temporal, filtered_results, claim_time_info, evidence_pool)
+    
+    if stance_mode == "batch":
+        stances = analyze_evidence_stances_batch(claim, filtered_results)
+    elif stance_mode == "sequential":
+        stances = analyze_evidence_stances_sequential(claim, filtered_results, early_stop_k, stance_concurrency)
+    else:
+        stances = analyze_evidence_stances_parallel(claim, filtered_results, stance_concurrency)
+    
+    if temporal_future is not None:
+        _merge_temporal(filtered_results, temporal_future.result(), temporal_warnings)
+    elif temporal_enabled:
+        # lazy 模式：只為支持/反駁的證據標記時間，不相關的證據不需要解析日期
+        decisive = [r for r, stance in zip(filtered_results, stances) if stance in ("support", "refute")]
+        if decisive:
+            _merge_temporal(decisive, _evaluate_temporal(decisive, claim_time_info, evidence_pool), temporal_warnings)
+        print(f"     Lazy temporal check: {len(decisive)}/{len(filtered_results)} sources dated")
+    
+    # sequential 模式提前停止時，未判斷的證據不列入任何分類
+    skipped_count = sum(1 for stance in stances if stance is None)
+    
+    for r, stance in zip(filtered_results, stances):
+        if stance is None:
+            continue
         title = r.get('title', '')
         body = r.get('body', '')
-        stance = analyze_evidence_stance(claim, title, body)
         
         evidence_item = {
             "title": title,
-            "snippet": body[:200] + "..." if len(body) > 200 else body,
-            "href": r.get('href', '')
+            "snippet": body,
+            "href": r.get('href', ''),
+            "source_tier": get_source_credibility_tier(r.get('href', ''))
         }
         
         # 加入時間資訊（如果有）
@@ -454,14 +891,33 @@ def verify_claim(claim, language="zh-TW", temporal_check=True, claim_reference_d
         
         categorized_evidence[stance].append(evidence_item)
     
-    support_count = len(categorized_evidence["support"])
-    refute_count = len(categorized_evidence["refute"])
     irrelevant_count = len(categorized_evidence["irrelevant"])
     
     # 加上被預過濾掉的數量
     total_irrelevant = irrelevant_count + filtered_out
     
-    print(f"     Support: {support_count}, Refute: {refute_count}, Irrelevant: {total_irrelevant} (pre-filtered: {filtered_out})")
+    # 壓縮證據內容：去除重複片段，並依支持/反駁數量分配 verdict 的 token 預算
+    shown_count = len(categorized_evidence["support"]) + len(categorized_evidence["refute"])
+    budget_report = {"tokens_before": 0, "tokens_after": 0, "tokens_saved": 0, "duplicates_removed": 0}
+    for category in ("support", "refute"):
+        if not categorized_evidence[category]:
+            continue
+        budget = TOKEN_BUDGETS["verdict"] * len(categorized_evidence[category]) // shown_count
+        categorized_evidence[category], report = compact_evidence(
+            categorized_evidence[category], budget, text_key="snippet"
+        )
+        for key in budget_report:
+            budget_report[key] += report[key]
+    record_savings("verdict", budget_report)
+    if budget_report["tokens_saved"]:
+        print(f"     Context compaction: ~{budget_report['tokens_before']} → ~{budget_report['tokens_after']} tokens "
+              f"(saved ~{budget_report['tokens_saved']}, {budget_report['duplicates_removed']} duplicate(s) removed)")
+    
+    # 去重後才計數：重複轉載的同一則報導只算一次，與 verdict 實際看到的證據一致
+    support_count = len(categorized_evidence["support"])
+    refute_count = len(categorized_evidence["refute"])
+    print(f"     Support: {support_count}, Refute: {refute_count}, Irrelevant: {total_irrelevant} (pre-filtered: {filtered_out})"
+          + (f", Skipped: {skipped_count}" if skipped_count else ""))
     
     # 建立分類後的證據摘要給LLM
     context = ""
@@ -469,12 +925,12 @@ def verify_claim(claim, language="zh-TW", temporal_check=True, claim_reference_d
     if categorized_evidence["support"]:
         context += "=== Supporting Evidence ===\n"
         for i, ev in enumerate(categorized_evidence["support"], 1):
-            context += f"{i}. [{ev['title']}]\n   {ev['snippet']}\n\n"
+            context += f"{i}. [{ev['title']}]{_tier_label(ev)}\n   {ev['snippet']}\n\n"
     
     if categorized_evidence["refute"]:
         context += "=== Refuting Evidence ===\n"
         for i, ev in enumerate(categorized_evidence["refute"], 1):
-            context += f"{i}. [{ev['title']}]\n   {ev['snippet']}\n\n"
+            context += f"{i}. [{ev['title']}]{_tier_label(ev)}\n   {ev['snippet']}\n\n"
     
     if categorized_evidence["irrelevant"]:
         context += f"=== Irrelevant Evidence ({total_irrelevant} sources total, {filtered_out} pre-filtered) ===\n(Not shown for brevity)\n\n"
@@ -510,7 +966,7 @@ def verify_claim(claim, language="zh-TW", temporal_check=True, claim_reference_d
 
     user = f"Claim:\n{claim}\n\n{context}"
 
-    out = call_llm(system, user)
+    out = call_llm(system, user, call_site="verdict")
 
     try:
         result = parse_json_response(out)
@@ -521,6 +977,8 @@ def verify_claim(claim, language="zh-TW", temporal_check=True, claim_reference_d
             "refute": refute_count,
             "irrelevant": total_irrelevant
         }
+        if stance_mode == "sequential":
+            result['evidence_breakdown']['skipped'] = skipped_count
         if evidence_warning:
             result['explanation'] = evidence_warning + "\n\n" + result['explanation']
         
@@ -538,6 +996,7 @@ def verify_claim(claim, language="zh-TW", temporal_check=True, claim_reference_d
             "evidence_breakdown": {
                 "support": support_count,
                 "refute": refute_count,
-                "irrelevant": total_irrelevant
+                "irrelevant": total_irrelevant,
+                **({"skipped": skipped_count} if stance_mode == "sequential" else {})
             }
         }
@@ -130,6 +130,11 @@ async function verifyText(text, language = "zh-TW", publishDate = null) {
     if (publishDate) {
       payload.publishDate = publishDate;
     }
+
+    // QA 模式使用串流回應，逐字顯示答案
+    if (mode === "qa") {
+      payload.stream = true;
+    }
     
     const res = await fetch("http://127.0.0.1:5000/verify", {
       method: "POST",
@@ -142,6 +147,11 @@ async function verifyText(text, language = "zh-TW", publishDate = null) {
       return;
     }
 
+    if (payload.stream && res.body) {
+      await renderQAStream(res, text);
+      return;
+    }
+
     const data = await res.json();
     
     if (data.error) {
@@ -157,6 +167,45 @@ async function verifyText(text, language = "zh-TW", publishDate = null) {
   }
 }
 
+// ---- Render streamed QA answer (newline-delimited JSON events) ----
+async function renderQAStream(res, question) {
+  output.innerHTML = `
+    <h3>👤 You</h3>
+    <p id="qaQuestion"></p>
+
+    <h3>🧠 Agent</h3>
+    <p id="qaAnswer"></p>
+  `;
+  document.getElementById("qaQuestion").textContent = question;
+  const answerEl = document.getElementById("qaAnswer");
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  const handleLine = (line) => {
+    if (!line.trim()) return;
+    const event = JSON.parse(line);
+    if (event.type === "token") {
+      answerEl.textContent += event.content;
+    } else if (event.type === "done") {
+      // 以完整答案為準（失敗時顯示錯誤訊息）
+      answerEl.textContent = event.answer;
+    }
+  };
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    const lines = buffer.split("\n");
+    buffer = lines.pop();
+    lines.forEach(handleLine);
+  }
+  handleLine(buffer);
+}
+
 // ---- Output layout ----
 function renderResult(result) {
   // 根據不同模式渲染不同格式
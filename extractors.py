@@ -53,7 +53,7 @@ def extract_title_and_details(text, language="zh-TW", extract_time=False):
         "The extracted title and details MUST be in the language specified above."
     )
     
-    out = call_llm(system, text)
+    out = call_llm(system, text, call_site="extraction")
 
     try:
         # Debug: 顯示 LLM 原始回應
@@ -130,7 +130,7 @@ def extract_claims(text, language="zh-TW"):
     )
     
     try:
-        out = call_llm(system, text)
+        out = call_llm(system, text, call_site="extraction")
         claims = parse_json_response(out)
         if isinstance(claims, list):
             return claims[:5]  # 最多5個
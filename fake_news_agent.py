@@ -5,7 +5,8 @@ Fake News Verification Agent (Refactored)
 import json
 from llm_helpers import call_llm, parse_json_response
 from extractors import extract_title_and_details, extract_claims
-from evidence_processor import verify_claim
+from evidence_processor import verify_claim, plan_search_queries
+from evidence_pool import EvidencePool
 
 
 class FakeNewsAgent:
@@ -84,7 +85,7 @@ class FakeNewsAgent:
         user = f"Details verification:\n{details_summary}"
         
         try:
-            out = call_llm(system, user)
+            out = call_llm(system, user, call_site="title_judge")
             result = parse_json_response(out)
             
             # 標準化credibility值
@@ -160,6 +161,9 @@ class FakeNewsAgent:
         # 偵測是否為新聞文章結構（包含 "Title:" 和 "Content:"）
         is_news_article = ("Title:" in text and "Content:" in text)
         
+        # 同一篇文章的各個 detail / claim 共用證據池（相同 URL 只解析一次時間）
+        evidence_pool = EvidencePool()
+        
         if is_news_article:
             # === 模式 A: 新聞文章驗證（三層架構）===
             print("[MODE] News Article Verification (Title→Details→Evidence)\n")
@@ -176,6 +180,9 @@ class FakeNewsAgent:
             print(f"Found {len(details)} verifiable details")
             print()
 
+            # 一次 LLM 呼叫規劃所有 detail 的搜尋關鍵字
+            search_queries = plan_search_queries(title, details)
+            
             # Step 2: Verify each detail
             detail_results = []
             temporal_warnings = []
@@ -187,7 +194,9 @@ class FakeNewsAgent:
                     detail, 
                     language=language,
                     temporal_check=temporal_check,
-                    claim_reference_date=publish_date  # 使用新聞發布日期作為參考點
+                    claim_reference_date=publish_date,  # 使用新聞發布日期作為參考點
+                    evidence_pool=evidence_pool,
+                    search_query=search_queries[i - 1]
                 )
                 
                 detail_result = {
@@ -207,6 +216,8 @@ class FakeNewsAgent:
                 detail_results.append(detail_result)
                 print(f"  Verdict: {verification['verdict']} ({verification.get('evidence_count', 0)} sources)\n")
 
+            print(f"Evidence pool: {evidence_pool.stats()}\n")
+            
             # Step 3: Aggregate to judge title
             print(f"Step 3: Judging title based on detail verification...")
             title_verdict = self.judge_title_from_details(title, detail_results, language)
@@ -237,6 +248,8 @@ class FakeNewsAgent:
             claims = extract_claims(text, language=language)
             print(f"Found {len(claims)} claims\n")
 
+            search_queries = plan_search_queries(None, claims)
+            
             # Step 2: Verify each claim
             results = []
             temporal_warnings = []
@@ -248,7 +261,9 @@ class FakeNewsAgent:
                     claim, 
                     language=language,
                     temporal_check=temporal_check,
-                    claim_reference_date=publish_date  # 使用發布日期（一般文字可能沒有）
+                    claim_reference_date=publish_date,  # 使用發布日期（一般文字可能沒有）
+                    evidence_pool=evidence_pool,
+                    search_query=search_queries[i - 1]
                 )
                 
                 result_item = {
@@ -268,6 +283,8 @@ class FakeNewsAgent:
                 results.append(result_item)
                 print(f"  Verdict: {verification['verdict']} ({verification.get('evidence_count', 0)} sources)\n")
 
+            print(f"Evidence pool: {evidence_pool.stats()}\n")
+            
             # Step 3: Aggregate results
             print("Step 3: Aggregating results...")
             credibility, counts = self.aggregate_results(results)
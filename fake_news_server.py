@@ -1,7 +1,13 @@
-from flask import Flask, request, jsonify
+import json
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from fake_news_agent import FakeNewsAgent
 from qa_agent import QAAgent
+from llm_client import get_llm_client, get_async_llm_client, get_circuit_breaker
+from llm_cache import get_llm_cache
+from token_budget import get_budget_stats
+from llm_helpers import get_model_usage, llm_flight, async_llm_flight
+from qa_tool import search_flight, search_cache
 
 app = Flask(__name__)
 
@@ -35,8 +41,31 @@ def verify():
     if not text:
         return jsonify({"error": "No text provided"}), 400
 
+    # LLM Gateway 斷路器開啟時直接拒絕，避免請求排隊等待逾時
+    breaker = get_circuit_breaker()
+    if breaker.state == "open":
+        retry_after = breaker.retry_after()
+        print(f"[POST /verify] LLM gateway unavailable, shedding request (retry after {retry_after}s)")
+        return (
+            jsonify({"error": f"LLM gateway temporarily unavailable. Please retry in {retry_after} seconds."}),
+            503,
+            {"Retry-After": str(retry_after)}
+        )
+
     if mode == "qa":
         # ---- QA MODE ----
+        if data.get("stream"):
+            # 串流模式：逐段回傳 newline-delimited JSON
+            def generate():
+                for event in qa_agent.stream_answer(question=text, use_search=None):
+                    yield json.dumps(event, ensure_ascii=False) + "\n"
+
+            return Response(
+                stream_with_context(generate()),
+                mimetype="application/x-ndjson",
+                headers={"Cache-Control": "no-cache"}
+            )
+
         qa_result = qa_agent.search_and_answer(
             question=text,
             use_search=None
@@ -64,6 +93,24 @@ def health():
     return "Fake News Agent Server Running"
 
 
+@app.route("/stats")
+def stats():
+    return jsonify({
+        "llm_client": get_llm_client().stats(),
+        "async_llm_client": get_async_llm_client().stats(),
+        "llm_cache": get_llm_cache().stats(),
+        "circuit_breaker": get_circuit_breaker().snapshot(),
+        "token_budget": get_budget_stats(),
+        "model_usage": get_model_usage(),
+        "search_cache": search_cache.stats(),
+        "singleflight": {
+            "llm": llm_flight.stats(),
+            "async_llm": async_llm_flight.stats(),
+            "web_search": search_flight.stats()
+        }
+    })
+
+
 if __name__ == "__main__":
     print("🚀 Starting Fake News Agent Server on http://127.0.0.1:5000")
     app.run(host="127.0.0.1", port=5000, debug=False)
@@ -0,0 +1,252 @@
+"""
+Gazetteer
+地名辭典：以 Aho-Corasick 自動機掃描文字一次，找出所有地名並對應到「國家 / 行政區 / 城市」階層
+
+- 地名資料：data/gazetteer.tsv（可用 GAZETTEER_PATH 覆寫），匯入模組時建立自動機
+- 比對成本只與文字長度有關，不隨地名數量增加
+- 重疊的候選取最左、最長者（「新北市」不會再算出「北市」、「內蒙古」不會算出「蒙古」）
+- 英文地名須為完整單字且區分大小寫；中文地名後面接「路 / 街」時視為路名（例如台北的南京東路）
+- 同名地點（例如台北市與基隆市都有「信義區」）會一起返回，由呼叫端決定如何使用
+- 兩字中文簡稱可能只是一般詞彙的一部分，需要確定是地名時以 is_unambiguous 檢查（知名地點除外）
+"""
+import os
+import re
+from collections import deque
+
+GAZETTEER_PATH = os.getenv(
+    "GAZETTEER_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gazetteer.tsv")
+)
+
+_CJK_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+# 地名後面接路名後綴：南京東路、重慶南路一段、中山北路、廣州街
+_STREET_RE = re.compile(r"[東西南北中]?[一二三四五六七八九十]?[路街巷]|大道")
+# 行政區後綴：接在兩字簡稱後面時表示確實是地名（本州 → 本州島、安順 → 安順縣）
+_ADMIN_SUFFIX_RE = re.compile(r"[\u5e02\u7e23\u53bf\u5340\u533a\u7701\u5dde\u90fd\u5e9c\u9053\u90e1\u93ae\u9547\u9109\u4e61\u5cf6\u5c9b]")
+
+
+def _is_word_char(c):
+    """英文等拼音文字的字元（中文字不算，中文地名不需要單字邊界）"""
+    return c.isalnum() and not _CJK_RE.match(c)
+
+
+def load_places(path):
+    """
+    讀取地名資料檔（TSV：kind, country, parent, names[, flags]）
+
+    Args:
+        path: 資料檔路徑
+
+    Returns:
+        地點列表，每個地點為
+        {"id": int, "name": 標準名稱, "kind": "country"|"region"|"city"|"district",
+         "country": ISO 代碼, "path": (國家, ..., 自己) 的標準名稱, "names": [所有寫法],
+         "major": 是否為知名地點}
+    """
+    rows = []
+    major = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line or line.startswith("#"):
+                continue
+            kind, country, parent, names, *flags = line.split("\t")
+            if "major" in flags:
+                major.add(len(rows))
+            rows.append((kind, country, parent, names.split("|")))
+
+    countries = {country: names[0] for kind, country, parent, names in rows if kind == "country"}
+    # 上層地點的標準名稱在同一國家內唯一；同名的區（例如兩個「信義區」）只會是最下層
+    parents = {}
+    for kind, country, parent, names in rows:
+        parents.setdefault((country, names[0]), parent)
+
+    def path_of(country, name, parent):
+        if parent:
+            return path_of(country, parent, parents.get((country, parent), "")) + (name,)
+        if country in countries and countries[country] != name:
+            return (countries[country], name)
+        return (name,)
+
+    return [
+        {
+            "id": i,
+            "name": names[0],
+            "kind": kind,
+            "country": country,
+            "path": path_of(country, names[0], parent),
+            "names": names,
+            "major": i in major,
+        }
+        for i, (kind, country, parent, names) in enumerate(rows)
+    ]
+
+
+class Gazetteer:
+    """
+    多模式比對的地名辭典（Aho-Corasick 自動機，建立後唯讀、執行緒安全）
+    """
+
+    def __init__(self, places):
+        self.places = places
+        self._places_by_name = {}
+        for place in places:
+            for name in place["names"]:
+                self._places_by_name.setdefault(name, []).append(place)
+
+        # goto：每個節點的子節點；fail：失敗連結；out：在此節點結束的地名
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for name in self._places_by_name:
+            node = 0
+            for ch in name:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append(name)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+                queue.append(child)
+
+    def find(self, text):
+        """
+        找出文字中的所有地名
+
+        Args:
+            text: 任意文字
+
+        Returns:
+            依出現位置排序的比對結果：
+            [{"text": 原文, "start": int, "end": int, "places": [地點, ...]}]
+        """
+        if not text:
+            return []
+
+        candidates = []
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for name in self._out[node]:
+                start = i + 1 - len(name)
+                if self._accept(text, start, i + 1, name):
+                    candidates.append((start, -len(name), name))
+
+        # 最左、最長且不重疊
+        matches = []
+        last_end = 0
+        for start, neg_len, name in sorted(candidates):
+            if start < last_end:
+                continue
+            end = start - neg_len
+            matches.append({"text": name, "start": start, "end": end, "places": self._places_by_name[name]})
+            last_end = end
+        return matches
+
+    @staticmethod
+    def _accept(text, start, end, name):
+        """檢查單字邊界（英文）與路名（中文）"""
+        if _is_word_char(name[0]) and start > 0 and _is_word_char(text[start - 1]):
+            return False
+        if _is_word_char(name[-1]) and end < len(text) and _is_word_char(text[end]):
+            return False
+        if _CJK_RE.match(name[-1]) and _STREET_RE.match(text, end):
+            return False
+        return True
+
+    def stats(self):
+        """
+        Returns:
+            {"places": int, "names": int, "nodes": int}
+        """
+        return {"places": len(self.places), "names": len(self._places_by_name), "nodes": len(self._goto)}
+
+
+try:
+    _gazetteer = Gazetteer(load_places(GAZETTEER_PATH))
+except (OSError, ValueError) as e:
+    print(f"  Warning: Gazetteer not loaded ({e}), location checks disabled")
+    _gazetteer = Gazetteer([])
+
+
+def find_places(text):
+    """
+    使用預設地名辭典找出文字中的所有地名（見 Gazetteer.find）
+    """
+    return _gazetteer.find(text)
+
+
+def is_unambiguous(match, text):
+    """
+    比對結果是否明確指向地名
+    兩個中文字的地名（多為簡稱）常與一般詞彙重疊（「中環境」→ 中環、「平安順利」→ 安順、
+    「本州政府」→ 本州），只有知名地點（資料檔標記 major，例如北京、東京、加州）、
+    後面接行政區後綴、或前後都不是中文字時才算明確
+
+    Args:
+        match: find_places 的單一比對結果
+        text: 比對時使用的文字
+
+    Returns:
+        True 表示明確
+    """
+    name = match["text"]
+    if len(name) > 2 or not _CJK_RE.match(name[0]):
+        return True
+    if any(place["major"] for place in match["places"]):
+        return True
+    start, end = match["start"], match["end"]
+    if _ADMIN_SUFFIX_RE.match(text, end):
+        return True
+    before = start > 0 and _CJK_RE.match(text[start - 1])
+    after = end < len(text) and _CJK_RE.match(text[end])
+    return not before and not after
+
+
+def countries_of(matches):
+    """
+    Args:
+        matches: find_places 的結果
+
+    Returns:
+        比對到的地點所屬國家代碼集合（同名地點的國家都會列入）
+    """
+    return {place["country"] for m in matches for place in m["places"]}
+
+
+if __name__ == "__main__":
+    import time
+
+    print(_gazetteer.stats())
+    for text in [
+        "台北市信義區今天凌晨發生規模6.0地震，新北市板橋也有感",
+        "Magnitude 6.0 quake hits Tokyo; no damage reported in Taipei",
+        "南京東路與重慶南路口車禍，警方封鎖現場",
+        "內蒙古與蒙古國邊境降雪",
+        "美國地質調查局表示，聖地牙哥外海發生地震",
+    ]:
+        matches = find_places(text)
+        print(text)
+        for m in matches:
+            print(f"  {m['text']:12} -> {[' / '.join(p['path']) for p in m['places']]}")
+        print(f"  countries: {sorted(countries_of(matches))}")
+
+    text = "台北今天凌晨發生地震，震央位於信義區，東京、首爾與香港均無災情傳出。" * 200
+    t0 = time.perf_counter()
+    n = len(find_places(text))
+    print(f"{len(text)} chars, {n} matches in {(time.perf_counter() - t0) * 1000:.1f} ms")
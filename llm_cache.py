@@ -0,0 +1,181 @@
+"""
+LLM Response Cache
+以 SQLite 儲存的 LLM 回應快取（內容定址：model + system prompt + user prompt）
+支援 TTL、容量上限（LRU 淘汰）與命中/未命中統計
+"""
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "llm_cache.sqlite")
+)
+CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+CACHE_DISABLED = os.getenv("LLM_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+# 超過容量時一次淘汰到容量的這個比例，避免每次寫入都觸發淘汰
+EVICT_LOW_WATER = 0.9
+
+
+def make_cache_key(model, system_prompt, user_prompt):
+    """
+    產生內容定址的快取鍵
+
+    Returns:
+        SHA-256 十六進位字串
+    """
+    h = hashlib.sha256()
+    for part in (model, system_prompt, user_prompt):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class LLMCache:
+    """
+    SQLite 快取
+    每筆資料記錄到期時間與最後存取時間，超過容量時淘汰最久未使用的項目
+    筆數在記憶體中追蹤，只有超過容量時才執行淘汰（一次淘汰到 EVICT_LOW_WATER）
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=CACHE_MAX_ENTRIES):
+        """
+        Args:
+            path: SQLite 檔案路徑（":memory:" 表示僅存在記憶體）
+            max_entries: 最多保留的快取筆數
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY,"
+                " model TEXT,"
+                " call_site TEXT,"
+                " response TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " last_access REAL NOT NULL"
+                ")"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)"
+            )
+            self._conn.commit()
+            self._size = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def get(self, key):
+        """
+        讀取快取（過期視為未命中）
+
+        Returns:
+            快取的回應文本，未命中則返回 None
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or row[1] < now:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, response, ttl, model=None, call_site=None):
+        """
+        寫入快取並在超過容量時淘汰
+
+        Args:
+            key: make_cache_key() 產生的鍵
+            response: LLM 回應文本
+            ttl: 存活秒數
+            model: 模型名稱（僅記錄用）
+            call_site: 呼叫位置（僅記錄用）
+        """
+        now = time.time()
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache "
+                "(key, model, call_site, response, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, call_site, response, now, now + ttl, now)
+            )
+            if not exists:
+                self._size += 1
+            if self._size > self.max_entries:
+                self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        """移除過期項目，再依最後存取時間淘汰到容量的 EVICT_LOW_WATER（需持有鎖）"""
+        self._conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (now,))
+        # 其他程序也可能寫入同一個檔案：淘汰時重新計算實際筆數
+        count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        target = int(self.max_entries * EVICT_LOW_WATER)
+        overflow = count - target if count > self.max_entries else 0
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+        self._size = count - overflow
+
+    def clear(self):
+        """清空快取與統計"""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Returns:
+            {"entries": int, "max_entries": int, "hits": int, "misses": int, "hit_rate": float}
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """取得程序共用的 LLMCache（第一次呼叫時建立）"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache()
+    return _cache
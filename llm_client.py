@@ -0,0 +1,637 @@
+"""
+LLM Client
+程序共用的 LLM Gateway HTTP 客戶端：連線池、keep-alive 與連線重用統計
+llm_helpers.call_llm 和 QAAgent._query_llm 都透過這裡發送請求
+AsyncLLMClient 提供 asyncio 版本，在單一背景 event loop 上以程序共用的 semaphore 限制同時進行的請求數
+兩者共用重試（指數退避 + jitter）與斷路器；同步版本另支援 hedged request
+"""
+import os
+import time
+import random
+import atexit
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+API_BASE_URL = os.getenv("API_BASE_URL")
+API_KEY = os.getenv("API_KEY")
+
+# 連線池設定（可由 .env 覆寫）
+POOL_CONNECTIONS = int(os.getenv("LLM_POOL_CONNECTIONS", "4"))   # 保留連線池的 host 數量
+POOL_MAXSIZE = int(os.getenv("LLM_POOL_MAXSIZE", "16"))          # 每個 host 保留的 keep-alive 連線數
+REQUEST_TIMEOUT = 120
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))    # async 同時進行中的請求上限
+
+# 重試設定：429 / 5xx / 連線錯誤會以指數退避（含 jitter）重試
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))      # 第一次重試前的基準等待秒數
+BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Hedged request：請求超過近期延遲的第 N 百分位仍未回應時，再送出一個相同請求，取先回來的結果
+# 0 表示關閉
+HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0"))
+HEDGE_MIN_SAMPLES = 20     # 累積足夠的延遲樣本後才開始 hedge
+LATENCY_WINDOW = 200       # 保留最近幾次成功請求的延遲
+
+# 斷路器：連續失敗達門檻後暫停送出請求，冷卻後放行一個探測請求
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """斷路器開啟中，請求未送出"""
+
+
+class CircuitBreaker:
+    """
+    Gateway 斷路器
+    closed：正常放行；open：直接拒絕（fail fast）；half_open：冷卻結束，放行一個探測請求
+    """
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        # 每次開啟斷路器時遞增；請求結果只對放行當時的世代有效
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """目前狀態：closed / open / half_open"""
+        with self._lock:
+            if self._state == "open" and time.time() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return self._state
+
+    def acquire(self):
+        """
+        取得送出請求的許可（half_open 時只放行一個探測請求）
+        請求的結果以 record_success / record_failure 帶著許可回報；
+        請求結束時（包含取消與非預期例外）必須以 finally 呼叫 release
+
+        Returns:
+            None 表示拒絕；否則為許可 (世代, 是否為探測請求)
+        """
+        with self._lock:
+            if self._state == "closed":
+                return (self._generation, False)
+            if self._state == "open" and time.time() - self._opened_at < self.reset_timeout:
+                return None
+            if self._probe_in_flight:
+                return None
+            self._state = "half_open"
+            self._probe_in_flight = True
+            return (self._generation, True)
+
+    def release(self, permit):
+        """
+        請求結束；探測請求沒有記錄成功或失敗就結束（被取消、非預期例外）時視為失敗，
+        避免斷路器停在 half_open 而永遠拒絕請求
+        """
+        with self._lock:
+            if self._is_current_probe(permit):
+                self._failures += 1
+                self._open()
+
+    def record_success(self, permit):
+        """
+        回報請求成功：探測請求成功時關閉斷路器
+        斷路器開啟前就放行、開啟後才回來的請求不影響目前狀態
+        """
+        with self._lock:
+            if permit[1]:
+                if not self._is_current_probe(permit):
+                    return
+            elif permit[0] != self._generation or self._state != "closed":
+                return
+            self._state = "closed"
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, permit):
+        """回報請求失敗：探測請求失敗或連續失敗達門檻時開啟斷路器"""
+        with self._lock:
+            if permit[1]:
+                if not self._is_current_probe(permit):
+                    return
+                self._failures += 1
+                self._open()
+            elif permit[0] == self._generation and self._state == "closed":
+                self._failures += 1
+                if self._failures >= self.failure_threshold:
+                    self._open()
+
+    def _is_current_probe(self, permit):
+        """許可是否為目前進行中的探測請求（需持有鎖）"""
+        return permit[1] and permit[0] == self._generation and self._probe_in_flight
+
+    def _open(self):
+        """開啟斷路器並進入新的世代（需持有鎖）"""
+        self._state = "open"
+        self._opened_at = time.time()
+        self._probe_in_flight = False
+        self._generation += 1
+
+    def retry_after(self):
+        """距離下次放行探測請求的秒數"""
+        with self._lock:
+            if self._state != "open":
+                return 0
+            return max(0, round(self.reset_timeout - (time.time() - self._opened_at)))
+
+    def snapshot(self):
+        """
+        Returns:
+            {"state": str, "consecutive_failures": int, "retry_after": int}
+        """
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "retry_after": self.retry_after(),
+        }
+
+
+_breaker = CircuitBreaker()
+
+
+def get_circuit_breaker():
+    """取得同步與 async 客戶端共用的斷路器"""
+    return _breaker
+
+
+def _backoff_delay(attempt, retry_after=None):
+    """
+    第 attempt 次重試前的等待秒數（full jitter）
+    Gateway 回傳 Retry-After 時以其為下限
+    """
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+    if retry_after:
+        try:
+            delay = max(delay, min(float(retry_after), BACKOFF_MAX))
+        except ValueError:
+            pass
+    return delay
+
+
+class LLMClient:
+    """
+    共用的 LLM HTTP 客戶端
+    以 requests.Session + HTTPAdapter 維持每個 host 的 keep-alive 連線，
+    避免每次呼叫都重新進行 TCP/TLS 握手
+    """
+
+    def __init__(self, base_url=None, api_key=None,
+                 pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                 max_retries=MAX_RETRIES, hedge_percentile=HEDGE_PERCENTILE, breaker=None):
+        """
+        Args:
+            base_url: Gateway 位址（預設：API_BASE_URL）
+            api_key: API 金鑰（預設：API_KEY）
+            pool_connections: 保留連線池的 host 數量
+            pool_maxsize: 每個 host 的最大連線數
+            max_retries: 429 / 5xx / 連線錯誤的重試次數
+            hedge_percentile: 觸發 hedged request 的延遲百分位（0 = 關閉）
+            breaker: 斷路器（預設：程序共用的斷路器）
+        """
+        self.base_url = base_url or API_BASE_URL
+        self.api_key = api_key or API_KEY
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Connection": "keep-alive",
+        })
+
+        self.max_retries = max_retries
+        self.hedge_percentile = hedge_percentile
+        self.breaker = breaker or get_circuit_breaker()
+        self._hedge_pool = ThreadPoolExecutor(max_workers=pool_maxsize, thread_name_prefix="llm-hedge")
+
+        self._lock = threading.Lock()
+        self._requests_per_host = {}
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._counters = {"retries": 0, "hedges_fired": 0, "hedges_won": 0}
+
+    def post_chat(self, payload, base_url=None, api_key=None, timeout=REQUEST_TIMEOUT, stream=False):
+        """
+        發送 /api/chat 請求（共用連線池）
+        429 / 5xx / 連線錯誤會退避重試；斷路器開啟時直接拋出 CircuitOpenError
+
+        Args:
+            payload: 請求內容（model, messages, stream...）
+            base_url: 覆寫 Gateway 位址（QAAgent 可自訂）
+            api_key: 覆寫 API 金鑰
+            timeout: 逾時秒數
+            stream: 是否以串流方式讀取回應（串流請求不做 hedge）
+
+        Returns:
+            requests.Response（已檢查 HTTP 狀態碼）
+        """
+        base_url = base_url or self.base_url
+        api_key = api_key or self.api_key
+        if not api_key:
+            raise RuntimeError("API_KEY not set")
+
+        permit = self.breaker.acquire()
+        if permit is None:
+            raise CircuitOpenError(
+                f"LLM gateway circuit open, retry after {self.breaker.retry_after()}s"
+            )
+        try:
+            return self._post_with_retries(payload, base_url, api_key, timeout, stream, permit)
+        finally:
+            self.breaker.release(permit)
+
+    def _post_with_retries(self, payload, base_url, api_key, timeout, stream, permit):
+        """
+        post_chat 的重試迴圈（429 / 5xx / 連線錯誤退避重試，結果記錄到斷路器）
+        讀取逾時不重試：每次嘗試都可能再等滿 timeout 秒，重試只會讓尾端延遲更長
+        """
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            try:
+                if stream:
+                    r = self._send(base_url, api_key, payload, timeout, stream=True)
+                else:
+                    r = self._send_hedged(base_url, api_key, payload, timeout)
+            except requests.exceptions.ReadTimeout:
+                self.breaker.record_failure(permit)
+                raise
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if last_attempt:
+                    self.breaker.record_failure(permit)
+                    raise
+                self._count("retries")
+                time.sleep(_backoff_delay(attempt))
+                continue
+
+            if r.status_code in RETRY_STATUS_CODES:
+                if last_attempt:
+                    self.breaker.record_failure(permit)
+                    r.raise_for_status()
+                self._count("retries")
+                retry_after = r.headers.get("Retry-After")
+                r.close()
+                time.sleep(_backoff_delay(attempt, retry_after))
+                continue
+
+            # 其他 4xx 是請求本身的問題，不計入斷路器
+            self.breaker.record_success(permit)
+            r.raise_for_status()
+            return r
+
+    def _send(self, base_url, api_key, payload, timeout, stream=False):
+        """送出單一 HTTP 請求並記錄延遲"""
+        start = time.time()
+        r = self.session.post(
+            f"{base_url}/api/chat",
+            headers={"Authorization": f"Bearer {api_key}"},
+            json=payload,
+            timeout=timeout,
+            stream=stream,
+        )
+
+        host = requests.utils.urlparse(base_url).netloc
+        with self._lock:
+            self._requests_per_host[host] = self._requests_per_host.get(host, 0) + 1
+            if r.ok and not stream:
+                self._latencies.append(time.time() - start)
+        return r
+
+    def _hedge_threshold(self):
+        """近期延遲的 HEDGE_PERCENTILE 百分位（秒），樣本不足或未啟用時返回 None"""
+        if self.hedge_percentile <= 0:
+            return None
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * self.hedge_percentile / 100))
+        return samples[index]
+
+    def _send_hedged(self, base_url, api_key, payload, timeout):
+        """
+        送出請求；超過延遲門檻仍未回應時再送一個相同請求，取先成功回來的結果
+        未啟用 hedge 時等同 _send
+        """
+        threshold = self._hedge_threshold()
+        if threshold is None:
+            return self._send(base_url, api_key, payload, timeout)
+
+        primary = self._hedge_pool.submit(self._send, base_url, api_key, payload, timeout)
+        done, _ = wait([primary], timeout=threshold)
+        if done:
+            return primary.result()
+
+        self._count("hedges_fired")
+        hedge = self._hedge_pool.submit(self._send, base_url, api_key, payload, timeout)
+        pending = {primary, hedge}
+        first_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    r = future.result()
+                except requests.exceptions.RequestException as e:
+                    first_error = first_error or e
+                    continue
+                if r.ok or not pending:
+                    if future is hedge:
+                        self._count("hedges_won")
+                    # 較慢的那個請求回來後直接關閉
+                    for other in pending:
+                        other.add_done_callback(_close_response)
+                    return r
+                r.close()
+        raise first_error
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self):
+        """
+        連線重用統計
+
+        Returns:
+            {
+                "pool_connections": int,
+                "pool_maxsize": int,
+                "requests": int,
+                "connections_opened": int,
+                "connections_reused": int,
+                "per_host": {host: {"requests", "connections_opened", "connections_reused"}},
+                "hedge_threshold_seconds": float | None,
+                "circuit_breaker": CircuitBreaker.snapshot(),
+                "retries": int, "hedges_fired": int, "hedges_won": int
+            }
+        """
+        # urllib3 的每個連線池會記錄它建立過的連線數
+        opened_per_host = {}
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = pool.host if pool.port in (None, 80, 443) else f"{pool.host}:{pool.port}"
+            opened_per_host[host] = opened_per_host.get(host, 0) + pool.num_connections
+
+        with self._lock:
+            requests_per_host = dict(self._requests_per_host)
+
+        per_host = {}
+        for host, count in requests_per_host.items():
+            opened = opened_per_host.get(host, 0)
+            per_host[host] = {
+                "requests": count,
+                "connections_opened": opened,
+                "connections_reused": max(count - opened, 0),
+            }
+
+        total_requests = sum(h["requests"] for h in per_host.values())
+        total_opened = sum(h["connections_opened"] for h in per_host.values())
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "pool_connections": self.pool_connections,
+            "pool_maxsize": self.pool_maxsize,
+            "requests": total_requests,
+            "connections_opened": total_opened,
+            "connections_reused": max(total_requests - total_opened, 0),
+            "per_host": per_host,
+            "hedge_threshold_seconds": self._hedge_threshold(),
+            "circuit_breaker": self.breaker.snapshot(),
+            **counters,
+        }
+
+
+def _close_response(future):
+    """hedge 落敗的請求完成後釋放連線"""
+    try:
+        future.result().close()
+    except Exception:
+        pass
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client():
+    """取得程序共用的 LLMClient（第一次呼叫時建立）"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient()
+    return _client
+
+
+class AsyncLLMClient:
+    """
+    asyncio 版本的 LLM 客戶端
+    請求一律在客戶端自己的背景 event loop（llm-async 執行緒）上送出：
+    整個程序只有一個 aiohttp.ClientSession 與一個 semaphore，
+    LLM_MAX_CONCURRENCY 是所有 event loop / 執行緒共用的上限，不需要為每個請求佔用一條執行緒
+    """
+
+    def __init__(self, base_url=None, api_key=None,
+                 max_concurrency=MAX_CONCURRENCY, pool_maxsize=POOL_MAXSIZE,
+                 max_retries=MAX_RETRIES, breaker=None):
+        """
+        Args:
+            base_url: Gateway 位址（預設：API_BASE_URL）
+            api_key: API 金鑰（預設：API_KEY）
+            max_concurrency: 同時進行中的請求上限（程序共用）
+            pool_maxsize: 每個 host 的最大連線數
+            max_retries: 429 / 5xx / 連線錯誤的重試次數
+            breaker: 斷路器（預設：與同步客戶端共用）
+        """
+        self.base_url = base_url or API_BASE_URL
+        self.api_key = api_key or API_KEY
+        self.max_concurrency = max_concurrency
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.breaker = breaker or get_circuit_breaker()
+        self.in_flight = 0
+        self.requests = 0
+        self._loop = None
+        self._session = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self):
+        """取得背景 event loop（第一次呼叫時啟動 llm-async 執行緒）"""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-async", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coro):
+        """
+        在背景 event loop 上執行 coroutine 並等待結果（給同步程式碼 fan out 使用）
+
+        Args:
+            coro: coroutine（內部可 await post_chat / async_call_llm）
+
+        Returns:
+            coroutine 的返回值
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop()).result()
+
+    async def post_chat(self, payload, base_url=None, api_key=None, timeout=REQUEST_TIMEOUT):
+        """
+        發送 /api/chat 請求（受程序共用的 semaphore 限制，與同步版本相同的重試與斷路器規則）
+        可在任何 event loop 中 await；呼叫端取消（task.cancel / asyncio.wait_for 逾時）時
+        會中斷背景 loop 上的請求並釋放名額
+
+        Args:
+            payload: 請求內容
+            base_url: 覆寫 Gateway 位址
+            api_key: 覆寫 API 金鑰
+            timeout: 單次請求逾時秒數（不含排隊等待時間）
+
+        Returns:
+            回應 JSON（dict）
+        """
+        coro = self._post_chat(payload, base_url or self.base_url, api_key or self.api_key, timeout)
+        loop = self._get_loop()
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    async def _post_chat(self, payload, base_url, api_key, timeout):
+        """在背景 event loop 上執行的 post_chat 本體"""
+        if not api_key:
+            raise RuntimeError("API_KEY not set")
+
+        permit = self.breaker.acquire()
+        if permit is None:
+            raise CircuitOpenError(
+                f"LLM gateway circuit open, retry after {self.breaker.retry_after()}s"
+            )
+        try:
+            return await self._post_with_retries(payload, base_url, api_key, timeout, permit)
+        finally:
+            # 取消（CancelledError）也會經過這裡
+            self.breaker.release(permit)
+
+    async def _post_with_retries(self, payload, base_url, api_key, timeout, permit):
+        """_post_chat 的重試迴圈（逾時不重試，理由同 LLMClient._post_with_retries）"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=self.pool_maxsize),
+                headers={"Content-Type": "application/json"},
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        session, semaphore = self._session, self._semaphore
+
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            retry_after = None
+            async with semaphore:
+                self.in_flight += 1
+                self.requests += 1
+                try:
+                    async with session.post(
+                        f"{base_url}/api/chat",
+                        headers={"Authorization": f"Bearer {api_key}"},
+                        json=payload,
+                        timeout=aiohttp.ClientTimeout(total=timeout),
+                    ) as r:
+                        if r.status in RETRY_STATUS_CODES and not last_attempt:
+                            retry_after = r.headers.get("Retry-After")
+                        else:
+                            if r.status in RETRY_STATUS_CODES:
+                                self.breaker.record_failure(permit)
+                            else:
+                                self.breaker.record_success(permit)
+                            r.raise_for_status()
+                            return await r.json(content_type=None)
+                except asyncio.TimeoutError:
+                    self.breaker.record_failure(permit)
+                    raise
+                except aiohttp.ClientConnectionError:
+                    if last_attempt:
+                        self.breaker.record_failure(permit)
+                        raise
+                finally:
+                    self.in_flight -= 1
+
+            # 退避期間不佔用 semaphore 名額
+            await asyncio.sleep(_backoff_delay(attempt, retry_after))
+
+    async def aclose(self):
+        """關閉 session（可在任何 event loop 中 await）"""
+        with self._lock:
+            loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        if asyncio.get_running_loop() is loop:
+            await self._close_session()
+        else:
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._close_session(), loop))
+
+    async def _close_session(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def close(self):
+        """關閉 session 並停止背景 event loop（程序結束時自動呼叫）"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None or loop.is_closed() or not loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_session(), loop).result(timeout=5)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+
+    def stats(self):
+        """
+        Returns:
+            {"max_concurrency": int, "in_flight": int, "requests": int}
+        """
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+        }
+
+
+_async_client = None
+
+
+def get_async_llm_client():
+    """取得程序共用的 AsyncLLMClient（第一次呼叫時建立）"""
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = AsyncLLMClient()
+                atexit.register(_async_client.close)
+    return _async_client
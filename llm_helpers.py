@@ -4,23 +4,115 @@ LLM Helper Functions
 """
 import os
 import json
-import requests
+import asyncio
+import threading
 from dotenv import load_dotenv
+from llm_client import get_llm_client, get_async_llm_client
+from llm_cache import get_llm_cache, make_cache_key, CACHE_DISABLED
+from singleflight import SingleFlight, AsyncSingleFlight
 
 load_dotenv()
 
 API_BASE_URL = os.getenv("API_BASE_URL")
 API_KEY = os.getenv("API_KEY")
-MODEL = "gpt-oss:20b"
+MODEL = os.getenv("LLM_MODEL", "gpt-oss:20b")
+FAST_MODEL = os.getenv("LLM_FAST_MODEL", MODEL)   # 分類/抽取等簡單任務使用的較小模型
 
+# 各呼叫位置使用的模型；可用 LLM_MODEL_<CALL_SITE>（例如 LLM_MODEL_STANCE）個別覆寫
+MODEL_ROUTES = {
+    "extraction": MODEL,              # 標題/細節/主張抽取
+    "query_generation": FAST_MODEL,   # 搜尋關鍵字
+    "stance": FAST_MODEL,             # 證據立場（單字標籤）
+    "temporal": FAST_MODEL,           # 時間表達式抽取/標準化
+    "verdict": MODEL,                 # 主張最終判斷
+    "title_judge": MODEL,             # 標題可信度判斷
+    "qa": MODEL,                      # QA 問答
+}
 
-def call_llm(system_prompt, user_prompt):
+# 各呼叫位置的快取存活時間（秒），未列出的呼叫位置不快取
+CACHE_TTLS = {
+    "query_generation": 24 * 3600,   # 搜尋關鍵字
+    "temporal": 7 * 24 * 3600,       # 時間表達式抽取/標準化（參考日期已包含在 prompt 中）
+    "stance": 24 * 3600,             # 證據立場
+}
+
+
+_usage_lock = threading.Lock()
+_model_usage = {}
+
+# 相同 (model, system prompt, user prompt) 的並行呼叫只送出一次
+llm_flight = SingleFlight("llm")
+async_llm_flight = AsyncSingleFlight("async_llm")
+
+
+def get_model(call_site=None):
+    """
+    取得呼叫位置對應的模型
+    
+    Args:
+        call_site: 呼叫位置名稱（見 MODEL_ROUTES）
+    
+    Returns:
+        模型名稱（環境變數 LLM_MODEL_<CALL_SITE> 優先）
+    """
+    if call_site:
+        override = os.getenv(f"LLM_MODEL_{call_site.upper()}")
+        if override:
+            return override
+    return MODEL_ROUTES.get(call_site, MODEL)
+
+
+def record_model_usage(call_site, model):
+    """記錄實際提供回應的模型（每個呼叫位置分別計數）"""
+    with _usage_lock:
+        site = _model_usage.setdefault(call_site or "default", {})
+        site[model] = site.get(model, 0) + 1
+
+
+def get_model_usage():
+    """
+    Returns:
+        {call_site: {model: 呼叫次數}}
+    """
+    with _usage_lock:
+        return {site: dict(models) for site, models in _model_usage.items()}
+
+
+def _build_payload(model, system_prompt, user_prompt):
+    """組出 /api/chat 的請求內容"""
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        "stream": False,
+    }
+
+
+def _cache_lookup(model, system_prompt, user_prompt, call_site, use_cache):
+    """
+    查詢快取
+
+    Returns:
+        (cache_key, ttl, cached) - 不可快取時 cache_key 為 None；未命中時 cached 為 None
+    """
+    ttl = CACHE_TTLS.get(call_site)
+    if not ttl or not use_cache or CACHE_DISABLED:
+        return None, None, None
+    cache_key = make_cache_key(model, system_prompt, user_prompt)
+    return cache_key, ttl, get_llm_cache().get(cache_key)
+
+
+def call_llm(system_prompt, user_prompt, call_site=None, use_cache=True):
     """
     調用 LLM API 並返回回應內容
     
     Args:
         system_prompt: 系統提示詞
         user_prompt: 使用者提示詞
+        call_site: 呼叫位置名稱（決定使用的模型與快取 TTL，見 MODEL_ROUTES / CACHE_TTLS）
+        use_cache: False 則略過快取（強制重新呼叫 LLM）
     
     Returns:
         LLM 的回應文本
@@ -28,28 +120,95 @@ def call_llm(system_prompt, user_prompt):
     if not API_KEY:
         raise RuntimeError("API_KEY not set")
     
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "Content-Type": "application/json",
-    }
+    model = get_model(call_site)
+    cache_key, ttl, cached = _cache_lookup(model, system_prompt, user_prompt, call_site, use_cache)
+    if cached is not None:
+        return cached
     
-    payload = {
-        "model": MODEL,
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        "stream": False,
-    }
+    payload = _build_payload(model, system_prompt, user_prompt)
+    
+    def fetch():
+        # 透過共用連線池發送，重用 keep-alive 連線
+        r = get_llm_client().post_chat(payload, base_url=API_BASE_URL, api_key=API_KEY, timeout=120)
+        data = r.json()
+        content = data["message"]["content"]
+        record_model_usage(call_site, data.get("model", model))
+        
+        if cache_key:
+            get_llm_cache().set(cache_key, content, ttl, model=model, call_site=call_site)
+        return content
+    
+    # 同樣的請求正在進行中時，等待並共用它的結果
+    flight_key = cache_key or make_cache_key(model, system_prompt, user_prompt)
+    return llm_flight.do(flight_key, fetch)
+
+
+async def async_call_llm(system_prompt, user_prompt, call_site=None, use_cache=True, timeout=120):
+    """
+    call_llm 的 asyncio 版本
+    所有 async 呼叫共用 AsyncLLMClient 的程序級 semaphore（LLM_MAX_CONCURRENCY），
+    可用 asyncio.gather 同時送出多個請求而不需額外執行緒；同步程式碼可透過 run_async 使用
+    
+    Args:
+        system_prompt: 系統提示詞
+        user_prompt: 使用者提示詞
+        call_site: 呼叫位置名稱（決定使用的模型與快取 TTL，見 MODEL_ROUTES / CACHE_TTLS）
+        use_cache: False 則略過快取
+        timeout: 整個呼叫的逾時秒數（包含排隊等待），逾時拋出 asyncio.TimeoutError
+    
+    Returns:
+        LLM 的回應文本
+    """
+    if not API_KEY:
+        raise RuntimeError("API_KEY not set")
     
-    r = requests.post(
-        f"{API_BASE_URL}/api/chat",
-        headers=headers,
-        json=payload,
-        timeout=120,
-    )
-    r.raise_for_status()
-    return r.json()["message"]["content"]
+    model = get_model(call_site)
+    cache_key, ttl, cached = _cache_lookup(model, system_prompt, user_prompt, call_site, use_cache)
+    if cached is not None:
+        return cached
+    
+    payload = _build_payload(model, system_prompt, user_prompt)
+    
+    async def fetch():
+        data = await get_async_llm_client().post_chat(
+            payload, base_url=API_BASE_URL, api_key=API_KEY, timeout=timeout
+        )
+        content = data["message"]["content"]
+        record_model_usage(call_site, data.get("model", model))
+        
+        if cache_key:
+            get_llm_cache().set(cache_key, content, ttl, model=model, call_site=call_site)
+        return content
+    
+    # 同樣的請求正在進行中時共用同一個 task；個別呼叫逾時不會取消其他等待者，全部離開時才取消請求
+    flight_key = cache_key or make_cache_key(model, system_prompt, user_prompt)
+    return await asyncio.wait_for(async_llm_flight.do(flight_key, fetch), timeout=timeout)
+
+
+async def async_call_llm_json(system_prompt, user_prompt, call_site=None, use_cache=True, timeout=120):
+    """
+    async_call_llm + parse_json_response
+    
+    Returns:
+        解析後的 Python 對象（dict 或 list）
+    """
+    out = await async_call_llm(system_prompt, user_prompt, call_site=call_site,
+                               use_cache=use_cache, timeout=timeout)
+    return parse_json_response(out)
+
+
+def run_async(coro):
+    """
+    在 AsyncLLMClient 的背景 event loop 上執行 coroutine 並等待結果
+    讓同步程式碼以 asyncio.gather 同時送出多個 async_call_llm，而不需要每個請求一條執行緒
+    
+    Args:
+        coro: coroutine
+    
+    Returns:
+        coroutine 的返回值
+    """
+    return get_async_llm_client().run(coro)
 
 
 def parse_json_response(llm_output):
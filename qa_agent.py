@@ -8,6 +8,9 @@ import json
 import os
 from dotenv import load_dotenv
 from qa_tool import web_search, format_search_results
+from llm_client import get_llm_client
+from llm_helpers import get_model, record_model_usage
+from token_budget import TOKEN_BUDGETS, compact_evidence, record_savings
 
 # Load environment variables
 load_dotenv()
@@ -37,12 +40,7 @@ class QAAgent:
         if not self.api_key:
             raise ValueError("API_KEY not found. Please set it in .env file.")
         
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        self.default_model = "gpt-oss:20b"
+        self.default_model = get_model("qa")
         self.conversation_history = []
         self.max_history = 5  # Keep last 5 exchanges
     
@@ -98,23 +96,7 @@ class QAAgent:
         :return: Dictionary with 'question', 'search_results', 'answer'
         """
         
-        # Auto-detect if search is needed
-        if use_search is None:
-            use_search = self._should_use_search(question)
-            if use_search:
-                print("🔍 [Using web search]")
-            else:
-                print("💬 [Direct chat mode]")
-        
-        # Step 1: Search web if needed
-        search_results = []
-        context = ""
-        
-        if use_search:
-            search_results = web_search(question, max_results=max_results)
-            
-            if search_results:
-                context = self._build_context(search_results)
+        search_results, context = self._search_context(question, use_search, max_results)
         
         # Step 2: Query LLM with conversation history
         llm_response = self._query_llm(question, context, show_sources)
@@ -128,11 +110,7 @@ class QAAgent:
             
             # Add sources if requested
             if show_sources and search_results:
-                answer += "\n\n📚 Sources:\n"
-                for idx, result in enumerate(search_results, 1):
-                    url = result.get('href', '')
-                    if url:
-                        answer += f"[{idx}] {url}\n"
+                answer += self._format_sources(search_results)
         else:
             answer = "❌ Failed to get response from LLM. Please try again."
         
@@ -145,6 +123,85 @@ class QAAgent:
             'success': bool(llm_response)
         }
     
+    def stream_answer(self, question: str, use_search: bool = None, max_results: int = 3, show_sources: bool = False):
+        """
+        Streaming variant of search_and_answer: yields the answer token by token.
+        
+        :param question: User's question
+        :param use_search: Whether to search web (None = auto-detect, True/False = force)
+        :param max_results: Number of search results to use
+        :param show_sources: Whether to show source URLs (default: False)
+        :return: Generator of events:
+                 {'type': 'token', 'content': str} for each streamed chunk, then
+                 {'type': 'done', 'answer': str, 'success': bool}
+        """
+        search_results, context = self._search_context(question, use_search, max_results)
+        
+        answer = ""
+        success = False
+        try:
+            for chunk in self._query_llm_stream(question, context):
+                answer += chunk
+                yield {'type': 'token', 'content': chunk}
+            success = True
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"❌ API Error: {e}")
+        
+        if success:
+            print(f"✅ Streamed answer from LLM\n")
+            self._add_to_history(question, answer)
+            if show_sources and search_results:
+                sources = self._format_sources(search_results)
+                answer += sources
+                yield {'type': 'token', 'content': sources}
+        else:
+            answer = "❌ Failed to get response from LLM. Please try again."
+        
+        yield {'type': 'done', 'answer': answer, 'success': success}
+    
+    def _search_context(self, question: str, use_search: bool = None, max_results: int = 3) -> tuple:
+        """
+        Run the (optional) web search step and build the LLM context.
+        
+        :param question: User's question
+        :param use_search: Whether to search web (None = auto-detect)
+        :param max_results: Number of search results to use
+        :return: (search_results, context)
+        """
+        # Auto-detect if search is needed
+        if use_search is None:
+            use_search = self._should_use_search(question)
+            if use_search:
+                print("🔍 [Using web search]")
+            else:
+                print("💬 [Direct chat mode]")
+        
+        # Step 1: Search web if needed
+        search_results = []
+        context = ""
+        
+        if use_search:
+            search_results = web_search(question, max_results=max_results)
+            
+            if search_results:
+                context = self._build_context(search_results)
+        
+        return search_results, context
+    
+    def _format_sources(self, search_results: list) -> str:
+        """
+        Format source URLs appended to an answer.
+        
+        :param search_results: List of search result dictionaries
+        :return: Sources block
+        """
+        sources = "\n\n📚 Sources:\n"
+        for idx, result in enumerate(search_results, 1):
+            url = result.get('href', '')
+            if url:
+                sources += f"[{idx}] {url}\n"
+        return sources
+    
     def _add_to_history(self, question: str, answer: str):
         """
         Add conversation to history and maintain max length.
@@ -172,14 +229,19 @@ class QAAgent:
         :param search_results: List of search result dictionaries
         :return: Formatted context string
         """
+        # Drop near-duplicate snippets and trim to the QA token budget
+        ranked = [dict(result, rank=idx) for idx, result in enumerate(search_results, 1)]
+        compacted, report = compact_evidence(ranked, TOKEN_BUDGETS["qa_context"])
+        record_savings("qa_context", report)
+        
         context = "Based on the following web search results:\n\n"
         
-        for idx, result in enumerate(search_results, 1):
+        for result in compacted:
             title = result.get('title', 'No title')
             snippet = result.get('body', '')
             url = result.get('href', '')
             
-            context += f"[{idx}] {title}\n"
+            context += f"[{result['rank']}] {title}\n"
             context += f"{snippet}\n"
             context += f"Source: {url}\n\n"
         
@@ -195,7 +257,77 @@ class QAAgent:
         :return: LLM response dictionary or None
         """
         
-        # Build messages with conversation history
+        payload = {
+            "model": self.default_model,
+            "messages": self._build_messages(question, context),
+            "stream": False
+        }
+        
+        try:
+            # Shared keep-alive connection pool (see llm_client.py)
+            response = get_llm_client().post_chat(
+                payload,
+                base_url=self.api_url,
+                api_key=self.api_key,
+                timeout=120
+            )
+            data = response.json()
+            record_model_usage("qa", data.get("model", self.default_model))
+            return data
+            
+        except requests.exceptions.RequestException as e:
+            print(f"❌ API Error: {e}")
+            return None
+    
+    def _query_llm_stream(self, question: str, context: str = ""):
+        """
+        Query the LLM API with streaming enabled.
+        The gateway answers with newline-delimited JSON chunks
+        ({"message": {"content": ...}, "done": false}).
+        
+        :param question: User's question
+        :param context: Additional context from web search
+        :return: Generator of answer text chunks
+        """
+        payload = {
+            "model": self.default_model,
+            "messages": self._build_messages(question, context),
+            "stream": True
+        }
+        
+        response = get_llm_client().post_chat(
+            payload,
+            base_url=self.api_url,
+            api_key=self.api_key,
+            timeout=120,
+            stream=True
+        )
+        # Each chunk carries the model that actually answered; record it from the first one
+        model = None
+        with response:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if model is None and chunk.get('model'):
+                    model = chunk['model']
+                    record_model_usage("qa", model)
+                content = chunk.get('message', {}).get('content', '')
+                if content:
+                    yield content
+                if chunk.get('done'):
+                    break
+        if model is None:
+            record_model_usage("qa", self.default_model)
+    
+    def _build_messages(self, question: str, context: str = "") -> list:
+        """
+        Build the chat messages: conversation history + current prompt.
+        
+        :param question: User's question
+        :param context: Additional context from web search
+        :return: List of chat messages
+        """
         messages = []
         
         # Add conversation history for context
@@ -214,27 +346,7 @@ class QAAgent:
             "content": prompt
         })
         
-        # Prepare API request
-        endpoint = f"{self.api_url}/api/chat"
-        payload = {
-            "model": self.default_model,
-            "messages": messages,
-            "stream": False
-        }
-        
-        try:
-            response = requests.post(
-                endpoint,
-                headers=self.headers,
-                json=payload,
-                timeout=120
-            )
-            response.raise_for_status()
-            return response.json()
-            
-        except requests.exceptions.RequestException as e:
-            print(f"❌ API Error: {e}")
-            return None
+        return messages
     
     def chat(self, message: str, use_search: bool = False) -> str:
         """
@@ -4,26 +4,152 @@ Pure utility functions for web searching and information retrieval.
 Can be used standalone or imported by other modules.
 """
 
-from ddgs import DDGS
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
+from collections import OrderedDict
 import json
+import os
+import re
+import threading
+import time
+from singleflight import SingleFlight
+from search_backends import get_search_backend, split_site_filters
 
+# Search result cache settings (seconds / entries)
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "3600"))
+SEARCH_NEGATIVE_TTL = int(os.getenv("SEARCH_NEGATIVE_TTL", "120"))   # empty or failed searches
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2000"))
 
-def web_search(query: str, max_results: int = 5) -> List[Dict[str, str]]:
+class SearchCache:
     """
-    Search the web using DuckDuckGo.
+    In-memory LRU cache of search results with per-entry TTL.
+    Thread-safe; the least recently used entry is evicted when full.
+    """
+    
+    def __init__(self, max_entries: int = SEARCH_CACHE_MAX_ENTRIES):
+        """
+        :param max_entries: Maximum number of cached queries
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (expires_at, results)
+    
+    def get(self, key) -> Optional[List[Dict[str, str]]]:
+        """
+        :param key: Cache key from search_cache_key()
+        :return: Cached results, or None if missing/expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.time():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def set(self, key, results: List[Dict[str, str]], ttl: int):
+        """
+        :param key: Cache key from search_cache_key()
+        :param results: Search results to cache
+        :param ttl: Time to live in seconds
+        """
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop all entries and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        :return: Entry count, capacity and hit/miss counters
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+search_cache = SearchCache()
+
+# Identical concurrent searches share one DuckDuckGo request
+search_flight = SingleFlight("web_search")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query for cache lookups: case, whitespace and the order of
+    site: filters do not change what the search backend returns.
+    
+    :param query: The search query
+    :return: Normalized query string
+    """
+    keywords, sites = split_site_filters(query.lower())
+    keywords = re.sub(r"(?:\s+or)+\s*$", "", keywords)
+    sites = sorted(set(sites))
+    if sites:
+        return f"{keywords} ({' OR '.join('site:' + s for s in sites)})".strip()
+    return keywords
+
+
+def search_cache_key(query: str, max_results: int) -> Tuple[str, str, int]:
+    """
+    :param query: The search query
+    :param max_results: Maximum number of results
+    :return: Cache / single-flight key
+    """
+    return get_search_backend().name, normalize_query(query), max_results
+
+
+def web_search(query: str, max_results: int = 5, use_cache: bool = True) -> List[Dict[str, str]]:
+    """
+    Search the web using the configured search backend (DuckDuckGo by default,
+    see search_backends.py).
+    Results are cached per normalized query; empty or failed searches are
+    cached briefly so a failing query is not retried on every call.
     
     :param query: The search query
     :param max_results: Maximum number of results to return
+    :param use_cache: False to bypass the cache and always search
     :return: List of search result dictionaries with 'title', 'body', and 'href'
     """
+    key = search_cache_key(query, max_results)
+    results = search_cache.get(key) if use_cache else None
+    if results is None:
+        results = search_flight.do(key, _search_and_cache, query, max_results, key)
+    # Callers may annotate results in place; give each caller its own copies
+    return [dict(r) for r in results]
+
+
+def _search_and_cache(query: str, max_results: int, key) -> List[Dict[str, str]]:
+    """
+    Run the search and store the outcome (negative results with a short TTL).
+    
+    :param query: The search query
+    :param max_results: Maximum number of results to return
+    :param key: Cache key
+    :return: List of search result dictionaries ([] on error)
+    """
     try:
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=max_results))
-        return results if results else []
+        results = get_search_backend().search(query, max_results)
     except Exception as e:
         print(f"❌ Search error: {e}")
-        return []
+        results = []
+    
+    search_cache.set(key, results, SEARCH_CACHE_TTL if results else SEARCH_NEGATIVE_TTL)
+    return results
 
 
 def format_search_results(results: List[Dict[str, str]]) -> str:
@@ -0,0 +1,160 @@
+"""
+Relevance Scorer
+本地詞彙相關性評分：在花費 LLM 立場判斷之前，先過濾明顯離題的搜尋結果並依相關性排序
+
+- 詞彙切分與 BM25 搜尋後端相同（英文單字 + 中日韓字元 bigram）
+- 以 NumPy 一次計算所有結果的 BM25 分數，再除以同一批結果中的最高分正規化到 0~1
+  （以 claim 全部詞彙作為理想分數會讓長 claim 的相關結果分數偏低）
+- 相對門檻只在同一批結果之間比較；另以 claim 詞彙覆蓋率作為絕對下限，
+  整批都離題時（最高分的結果也只共用「今天」這類詞）不會因為正規化而全部保留
+- 與 claim 使用不同文字（例如中文 claim、英文證據）的結果無法以詞彙比較，一律保留交給 LLM
+"""
+import os
+import re
+import numpy as np
+from search_backends import tokenize
+
+RELEVANCE_THRESHOLD = float(os.getenv("RELEVANCE_THRESHOLD", "0.2"))       # 相對最高分的比例
+RELEVANCE_MIN_COVERAGE = float(os.getenv("RELEVANCE_MIN_COVERAGE", "0.15"))  # 至少出現的 claim 詞彙比例
+RELEVANCE_MIN_KEEP = int(os.getenv("RELEVANCE_MIN_KEEP", "1"))               # 通過下限的結果中至少保留的數量
+
+_CJK_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+
+
+def _term_matrix(claim_terms, token_lists):
+    """
+    計算每個結果中每個 claim 詞彙的出現次數
+
+    Args:
+        claim_terms: 不重複的 claim 詞彙
+        token_lists: 每個結果的詞彙列表
+
+    Returns:
+        (n_results, n_terms) 的詞頻矩陣
+    """
+    tf = np.zeros((len(token_lists), len(claim_terms)))
+    lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(token_lists))
+    if not lengths.sum():
+        return tf
+
+    # 所有結果的詞彙攤平成一個陣列，以二分搜尋一次對應到 claim 詞彙
+    tokens = np.array([token for tokens in token_lists for token in tokens])
+    doc_ids = np.repeat(np.arange(len(token_lists)), lengths)
+    order = np.argsort(claim_terms)
+    sorted_terms = np.asarray(claim_terms)[order]
+    pos = np.minimum(np.searchsorted(sorted_terms, tokens), len(sorted_terms) - 1)
+    hit = sorted_terms[pos] == tokens
+    np.add.at(tf, (doc_ids[hit], order[pos[hit]]), 1)
+    return tf
+
+
+def _score(claim, results, k1, b):
+    """
+    score_relevance 與 filter_by_relevance 共用的計算
+
+    Returns:
+        (scores, coverage)：正規化分數與 claim 詞彙覆蓋率，無法比較的結果兩者皆為 NaN
+    """
+    n = len(results)
+    claim_terms = list(dict.fromkeys(tokenize(claim)))
+    if not n or not claim_terms:
+        return np.full(n, np.nan), np.full(n, np.nan)
+
+    texts = [f"{r.get('title', '')} {r.get('body', '')}" for r in results]
+    claim_is_cjk = bool(_CJK_RE.search(claim))
+    comparable = np.array([bool(_CJK_RE.search(text)) == claim_is_cjk for text in texts])
+    token_lists = [tokenize(text) for text in texts]
+    lengths = np.array([len(tokens) for tokens in token_lists], dtype=float)
+    tf = _term_matrix(claim_terms, token_lists)
+
+    # 平滑 IDF：出現在所有結果中的詞權重為 1，越少見權重越高
+    df = (tf > 0).sum(axis=0)
+    idf = 1 + np.log((n + 1) / (df + 1))
+
+    avg_length = lengths.mean() or 1.0
+    norm = k1 * (1 - b + b * lengths / avg_length)
+    bm25 = (tf * (k1 + 1) / (tf + norm[:, None])) @ idf
+
+    # 以可比較結果中的最高分正規化：分數與 claim 長度無關
+    bm25[~comparable] = np.nan
+    best = np.nanmax(bm25) if comparable.any() else 0.0
+    scores = bm25 / best if best > 0 else np.where(comparable, 0.0, np.nan)
+
+    coverage = (tf > 0).sum(axis=1) / len(claim_terms)
+    coverage[~comparable] = np.nan
+    return scores, coverage
+
+
+def score_relevance(claim, results, k1=1.2, b=0.75):
+    """
+    計算每個搜尋結果與 claim 的 BM25 相關性分數
+
+    Args:
+        claim: 待驗證的主張
+        results: 搜尋結果列表（含 title, body）
+        k1: BM25 詞頻飽和參數
+        b: BM25 長度正規化參數
+
+    Returns:
+        numpy 陣列（與 results 順序相同），分數介於 0~1（最相關的結果為 1，沒有共同詞彙為 0）；
+        與 claim 文字不同而無法比較的結果為 NaN
+    """
+    return _score(claim, results, k1, b)[0]
+
+
+def filter_by_relevance(claim, results, threshold=None, min_keep=None, min_coverage=None):
+    """
+    過濾低於門檻的結果，其餘依相關性由高到低排序
+    每個保留的結果會加上 'relevance_score' 欄位（無法比較的結果為 None，排在最後）
+
+    Args:
+        claim: 待驗證的主張
+        results: 搜尋結果列表
+        threshold: 相關性門檻，相對最高分的比例（None 則使用 RELEVANCE_THRESHOLD）
+        min_keep: 全部低於相對門檻時，仍保留的通過覆蓋率下限的最高分結果數（None 則使用 RELEVANCE_MIN_KEEP）
+        min_coverage: 絕對下限，結果中至少要出現的 claim 詞彙比例（None 則使用 RELEVANCE_MIN_COVERAGE）
+
+    Returns:
+        (kept_results, dropped_count)
+    """
+    threshold = RELEVANCE_THRESHOLD if threshold is None else threshold
+    min_keep = RELEVANCE_MIN_KEEP if min_keep is None else min_keep
+    min_coverage = RELEVANCE_MIN_COVERAGE if min_coverage is None else min_coverage
+    if not results:
+        return [], 0
+
+    scores, coverage = _score(claim, results, 1.2, 0.75)
+    unscored = np.isnan(scores)
+    ranking_key = np.where(unscored, -1.0, scores)
+    # 分數相同時維持搜尋引擎原本的排名
+    order = np.argsort(-ranking_key, kind="stable")
+
+    # 沒有 claim 詞彙的結果一律捨棄，不受 min_keep 影響
+    eligible = ~unscored & (coverage > 0) & (coverage >= min_coverage)
+    keep = unscored | (eligible & (scores >= threshold))
+    if keep.sum() < min_keep:
+        keep[[i for i in order if eligible[i]][:min_keep]] = True
+
+    kept = []
+    for i in order:
+        if keep[i]:
+            r = results[i]
+            r['relevance_score'] = None if unscored[i] else round(float(scores[i]), 3)
+            kept.append(r)
+    return kept, len(results) - len(kept)
+
+
+if __name__ == "__main__":
+    claim = "台北今天凌晨發生規模6.0地震，50人受傷"
+    results = [
+        {"title": "東京股市收盤", "body": "日經指數今天上漲1.2%，科技股領漲。"},
+        {"title": "台北地震50人受傷", "body": "台北市今天凌晨發生規模6.0地震，已知50人受傷。"},
+        {"title": "Taipei earthquake", "body": "A magnitude 6.0 quake hit Taipei early today."},
+        {"title": "台北今天天氣", "body": "台北今天晴時多雲，午後可能有雷陣雨。"},
+        {"title": "地震知識", "body": "地震規模與震度的差別。"},
+    ]
+    print(score_relevance(claim, results))
+    kept, dropped = filter_by_relevance(claim, results)
+    for r in kept:
+        print(r["relevance_score"], r["title"])
+    print(f"dropped {dropped}")
@@ -0,0 +1,223 @@
+"""
+Search Backends
+Pluggable search backends behind qa_tool.web_search.
+
+- DDGSBackend: live DuckDuckGo text search (default)
+- BM25Backend: offline search over a local document corpus (inverted index + BM25),
+  for deterministic benchmarks / load tests and pre-indexed news archives
+
+Every backend returns the same result shape: [{'title', 'body', 'href', ...}]
+Select one with SEARCH_BACKEND=ddgs|bm25 (BM25 reads LOCAL_CORPUS_PATH).
+"""
+
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+from ddgs import DDGS
+
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "ddgs")
+LOCAL_CORPUS_PATH = os.getenv("LOCAL_CORPUS_PATH", "")
+
+_SITE_RE = re.compile(r"site:(\S+?)(?=[\s)]|$)", re.IGNORECASE)
+_LATIN_RE = re.compile(r"[a-z0-9]+(?:['.][a-z0-9]+)*")
+_CJK_RUN_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+")
+_OPERATOR_WORDS = {"or", "and"}
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokenize mixed CJK / Latin text.
+    Latin text is split into lower-cased words; CJK runs become character
+    bigrams (a single-character run stays a unigram).
+
+    :param text: Input text
+    :return: List of tokens
+    """
+    text = text.lower()
+    tokens = [w for w in _LATIN_RE.findall(text) if w not in _OPERATOR_WORDS]
+    for run in _CJK_RUN_RE.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def split_site_filters(query: str):
+    """
+    Separate site: filters from the keyword part of a query.
+
+    :param query: Query such as 'taiwan gdp (site:.gov OR site:who.int)'
+    :return: (keyword_query, [site, ...])
+    """
+    sites = [s.lower() for s in _SITE_RE.findall(query)]
+    keywords = _SITE_RE.sub(" ", query)
+    keywords = re.sub(r"\(\s*(?:or\s*)*\)", " ", keywords, flags=re.IGNORECASE)
+    return " ".join(keywords.split()), sites
+
+
+def _host_matches(href: str, sites: List[str]) -> bool:
+    """True if the URL's host is under one of the site: filters"""
+    host = urlparse(href).netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    for site in sites:
+        site = site.lstrip(".")
+        if host == site or host.endswith("." + site):
+            return True
+    return False
+
+
+class SearchBackend:
+    """
+    Base class for search backends.
+    Subclasses implement search() and raise on failure; qa_tool.web_search
+    handles caching, coalescing and error reporting.
+    """
+
+    name = "base"
+
+    def search(self, query: str, max_results: int = 5) -> List[Dict[str, str]]:
+        """
+        :param query: The search query (may contain site: filters)
+        :param max_results: Maximum number of results to return
+        :return: List of result dictionaries with 'title', 'body', and 'href'
+        """
+        raise NotImplementedError
+
+
+class DDGSBackend(SearchBackend):
+    """Live DuckDuckGo text search"""
+
+    name = "ddgs"
+
+    def search(self, query: str, max_results: int = 5) -> List[Dict[str, str]]:
+        with DDGS() as ddgs:
+            results = list(ddgs.text(query, max_results=max_results))
+        return results if results else []
+
+
+class BM25Backend(SearchBackend):
+    """
+    Offline search over a local corpus.
+    Documents are indexed once into an inverted index (token -> postings);
+    queries are ranked with Okapi BM25 over title + body. site: filters are
+    applied to each document's href.
+    """
+
+    name = "bm25"
+
+    def __init__(self, documents: List[Dict[str, str]], k1: float = 1.5, b: float = 0.75, title_weight: int = 2):
+        """
+        :param documents: Documents with 'title', 'body', 'href' (extra fields such as 'date' are passed through)
+        :param k1: BM25 term-frequency saturation
+        :param b: BM25 length normalization
+        :param title_weight: How many times title tokens are counted
+        """
+        self.documents = list(documents)
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)   # token -> [(doc_id, term_frequency)]
+        self.doc_lengths = []
+
+        for doc_id, doc in enumerate(self.documents):
+            tokens = tokenize(doc.get("title", "")) * title_weight + tokenize(doc.get("body", ""))
+            self.doc_lengths.append(len(tokens))
+            for token, tf in Counter(tokens).items():
+                self.postings[token].append((doc_id, tf))
+
+        self.avg_doc_length = (sum(self.doc_lengths) / len(self.doc_lengths)) if self.doc_lengths else 0.0
+
+    @classmethod
+    def from_jsonl(cls, path: str, **kwargs) -> "BM25Backend":
+        """
+        Load a corpus from a JSON Lines file (one document object per line).
+
+        :param path: Path to the .jsonl corpus
+        :return: BM25Backend
+        """
+        documents = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    documents.append(json.loads(line))
+        return cls(documents, **kwargs)
+
+    def _idf(self, token: str) -> float:
+        df = len(self.postings.get(token, ()))
+        n = len(self.documents)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, max_results: int = 5) -> List[Dict[str, str]]:
+        keywords, sites = split_site_filters(query)
+        scores = defaultdict(float)
+
+        for token in set(tokenize(keywords)):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = self._idf(token)
+            for doc_id, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_doc_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        results = []
+        for doc_id, score in ranked:
+            doc = self.documents[doc_id]
+            if sites and not _host_matches(doc.get("href", ""), sites):
+                continue
+            results.append(dict(doc))
+            if len(results) >= max_results:
+                break
+        return results
+
+
+_backend: Optional[SearchBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_search_backend() -> SearchBackend:
+    """
+    Return the process-wide backend (created from SEARCH_BACKEND on first use).
+
+    :return: SearchBackend
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if SEARCH_BACKEND == "bm25":
+                    _backend = BM25Backend.from_jsonl(LOCAL_CORPUS_PATH)
+                else:
+                    _backend = DDGSBackend()
+    return _backend
+
+
+def set_search_backend(backend: SearchBackend):
+    """
+    Replace the process-wide backend (e.g. a BM25Backend for offline benchmarks).
+
+    :param backend: SearchBackend instance
+    """
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+if __name__ == "__main__":
+    corpus = BM25Backend([
+        {"title": "台北今天凌晨發生規模6.0地震", "body": "中央氣象署表示震央位於信義區。", "href": "https://www.cwa.gov.tw/quake/1"},
+        {"title": "東京地震", "body": "日本東京發生地震，無人受傷。", "href": "https://news.example.jp/2"},
+        {"title": "Taiwan GDP grows 5.8%", "body": "Taiwan's economy grew 5.8 percent last year.", "href": "https://www.reuters.com/3"},
+    ])
+    for q in ["台北 地震", "台北 地震 (site:.gov.tw OR site:who.int)", "Taiwan GDP growth"]:
+        print(q)
+        for r in corpus.search(q, max_results=3):
+            print("   ", r["title"], r["href"])
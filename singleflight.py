@@ -0,0 +1,149 @@
+"""
+Single-flight Request Coalescing
+相同指紋（key）的請求同時進行時只實際執行一次，其餘呼叫等待並共用同一個結果
+用於 call_llm / async_call_llm 和 web_search，避免突發流量重複打到 Gateway 與 DuckDuckGo
+"""
+import asyncio
+import threading
+
+
+class _Call:
+    """一個進行中的請求"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    執行緒版本的 single-flight
+    第一個呼叫者負責執行，其餘相同 key 的呼叫者阻塞等待並取得相同結果（或相同例外）
+    """
+
+    def __init__(self, name=""):
+        self.name = name
+        self.executed = 0
+        self.shared = 0
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        執行 fn(*args, **kwargs)，同 key 的並行呼叫共用結果
+
+        Args:
+            key: 請求指紋
+            fn: 實際執行的函式
+
+        Returns:
+            fn 的回傳值
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self):
+        """
+        Returns:
+            {"executed": int, "shared": int, "in_flight": int}
+        """
+        with self._lock:
+            return {"executed": self.executed, "shared": self.shared, "in_flight": len(self._calls)}
+
+
+class _Flight:
+    """一個進行中的 asyncio 請求與等待它的呼叫者數量"""
+
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """
+    asyncio 版本的 single-flight
+    相同 key 的 coroutine 共用同一個 task；個別等待者逾時或被取消不會影響其他等待者，
+    最後一個等待者離開時取消共用的 task，避免沒有人等待的請求繼續佔用連線與重試
+    """
+
+    def __init__(self, name=""):
+        self.name = name
+        self.executed = 0
+        self.shared = 0
+        # (event loop, key) -> _Flight
+        self._flights = {}
+
+    async def do(self, key, coro_fn, *args, **kwargs):
+        """
+        執行 await coro_fn(*args, **kwargs)，同 key 的並行呼叫共用結果
+
+        Args:
+            key: 請求指紋
+            coro_fn: 回傳 coroutine 的函式
+
+        Returns:
+            coroutine 的回傳值
+        """
+        slot = (asyncio.get_running_loop(), key)
+        flight = self._flights.get(slot)
+        if flight is None:
+            self.executed += 1
+            flight = _Flight(asyncio.ensure_future(coro_fn(*args, **kwargs)))
+            self._flights[slot] = flight
+            flight.task.add_done_callback(lambda t: self._finish(slot, flight))
+        else:
+            self.shared += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # 之後的相同請求重新執行，不會拿到這個被取消的 task
+                self._forget(slot, flight)
+                flight.task.cancel()
+
+    def _forget(self, slot, flight):
+        """移除 slot 對應的 flight（slot 已換成新的 flight 時不動）"""
+        if self._flights.get(slot) is flight:
+            del self._flights[slot]
+
+    def _finish(self, slot, flight):
+        """task 結束時移除 flight，並取出例外（等待者都已離開時避免 "exception was never retrieved"）"""
+        self._forget(slot, flight)
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def stats(self):
+        """
+        Returns:
+            {"executed": int, "shared": int, "in_flight": int}
+        """
+        return {"executed": self.executed, "shared": self.shared, "in_flight": len(self._flights)}
@@ -0,0 +1,178 @@
+"""
+Source Tiers
+來源可信度分級：以網域標籤反向建立的字典樹（reverse-label trie）查詢證據來源的可信度等級
+
+- 等級資料：data/source_tiers.tsv（可用 SOURCE_TIERS_PATH 覆寫），匯入模組時建立字典樹
+- 規則涵蓋網域本身與所有子網域，以完整標籤比對（un.org 不會比對到 fun.org）
+- 多條規則符合時取最長（最具體）者：factcheck.afp.com 為 fact-checker，afp.com 為 wire
+- 查詢成本只與主機名稱的標籤數有關，不隨規則數量增加；同一主機的結果會快取
+- 隨附資料不含 low-credibility 規則（沒有經過查核的公開名單）；使用者自行發布的平台整個維持 standard，
+  需要時以 SOURCE_TIERS_PATH 指定加入自有名單的資料檔
+"""
+import os
+from functools import lru_cache
+from urllib.parse import urlparse
+
+SOURCE_TIERS_PATH = os.getenv(
+    "SOURCE_TIERS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "source_tiers.tsv")
+)
+
+DEFAULT_TIER = "standard"
+TIERS = ("official", "wire", "established", "fact-checker", "low-credibility", DEFAULT_TIER)
+
+
+def load_domain_rules(path):
+    """
+    讀取來源等級資料檔（TSV：domain, tier）
+
+    Args:
+        path: 資料檔路徑
+
+    Returns:
+        [(domain, tier), ...]
+    """
+    rules = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            domain, tier = line.split("\t")
+            if tier not in TIERS:
+                raise ValueError(f"{path}:{line_no}: unknown tier '{tier}'")
+            rules.append((domain.lower().strip("."), tier))
+    return rules
+
+
+class DomainTrie:
+    """
+    以反向網域標籤為鍵的字典樹（com → afp → factcheck），建立後唯讀、執行緒安全
+    """
+
+    def __init__(self, rules=()):
+        # 每個節點為 [子節點 dict, 等級或 None]
+        self._root = [{}, None]
+        self._size = 0
+        for domain, tier in rules:
+            self.insert(domain, tier)
+
+    def insert(self, domain, tier):
+        """
+        加入規則（同一網域重複加入時以後者為準）
+
+        Args:
+            domain: 網域，例如 "gov.tw"、"factcheck.afp.com"
+            tier: 可信度等級
+        """
+        node = self._root
+        for label in reversed(domain.split(".")):
+            node = node[0].setdefault(label, [{}, None])
+        if node[1] is None:
+            self._size += 1
+        node[1] = tier
+
+    def lookup(self, host):
+        """
+        找出符合主機名稱的最具體規則
+
+        Args:
+            host: 小寫主機名稱
+
+        Returns:
+            等級，沒有符合的規則時為 None
+        """
+        node = self._root
+        tier = None
+        for label in reversed(host.split(".")):
+            node = node[0].get(label)
+            if node is None:
+                break
+            if node[1] is not None:
+                tier = node[1]
+        return tier
+
+    def __len__(self):
+        return self._size
+
+
+try:
+    _trie = DomainTrie(load_domain_rules(SOURCE_TIERS_PATH))
+except (OSError, ValueError) as e:
+    print(f"  Warning: Source tiers not loaded ({e}), all sources treated as '{DEFAULT_TIER}'")
+    _trie = DomainTrie()
+
+
+@lru_cache(maxsize=65536)
+def classify_host(host):
+    """
+    Args:
+        host: 主機名稱（不含 port）
+
+    Returns:
+        可信度等級，未列出的網域為 "standard"
+    """
+    return _trie.lookup(host.lower().rstrip(".")) or DEFAULT_TIER
+
+
+def get_source_tier(url):
+    """
+    判斷證據來源 URL 的可信度等級
+
+    Args:
+        url: 證據來源 URL（也接受不含 scheme 的網域）
+
+    Returns:
+        "official": 政府機構、國際組織、學術研究機構
+        "wire": 通訊社
+        "established": 主要新聞媒體與學術期刊
+        "fact-checker": 事實查核組織
+        "low-credibility": 資料檔明確標記的低可信度網域（隨附資料未列出任何網域）
+        "standard": 其他來源
+    """
+    try:
+        if "//" not in url:
+            url = "//" + url
+        host = urlparse(url).hostname
+    except (TypeError, ValueError):
+        return DEFAULT_TIER
+    if not host:
+        return DEFAULT_TIER
+    return classify_host(host)
+
+
+def classify_sources(urls):
+    """
+    批次判斷來源等級
+
+    Args:
+        urls: URL 列表
+
+    Returns:
+        等級列表（與 urls 順序相同）
+    """
+    return [get_source_tier(url) for url in urls]
+
+
+if __name__ == "__main__":
+    import time
+
+    print(f"{len(_trie)} rules")
+    for url in [
+        "https://www.cwa.gov.tw/V8/C/E/index.html",
+        "https://news.un.org/zh/story/2024/01/1125787",
+        "https://fun.org.example/un.org",
+        "https://www.afp.com/en/news",
+        "https://factcheck.afp.com/doc.afp.com.34DF8X2",
+        "https://tfc-taiwan.org.tw/articles/10000",
+        "https://www.cna.com.tw/news/aipl/202401010001.aspx",
+        "https://www.youtube.com/watch?v=abc",
+        "https://WWW.BBC.CO.UK:443/news",
+        "example.com",
+    ]:
+        print(f"  {get_source_tier(url):16} {url}")
+
+    urls = [f"https://news{i % 500}.example{i % 7}.com/a/{i}" for i in range(100000)]
+    t0 = time.perf_counter()
+    classify_sources(urls)
+    print(f"{len(urls)} urls in {(time.perf_counter() - t0) * 1000:.1f} ms")
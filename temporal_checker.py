@@ -6,7 +6,10 @@
 
 from datetime import datetime, timedelta
 import json
+import numpy as np
 from llm_helpers import call_llm, parse_json_response
+from token_budget import fit_to_budget
+from time_parser import parse_time_expression, extract_dates, parse_date_field, find_time_expression
 
 
 def normalize_time_expression(time_text, reference_date=None):
@@ -21,7 +24,8 @@ def normalize_time_expression(time_text, reference_date=None):
         {
             "parsed_date": "YYYY-MM-DD",
             "confidence": "high" / "medium" / "low",
-            "time_type": "specific_recent" / "relative_recent" / "relative_past" / "no_time_reference",
+            "time_type": "specific_recent" / "relative_recent" / "relative_past" / "absolute" / "no_time_reference",
+            "granularity": "day" / "month" / "year"（僅 absolute）,
             "original_expression": "去年"
         }
     """
@@ -31,6 +35,11 @@ def normalize_time_expression(time_text, reference_date=None):
     if isinstance(reference_date, str):
         reference_date = datetime.fromisoformat(reference_date)
     
+    # 快速路徑：常見表達式以規則解析，無法完整比對才呼叫 LLM
+    parsed = parse_time_expression(time_text, reference_date)
+    if parsed:
+        return parsed
+    
     system_prompt = """You are a time expression parser. Parse ANY time expression in any language into a standard date.
 
 Handle expressions like:
@@ -48,7 +57,8 @@ Return JSON with this exact structure:
 {
   "parsed_date": "YYYY-MM-DD",
   "confidence": "high" or "medium" or "low",
-  "time_type": "specific_recent" or "relative_recent" or "relative_past" or "no_time_reference",
+  "time_type": "specific_recent" or "relative_recent" or "relative_past" or "absolute" or "no_time_reference",
+  "granularity": "day" or "month" or "year" (only for absolute),
   "explanation": "brief explanation"
 }
 
@@ -56,7 +66,11 @@ Time type definitions:
 - specific_recent: today, yesterday, 今天, 昨天
 - relative_recent: this week, last week, recently, 最近, 上週
 - relative_past: last year, last month, 去年, 上個月
-- no_time_reference: no time information found"""
+- absolute: an explicitly stated date, month or year: 2024-12-25, 2024年12月, May 2025, 2024年
+- no_time_reference: no time information found
+
+For relative expressions, parsed_date is the resolved date inside the period referred to, never the reference date itself:
+去年 → June 15 of the previous year, 上個月 → the 15th of the previous month, 上週 → 7 days before the reference date"""
 
     user_prompt = f"""Current reference date: {reference_date.strftime('%Y-%m-%d')}
 
@@ -70,12 +84,14 @@ Examples:
 Input: "今天" → {{"parsed_date": "{reference_date.strftime('%Y-%m-%d')}", "confidence": "high", "time_type": "specific_recent", "explanation": "Today relative to reference date"}}
 Input: "yesterday" → {{"parsed_date": "{(reference_date - timedelta(days=1)).strftime('%Y-%m-%d')}", "confidence": "high", "time_type": "specific_recent", "explanation": "One day before reference date"}}
 Input: "去年" → {{"parsed_date": "{(reference_date.replace(year=reference_date.year-1, month=6, day=15)).strftime('%Y-%m-%d')}", "confidence": "medium", "time_type": "relative_past", "explanation": "Previous year relative to reference date"}}
-Input: "2025-05-01" → {{"parsed_date": "2025-05-01", "confidence": "high", "time_type": "relative_past", "explanation": "Specific date provided"}}
+Input: "上週" → {{"parsed_date": "{(reference_date - timedelta(days=7)).strftime('%Y-%m-%d')}", "confidence": "medium", "time_type": "relative_recent", "explanation": "Previous week relative to reference date"}}
+Input: "2025-05-01" → {{"parsed_date": "2025-05-01", "confidence": "high", "time_type": "absolute", "granularity": "day", "explanation": "Specific date provided"}}
+Input: "May 2025" → {{"parsed_date": "2025-05-15", "confidence": "medium", "time_type": "absolute", "granularity": "month", "explanation": "Month provided without day"}}
 
 Return ONLY the JSON, no other text."""
 
     try:
-        response = call_llm(system_prompt, user_prompt)
+        response = call_llm(system_prompt, user_prompt, call_site="temporal")
         result = parse_json_response(response)
         result['original_expression'] = time_text
         return result
@@ -126,7 +142,7 @@ Input: "Taiwan earthquake" → {{"has_time_reference": false, "time_expression":
 Return ONLY the JSON."""
 
     try:
-        response = call_llm(system_prompt, user_prompt)
+        response = call_llm(system_prompt, user_prompt, call_site="temporal")
         result = parse_json_response(response)
         
         if result.get('has_time_reference') and result.get('time_expression'):
@@ -137,12 +153,99 @@ Return ONLY the JSON."""
         return None
 
 
-def extract_time_from_evidence(evidence_text):
+def extract_and_normalize_claim_time(claim_text, reference_date=None):
+    """
+    一次完成 claim 時間描述的提取與標準化
+    先以規則在本地尋找並解析，找不到才以一次 LLM 呼叫（附參考日期）同時提取與標準化
+    
+    Args:
+        claim_text: claim 文本
+        reference_date: 參考日期（claim 的發布日期，預設為今天）
+    
+    Returns:
+        normalize_time_expression 格式的結果；claim 沒有時間描述則返回 None
+    """
+    if reference_date is None:
+        reference_date = datetime.now()
+    if isinstance(reference_date, str):
+        reference_date = datetime.fromisoformat(reference_date)
+    
+    expression = find_time_expression(claim_text)
+    if expression:
+        parsed = parse_time_expression(expression, reference_date)
+        if parsed:
+            return parsed
+    
+    system_prompt = """You are a time expression extractor and parser. Find the time expression in the text (if any)
+and resolve it to a standard date relative to the reference date.
+
+Look for absolute dates ("2025-05-01", "May 2025"), relative time ("today", "yesterday", "recently", "last year")
+and Chinese time ("今天", "昨天", "去年", "上個月", "最近", "日前").
+For day numbers with "yesterday/昨" (e.g. "昨(31日)"), use the previous month if the day is after the reference day.
+
+Return JSON with this exact structure:
+{
+  "has_time_reference": true or false,
+  "time_expression": "the extracted time expression" or null,
+  "parsed_date": "YYYY-MM-DD" or null,
+  "confidence": "high" or "medium" or "low",
+  "time_type": "specific_recent" or "relative_recent" or "relative_past" or "absolute" or "no_time_reference",
+  "granularity": "day" or "month" or "year" (only for absolute)
+}
+
+Time type definitions:
+- specific_recent: today, yesterday, 今天, 昨天
+- relative_recent: this week, last week, recently, 最近, 上週
+- relative_past: last year, last month, 去年, 上個月
+- absolute: an explicitly stated date, month or year: 2024-12-25, 2024年12月, May 2025, 2024年
+- no_time_reference: no time information found
+
+For relative expressions, parsed_date is the resolved date inside the period referred to, never the reference date itself:
+去年 → June 15 of the previous year, 上個月 → the 15th of the previous month, 上週 → 7 days before the reference date"""
+
+    user_prompt = f"""Current reference date: {reference_date.strftime('%Y-%m-%d')}
+
+Text: "{claim_text}"
+
+Return ONLY the JSON."""
+
+    try:
+        response = call_llm(system_prompt, user_prompt, call_site="temporal")
+        result = parse_json_response(response)
+    except Exception as e:
+        print(f"Error extracting time from claim: {e}")
+        return None
+    
+    expression = result.get('time_expression')
+    if not result.get('has_time_reference') or not expression:
+        return None
+    
+    try:
+        datetime.fromisoformat(result.get('parsed_date') or '')
+    except ValueError:
+        # 模型有找到時間描述但日期格式不正確：改用單獨的標準化
+        return normalize_time_expression(expression, reference_date)
+    
+    info = {
+        "parsed_date": result['parsed_date'],
+        "confidence": result.get('confidence', 'medium'),
+        "time_type": result.get('time_type', 'relative_past'),
+        "original_expression": expression,
+        "explanation": "Extracted and normalized in one pass"
+    }
+    if info['time_type'] == 'absolute':
+        info['granularity'] = result.get('granularity', 'day')
+    return info
+
+
+def extract_time_from_evidence(evidence_text, published=None):
     """
     從證據文本中提取發布時間或事件時間
+    先以規則在本地搜尋日期（搜尋後端的日期欄位優先），都找不到才呼叫 LLM
     
     Args:
         evidence_text: 證據文本
+        published: 搜尋後端回傳的日期欄位（如 result['date']），可為 None
     
     Returns:
         {
@@ -150,6 +253,15 @@ def extract_time_from_evidence(evidence_text):
             "publish_date": str or None - 證據的發布日期（如果有）
         }
     """
+    excerpt = fit_to_budget(evidence_text, 'evidence_time')
+    local = extract_dates(excerpt, datetime.now())
+    publish_date = parse_date_field(published) or local['publish_date']
+    if publish_date or local['time_expression']:
+        return {
+            "time_expression": local['time_expression'],
+            "publish_date": publish_date
+        }
+    
     system_prompt = """You are a publication date and event time extractor. Extract BOTH from the text:
 1. Publication/source date (when the article was published)
 2. Event time expressions (relative time like "去年", "last year")
@@ -168,7 +280,7 @@ Return JSON:
 
     user_prompt = f"""Extract publication date and time expression from this text:
 
-"{evidence_text[:500]}..."
+"{excerpt}"
 
 Examples:
 Input: "Published on 2025-05-01. 去年台灣GDP..." → {{"publish_date": "2025-05-01", "time_expression": "去年"}}
@@ -177,7 +289,7 @@ Input: "2024年12月25日報導..." → {{"publish_date": "2024-12-25", "time_ex
 Return ONLY the JSON."""
 
     try:
-        response = call_llm(system_prompt, user_prompt)
+        response = call_llm(system_prompt, user_prompt, call_site="temporal")
         result = parse_json_response(response)
         
         return {
@@ -192,7 +304,7 @@ Return ONLY the JSON."""
         }
 
 
-def calculate_time_range(time_type, parsed_date, original_expression):
+def calculate_time_range(time_type, parsed_date, original_expression, granularity=None):
     """
     根據時間類型計算允許的時間範圍
     
@@ -200,6 +312,7 @@ def calculate_time_range(time_type, parsed_date, original_expression):
         time_type: 時間類型
         parsed_date: 解析後的日期字串 "YYYY-MM-DD"
         original_expression: 原始時間表達式（用於特殊處理）
+        granularity: absolute 類型的精確度 "day" / "month" / "year"（None 視為 "day"）
     
     Returns:
         (start_date, end_date) datetime objects
@@ -216,46 +329,50 @@ def calculate_time_range(time_type, parsed_date, original_expression):
             reference + timedelta(days=1)
         )
     
-    elif time_type == "relative_recent":
-        # 上週、最近、日前：前 7-14 天
-        if "week" in original_expression.lower() or "週" in original_expression:
-            # 上週：前 7-14 天
+    elif time_type == "absolute":
+        # 明確寫出的日期：就是那一天 / 那個月 / 那一年
+        if granularity == "year":
+            return (
+                datetime(reference.year, 1, 1),
+                datetime(reference.year, 12, 31)
+            )
+        elif granularity == "month":
+            start = reference.replace(day=1)
             return (
-                reference - timedelta(days=14),
-                reference - timedelta(days=7)
+                start,
+                (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
             )
         else:
-            # 最近、日前：前 7 天內
+            # 容忍 ±1 天（時區問題）
             return (
-                reference - timedelta(days=7),
-                reference
+                reference - timedelta(days=1),
+                reference + timedelta(days=1)
             )
     
+    elif time_type == "relative_recent":
+        # 最近、日前、上週、3週前：parsed_date 已往前推到那一週，範圍為結束於該日的 7 天
+        return (
+            reference - timedelta(days=7),
+            reference
+        )
+    
     elif time_type == "relative_past":
-        # 去年、上個月：必須落在那個時間段內
+        # 去年、上個月：parsed_date 已是那一年 / 那個月內的日期，必須落在那個時間段內
         if "year" in original_expression.lower() or "年" in original_expression:
-            # 去年：前一年的整年
-            year = reference.year - 1
+            # 去年、2年前：parsed_date 所在的整年
             return (
-                datetime(year, 1, 1),
-                datetime(year, 12, 31)
+                datetime(reference.year, 1, 1),
+                datetime(reference.year, 12, 31)
             )
         elif "month" in original_expression.lower() or "月" in original_expression:
-            # 上個月：前一個月
-            if reference.month == 1:
-                year, month = reference.year - 1, 12
-            else:
-                year, month = reference.year, reference.month - 1
-            
-            start = datetime(year, month, 1)
-            if month == 12:
-                end = datetime(year, 12, 31)
-            else:
-                end = datetime(year, month + 1, 1) - timedelta(days=1)
-            
-            return (start, end)
+            # 上個月、3個月前：parsed_date 所在的整個月
+            start = reference.replace(day=1)
+            return (
+                start,
+                (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+            )
         else:
-            # 其他相對過去時間：前 60 天
+            # 其他相對過去時間：parsed_date 之前 60 天
             return (
                 reference - timedelta(days=60),
                 reference
@@ -307,7 +424,8 @@ def is_temporally_relevant(claim_time_info, evidence_time_info):
     time_range = calculate_time_range(
         claim_time_info['time_type'],
         claim_time_info['parsed_date'],
-        claim_time_info.get('original_expression', '')
+        claim_time_info.get('original_expression', ''),
+        claim_time_info.get('granularity')
     )
     
     if time_range[0] is None:
@@ -322,7 +440,16 @@ def is_temporally_relevant(claim_time_info, evidence_time_info):
     
     start_date, end_date = time_range
     evidence_date = datetime.fromisoformat(evidence_time_info['parsed_date'])
+    return _compare_to_range(start_date, end_date, evidence_date)
+
+
+def _compare_to_range(start_date, end_date, evidence_date):
+    """
+    比較證據日期與 claim 的時間範圍
     
+    Returns:
+        is_temporally_relevant 格式的結果
+    """
     # 檢查是否落在範圍內
     is_in_range = start_date <= evidence_date <= end_date
     
@@ -350,6 +477,163 @@ def is_temporally_relevant(claim_time_info, evidence_time_info):
     }
 
 
+def _resolve_locally(excerpt, published, now):
+    """
+    以規則解析單一證據的時間（不呼叫 LLM）
+    
+    Returns:
+        normalize_time_expression 格式的結果；找不到時間資訊或規則無法處理則返回 False
+    """
+    local = extract_dates(excerpt, now)
+    publish_date = parse_date_field(published) or local['publish_date']
+    expression = local['time_expression']
+    
+    if not expression and not publish_date:
+        return False
+    
+    # 事件時間以發布日期為參考點；沒有事件時間描述則以發布日期作為證據時間
+    if expression:
+        reference = datetime.fromisoformat(publish_date) if publish_date else now
+        return parse_time_expression(expression, reference) or False
+    return parse_time_expression(publish_date, now) or False
+
+
+def resolve_evidence_times_batch(evidences, reference_date=None):
+    """
+    批次解析多個證據的時間
+    先以規則在本地解析，剩下的證據合併成一次 LLM 呼叫（全部都能在本地解析則不呼叫 LLM）
+    
+    Args:
+        evidences: [{"text": 證據文本, "published": 搜尋後端的日期欄位或 None}, ...]
+        reference_date: 參考日期（預設為今天）
+    
+    Returns:
+        與 evidences 順序相同的列表；每項為 normalize_time_expression 格式的結果，沒有時間資訊則為 None
+    """
+    if reference_date is None:
+        reference_date = datetime.now()
+    if isinstance(reference_date, str):
+        reference_date = datetime.fromisoformat(reference_date)
+    
+    infos = [None] * len(evidences)
+    excerpts = [fit_to_budget(item.get('text', ''), 'evidence_time') for item in evidences]
+    pending = []
+    for i, item in enumerate(evidences):
+        resolved = _resolve_locally(excerpts[i], item.get('published'), reference_date)
+        if resolved is False:
+            pending.append(i)
+        else:
+            infos[i] = resolved
+    
+    if not pending:
+        return infos
+    
+    system_prompt = """You are a publication date and event time extractor. For EACH numbered evidence text, find
+the date it refers to: the event date if the text describes when something happened, otherwise its publication date.
+Resolve relative expressions ("yesterday", "去年", "3 days ago") against the reference date.
+
+Return ONLY a JSON array with one object per evidence, in order:
+[{"id": 1, "time_expression": "the expression found" or null, "parsed_date": "YYYY-MM-DD" or null,
+  "time_type": "specific_recent" or "relative_recent" or "relative_past" or "no_time_reference",
+  "confidence": "high" or "medium" or "low"}, ...]
+Use parsed_date null and time_type "no_time_reference" when a text has no time information."""
+
+    user_prompt = f"Current reference date: {reference_date.strftime('%Y-%m-%d')}\n\nEvidence:\n"
+    for idx, i in enumerate(pending, 1):
+        user_prompt += f"[{idx}] {excerpts[i]}\n"
+    
+    try:
+        response = call_llm(system_prompt, user_prompt, call_site="temporal")
+        items = parse_json_response(response)
+        for pos, item in enumerate(items if isinstance(items, list) else []):
+            if not isinstance(item, dict):
+                continue
+            try:
+                idx = int(item.get('id', pos + 1))
+            except (TypeError, ValueError):
+                continue
+            if not 1 <= idx <= len(pending) or not item.get('parsed_date'):
+                continue
+            try:
+                datetime.fromisoformat(item['parsed_date'])
+            except (TypeError, ValueError):
+                continue
+            infos[pending[idx - 1]] = {
+                "parsed_date": item['parsed_date'],
+                "confidence": item.get('confidence', 'medium'),
+                "time_type": item.get('time_type', 'relative_past'),
+                "original_expression": item.get('time_expression') or item['parsed_date'],
+                "explanation": "Batch LLM extraction"
+            }
+    except Exception as e:
+        print(f"Error in batch evidence time extraction: {e}")
+    
+    return infos
+
+
+def check_temporal_relevance_batch(claim_time_info, evidence_time_infos):
+    """
+    批次檢查多個證據的時間相關性：claim 的時間範圍只計算一次，再對整個列表做日期範圍比較
+    
+    Args:
+        claim_time_info: normalize_time_expression() 的輸出
+        evidence_time_infos: resolve_evidence_times_batch() 的輸出（項目可為 None）
+    
+    Returns:
+        與 evidence_time_infos 順序相同的列表；每項為 is_temporally_relevant 格式的結果，
+        沒有時間資訊的證據為 None
+    """
+    results = [None] * len(evidence_time_infos)
+    dated = [
+        (i, info) for i, info in enumerate(evidence_time_infos)
+        if info and info.get('parsed_date')
+    ]
+    if not dated:
+        return results
+    
+    time_range = (None, None)
+    if claim_time_info.get('time_type') != 'no_time_reference':
+        time_range = calculate_time_range(
+            claim_time_info['time_type'],
+            claim_time_info['parsed_date'],
+            claim_time_info.get('original_expression', ''),
+            claim_time_info.get('granularity')
+        )
+    
+    # claim 沒有時間限制或無法計算範圍：沿用單筆版本的回傳格式
+    if time_range[0] is None:
+        for i, info in dated:
+            results[i] = is_temporally_relevant(claim_time_info, info)
+        return results
+    
+    # 以 datetime64 陣列一次比較所有證據日期，逐筆只組裝結果
+    start_date, end_date = time_range
+    start, end = np.datetime64(start_date.date()), np.datetime64(end_date.date())
+    dates = np.array([info['parsed_date'][:10] for _, info in dated], dtype="datetime64[D]")
+    too_old = (start - dates).astype(np.int64)
+    too_recent = (dates - end).astype(np.int64)
+    status = np.where(too_old > 0, "too_old", np.where(too_recent > 0, "too_recent", "relevant"))
+    deviation = np.maximum(too_old, 0) + np.maximum(too_recent, 0)
+    
+    expected_range = f"{start_date.date()} ~ {end_date.date()}"
+    for (i, _), date, item_status, days in zip(dated, dates.astype(str), status.tolist(), deviation.tolist()):
+        if item_status == "too_old":
+            explanation = f"Evidence is {days} days older than expected range"
+        elif item_status == "too_recent":
+            explanation = f"Evidence is {days} days newer than expected range"
+        else:
+            explanation = "Evidence date falls within expected range"
+        results[i] = {
+            "is_relevant": item_status == "relevant",
+            "status": item_status,
+            "expected_range": expected_range,
+            "evidence_date": date,
+            "deviation_days": days,
+            "explanation": explanation
+        }
+    return results
+
+
 if __name__ == "__main__":
     # 測試
     print("=== 測試時間標準化 ===")
@@ -370,11 +654,7 @@ if __name__ == "__main__":
     print("\n=== 測試時間相關性判斷 ===")
     
     # 測試案例：新聞說「去年」，證據是 2024 年
-    claim_info = {
-        "parsed_date": "2025-06-15",  # claim 發布於 2025-06-15
-        "time_type": "relative_past",
-        "original_expression": "去年"
-    }
+    claim_info = normalize_time_expression("去年", "2025-06-15")  # claim 發布於 2025-06-15
     
     evidence_info_valid = {
         "parsed_date": "2024-05-01"  # 2024 年的證據
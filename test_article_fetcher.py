@@ -0,0 +1,145 @@
+"""
+測試證據原文抓取（本機 HTTP fixture server，不連外網）
+"""
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+import article_fetcher
+from article_fetcher import ArticleFetcher, enrich_with_article_text, select_relevant_passage
+from token_budget import split_sentences
+
+NEWS_HTML = (
+    "<html><body><nav>首頁 | 國際 | 財經</nav><article>"
+    "<h1>台北今天凌晨發生規模6.0地震</h1>"
+    "<p>中央氣象署表示，台北市今天凌晨3點發生規模6.0地震，震央位於信義區。</p>"
+    "<p>地震造成多棟建築物受損，目前已知有50人受傷，消防局動員超過200名消防員。</p>"
+    "<p>氣象署提醒民眾留意餘震，未來一週仍可能發生規模4以上地震。</p>"
+    "</article><footer>版權所有</footer></body></html>"
+)
+EMPTY_HTML = "<html><body><script>var x = 1;</script></body></html>"
+
+
+class _Fixture:
+    """記錄每個路徑的請求數與同時進行的最大請求數"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.active = 0
+        self.max_active = 0
+
+
+@pytest.fixture
+def server():
+    fixture = _Fixture()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            with fixture.lock:
+                fixture.requests[path] = fixture.requests.get(path, 0) + 1
+                fixture.active += 1
+                fixture.max_active = max(fixture.max_active, fixture.active)
+            try:
+                if path == "/slow":
+                    time.sleep(1.5)
+                elif path.startswith("/busy"):
+                    time.sleep(0.2)
+                body = (EMPTY_HTML if path == "/empty" else NEWS_HTML).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            finally:
+                with fixture.lock:
+                    fixture.active -= 1
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    fixture.base = f"http://127.0.0.1:{httpd.server_port}"
+    yield fixture
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_split_sentences_rule():
+    """
+    測試切句
+    預期：依句末標點與換行切開，串接後等於原文
+    """
+    text = "第一句。第二句！Third one. Fourth?\n最後"
+    sentences = split_sentences(text)
+    assert sentences == ["第一句。", "第二句！", "Third one. ", "Fourth?\n", "最後"]
+    assert "".join(sentences) == text
+    assert split_sentences("") == []
+
+
+def test_select_relevant_passage_rule():
+    """
+    測試段落挑選
+    預期：預算內挑出與 claim 重疊最多的句子
+    """
+    text = "天氣晴朗，適合出遊。台北發生地震，50人受傷。股市今天上漲。"
+    assert select_relevant_passage(text, "台北地震50人受傷", max_tokens=12) == "台北發生地震，50人受傷。"
+
+
+def test_per_host_cap_rule(server):
+    """
+    測試每個 host 的並行上限
+    預期：同一 host 同時進行的請求不超過 per_host
+    """
+    fetcher = ArticleFetcher(workers=6, per_host=2)
+    results = fetcher.fetch_many([f"{server.base}/busy{i}" for i in range(6)], budget=5)
+    assert len(results) == 6
+    assert server.max_active == 2
+
+
+def test_budget_cutoff_rule(server):
+    """
+    測試整批抓取的時間預算
+    預期：預算內完成的網頁回傳，慢的網頁直接略過且不拖長整批時間
+    """
+    fetcher = ArticleFetcher(workers=4, per_host=4)
+    start = time.time()
+    results = fetcher.fetch_many([f"{server.base}/news", f"{server.base}/slow"], budget=0.5)
+    assert time.time() - start < 1.2
+    assert list(results) == [f"{server.base}/news"]
+
+
+def test_cache_hit_rule(server):
+    """
+    測試正文快取
+    預期：只差追蹤參數的 URL 視為同一篇文章，第二次讀取命中快取不再下載
+    """
+    fetcher = ArticleFetcher()
+    first = fetcher.fetch(f"{server.base}/news?utm_source=feed")
+    second = fetcher.fetch(f"{server.base}/news")
+    assert first is second
+    assert server.requests["/news"] == 1
+    assert fetcher.stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+
+def test_enrich_falls_back_to_snippet_rule(server, monkeypatch):
+    """
+    測試證據強化
+    預期：成功抓取的結果換成相關段落並保留原摘要；重複內容、無正文與逾時的結果維持原摘要
+    """
+    monkeypatch.setattr(article_fetcher, "_fetcher", ArticleFetcher(workers=4, per_host=4))
+    results = [
+        {"title": "地震", "body": "台北地震…", "href": f"{server.base}/news?utm_source=feed"},
+        {"title": "地震（轉載）", "body": "台北地震…", "href": f"{server.base}/news"},
+        {"title": "慢速網站", "body": "原始摘要", "href": f"{server.base}/slow"},
+        {"title": "無正文", "body": "原始摘要", "href": f"{server.base}/empty"},
+    ]
+    assert enrich_with_article_text(results, "台北今天發生地震，50人受傷", budget=0.5) == 1
+    assert results[0]["snippet"] == "台北地震…"
+    assert "地震" in results[0]["body"] and results[0]["body"] != "台北地震…"
+    for r in results[1:]:
+        assert "snippet" not in r
+    assert [r["body"] for r in results[1:]] == ["台北地震…", "原始摘要", "原始摘要"]
@@ -0,0 +1,38 @@
+"""
+測試證據池的 URL 標準化（不呼叫 API）
+"""
+from evidence_pool import canonicalize_url
+
+
+def test_canonicalize_url_rule():
+    """
+    測試同一篇文章的不同網址寫法
+    預期：追蹤參數、www.、AMP 版本都被移除，得到相同結果
+    """
+    expected = "https://example.com/news/123"
+    for url in [
+        "https://www.example.com/news/123",
+        "http://example.com/news/123/?utm_source=x&fbclid=abc",
+        "https://amp.example.com/news/123",
+        "https://www.example.com/news/123/amp",
+        "https://www-example-com.cdn.ampproject.org/c/s/www.example.com/news/123",
+        "https://www.google.com/amp/s/www.example.com/news/123",
+    ]:
+        print(f"{url} → {canonicalize_url(url)}")
+        assert canonicalize_url(url) == expected
+
+
+def test_canonicalize_amp_host_rule():
+    """
+    測試 amp. 開頭的網域
+    預期：只有去掉 amp. 後仍是可註冊網域時才移除，amp.dev 等網站本身不被改寫
+    """
+    cases = [
+        ("https://amp.bbc.co.uk/news/1", "https://bbc.co.uk/news/1"),
+        ("https://amp.dev/x", "https://amp.dev/x"),
+        ("https://amp.co.uk/x", "https://amp.co.uk/x"),
+        ("https://amp.com.tw/x", "https://amp.com.tw/x"),
+    ]
+    for url, expected in cases:
+        print(f"{url} → {canonicalize_url(url)}")
+        assert canonicalize_url(url) == expected
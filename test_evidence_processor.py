@@ -0,0 +1,81 @@
+"""
+測試 verify_claim 的搜尋階段與地點預過濾（不呼叫 API，以假的搜尋與官方來源判定取代）
+"""
+import time
+import threading
+import evidence_processor
+from evidence_processor import search_general_sources, verify_claim, is_evidence_potentially_relevant, _clean_query
+
+
+def test_general_search_cancelled_rule(monkeypatch):
+    """
+    測試取消 speculative 一般搜尋
+    預期：已取消時不送出搜尋，返回空結果
+    """
+    searched = []
+    monkeypatch.setattr(evidence_processor, "web_search", lambda q, max_results=5: searched.append(q) or [])
+    cancelled = threading.Event()
+    cancelled.set()
+    assert search_general_sources("claim", "台北 地震", cancelled) == ("台北 地震", [])
+    assert searched == []
+
+
+def test_official_verdict_skips_general_search_rule(monkeypatch):
+    """
+    測試官方來源已有結論
+    預期：不等待進行中的背景一般搜尋直接返回；搜尋結束後這個請求的背景執行緒全部結束
+    """
+    release = threading.Event()
+
+    def slow_search(query, max_results=5):
+        release.wait(5)
+        return []
+
+    verdict = {"verdict": "Supported", "explanation": "official", "evidence_count": 1}
+    monkeypatch.setattr(evidence_processor, "web_search", slow_search)
+    monkeypatch.setattr(evidence_processor, "search_official_sources", lambda claim, query=None: verdict)
+
+    start = time.time()
+    assert verify_claim("claim", temporal_check=False, search_query="台北 地震") is verdict
+    assert time.time() - start < 1
+
+    release.set()
+    deadline = time.time() + 2
+    while any(t.name.startswith("search-phase") for t in threading.enumerate()) and time.time() < deadline:
+        time.sleep(0.01)
+    assert not any(t.name.startswith("search-phase") for t in threading.enumerate())
+
+
+def test_location_filter_well_known_places_rule():
+    """
+    測試台灣 claim 的地點預過濾
+    預期：只提到知名外國城市 / 行政區的證據被過濾（兩字簡稱也一樣）；
+    同時提到台灣地點、或兩字地名只是一般詞彙一部分的證據保留
+    """
+    claim = "台北今天凌晨發生規模6.0地震"
+    for text in ["北京今天發生地震", "上海股市今天收盤", "香港恆生指數上漲", "東京今天下雨",
+                 "首爾發生火災", "加州發生地震", "Magnitude 6 quake hits Tokyo"]:
+        assert not is_evidence_potentially_relevant(claim, text, ""), text
+    for text in ["台北與東京同步有感", "中環境保護署公告", "祝大家平安順利", "地震規模說明"]:
+        assert is_evidence_potentially_relevant(claim, text, ""), text
+
+
+def test_location_filter_scope_rule():
+    """
+    測試地點預過濾的範圍
+    預期：只對提到台灣地點的 claim 過濾；其他國家的 claim 提到外國城市的證據保留給 LLM
+    """
+    assert is_evidence_potentially_relevant("美國總統川普宣布加徵關稅", "Trump visits Paris, France", "")
+    assert is_evidence_potentially_relevant("日本岩手縣發生地震", "首爾今天也有感", "")
+
+
+def test_clean_query_keeps_country_rule():
+    """
+    測試補回 claim 中的地名
+    預期：query 只剩下層地點時補回國名；query 已有同一地點或其下層地點時不重複加入
+    """
+    assert _clean_query("日本岩手縣發生規模6.9地震", "岩手縣 地震") == "日本 岩手縣 地震"
+    assert _clean_query("日本岩手縣發生規模6.9地震", "地震") == "日本 岩手縣 地震"
+    assert _clean_query("Iwate, Japan earthquake", "Iwate earthquake") == "Japan Iwate earthquake"
+    assert _clean_query("台北今天凌晨發生地震", "\"地震 傷亡\"") == "台北 地震 傷亡"
+    assert _clean_query("台北今天凌晨發生地震", "臺北市 地震") == "臺北市 地震"
@@ -0,0 +1,70 @@
+"""
+測試 LLM 回應快取（不呼叫 API，使用暫存的 SQLite 檔案）
+"""
+import time
+import llm_helpers
+from llm_cache import LLMCache, make_cache_key
+
+
+def test_cache_ttl_rule(tmp_path):
+    """
+    測試快取存活時間
+    預期：到期前命中，到期後視為未命中
+    """
+    cache = LLMCache(str(tmp_path / "cache.sqlite"))
+    cache.set("k", "response", ttl=0.2)
+    assert cache.get("k") == "response"
+    time.sleep(0.3)
+    assert cache.get("k") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_lru_eviction_rule(tmp_path):
+    """
+    測試超過容量時的 LRU 淘汰
+    預期：最近讀取過的項目保留，最久未使用的項目被淘汰，筆數回到容量以下
+    """
+    cache = LLMCache(str(tmp_path / "cache.sqlite"), max_entries=10)
+    for i in range(10):
+        cache.set(f"k{i}", f"v{i}", ttl=60)
+        time.sleep(0.002)
+    cache.get("k0")   # k0 變成最近使用
+    cache.set("k0", "v0", ttl=60)   # 覆寫已存在的鍵不增加筆數
+    assert cache.stats()["entries"] == 10
+
+    cache.set("k10", "v10", ttl=60)
+    entries = cache.stats()["entries"]
+    assert entries <= 10
+    assert cache.get("k0") == "v0"
+    assert cache.get("k10") == "v10"
+    assert cache.get("k1") is None
+
+    # 重新開啟同一個檔案時筆數從資料庫讀取
+    assert LLMCache(str(tmp_path / "cache.sqlite"), max_entries=10).stats()["entries"] == entries
+
+
+def test_cache_key_rule(monkeypatch):
+    """
+    測試快取鍵的組成
+    預期：model、system prompt、user prompt 任一不同都得到不同的鍵；
+    不同呼叫位置路由到不同模型時不共用快取
+    """
+    base = make_cache_key("m", "system", "user")
+    assert base == make_cache_key("m", "system", "user")
+    assert base != make_cache_key("m2", "system", "user")
+    assert base != make_cache_key("m", "system2", "user")
+    assert base != make_cache_key("m", "system", "user2")
+    # 欄位之間有分隔，不會因為字串接在一起而相同
+    assert make_cache_key("m", "ab", "c") != make_cache_key("m", "a", "bc")
+
+    monkeypatch.setattr(llm_helpers, "CACHE_DISABLED", False)
+    monkeypatch.setattr(llm_helpers, "get_llm_cache", lambda: LLMCache(":memory:"))
+    monkeypatch.setitem(llm_helpers.MODEL_ROUTES, "stance", "small-model")
+    monkeypatch.setitem(llm_helpers.MODEL_ROUTES, "temporal", "other-model")
+    stance_key, _, _ = llm_helpers._cache_lookup(
+        llm_helpers.get_model("stance"), "s", "u", "stance", True)
+    temporal_key, _, _ = llm_helpers._cache_lookup(
+        llm_helpers.get_model("temporal"), "s", "u", "temporal", True)
+    assert stance_key == make_cache_key("small-model", "s", "u")
+    assert stance_key != temporal_key
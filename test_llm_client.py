@@ -0,0 +1,142 @@
+"""
+測試 LLM Client 的斷路器、重試與 hedged request（不呼叫 API，以假的 session 取代 requests.Session）
+"""
+import time
+import threading
+import pytest
+import requests
+import llm_client
+from llm_client import LLMClient, CircuitBreaker
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = headers or {}
+        self.closed = False
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.exceptions.HTTPError(f"{self.status_code} error", response=self)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    """依序執行 actions：FakeResponse 直接返回、例外直接拋出、(秒數, 回應) 先等待再返回"""
+
+    def __init__(self, actions):
+        self.actions = list(actions)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def post(self, url, **kwargs):
+        with self._lock:
+            action = self.actions[min(self.calls, len(self.actions) - 1)]
+            self.calls += 1
+        if isinstance(action, tuple):
+            time.sleep(action[0])
+            action = action[1]
+        if isinstance(action, Exception):
+            raise action
+        return action
+
+
+def _client(monkeypatch, actions, **kwargs):
+    monkeypatch.setattr(llm_client, "_backoff_delay", lambda attempt, retry_after=None: 0)
+    client = LLMClient(base_url="http://gateway.test", api_key="test-key",
+                       breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60), **kwargs)
+    client.session = FakeSession(actions)
+    return client
+
+
+def test_breaker_late_success_does_not_close_rule():
+    """
+    測試斷路器開啟前放行的請求在開啟後才成功
+    預期：斷路器維持開啟
+    """
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    slow = breaker.acquire()
+    failing = breaker.acquire()
+    breaker.record_failure(failing)
+    assert breaker.state == "open"
+    breaker.record_success(slow)
+    breaker.release(slow)
+    assert breaker.state == "open"
+    assert breaker.acquire() is None
+
+
+def test_breaker_probe_rule():
+    """
+    測試 half_open 的探測請求
+    預期：只放行一個探測；非探測請求的失敗不會清除探測；探測成功後關閉，探測被取消則重新開啟
+    """
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    stale = breaker.acquire()
+    breaker.record_failure(stale)
+    assert breaker.state == "open"
+    time.sleep(0.1)
+
+    probe = breaker.acquire()
+    assert probe is not None and breaker.state == "half_open"
+    breaker.record_failure(stale)
+    assert breaker.acquire() is None
+    breaker.record_success(probe)
+    breaker.release(probe)
+    assert breaker.state == "closed"
+
+    breaker.record_failure(breaker.acquire())
+    time.sleep(0.1)
+    probe = breaker.acquire()
+    breaker.release(probe)
+    assert breaker.state == "open"
+
+
+def test_retry_on_server_error_rule(monkeypatch):
+    """
+    測試 5xx 退避重試
+    預期：503 之後重試並返回 200 的回應，斷路器維持關閉
+    """
+    first = FakeResponse(503, {"Retry-After": "1"})
+    client = _client(monkeypatch, [first, FakeResponse(200)])
+    r = client.post_chat({"model": "m"})
+    assert r.status_code == 200
+    assert first.closed
+    assert client.session.calls == 2
+    assert client.stats()["retries"] == 1
+    assert client.breaker.state == "closed"
+
+
+def test_read_timeout_not_retried_rule(monkeypatch):
+    """
+    測試讀取逾時
+    預期：不重試，直接拋出並計入斷路器；連線錯誤則會重試
+    """
+    client = _client(monkeypatch, [requests.exceptions.ReadTimeout("slow"), FakeResponse(200)])
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        client.post_chat({"model": "m"})
+    assert client.session.calls == 1
+    assert client.breaker.snapshot()["consecutive_failures"] == 1
+
+    client = _client(monkeypatch, [requests.exceptions.ConnectionError("reset"), FakeResponse(200)])
+    assert client.post_chat({"model": "m"}).status_code == 200
+    assert client.session.calls == 2
+
+
+def test_hedged_request_rule(monkeypatch):
+    """
+    測試 hedged request
+    預期：第一個請求超過延遲門檻時送出第二個請求，先回來的 hedge 結果被採用，較慢的回應被關閉
+    """
+    slow = FakeResponse(200)
+    client = _client(monkeypatch, [(0.5, slow), FakeResponse(200)], hedge_percentile=50)
+    client._latencies.extend([0.01] * llm_client.HEDGE_MIN_SAMPLES)
+    r = client.post_chat({"model": "m"})
+    assert r is not slow
+    stats = client.stats()
+    assert stats["hedges_fired"] == 1
+    assert stats["hedges_won"] == 1
+    time.sleep(0.6)
+    assert slow.closed
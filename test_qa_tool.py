@@ -0,0 +1,99 @@
+"""
+Tests for the web_search result cache (offline: the search backend is replaced by a fake)
+"""
+import time
+import qa_tool
+from qa_tool import SearchCache, normalize_query, web_search
+
+
+class FakeBackend:
+    name = "fake"
+
+    def __init__(self, results):
+        self.results = results
+        self.calls = 0
+
+    def search(self, query, max_results):
+        self.calls += 1
+        if isinstance(self.results, Exception):
+            raise self.results
+        return self.results[:max_results]
+
+
+def _install(monkeypatch, results, ttl=60, negative_ttl=60):
+    backend = FakeBackend(results)
+    monkeypatch.setattr(qa_tool, "get_search_backend", lambda: backend)
+    monkeypatch.setattr(qa_tool, "search_cache", SearchCache())
+    monkeypatch.setattr(qa_tool, "SEARCH_CACHE_TTL", ttl)
+    monkeypatch.setattr(qa_tool, "SEARCH_NEGATIVE_TTL", negative_ttl)
+    return backend
+
+
+def test_search_cache_ttl_rule():
+    """
+    Entries are served until their TTL passes, then treated as a miss and dropped
+    """
+    cache = SearchCache()
+    cache.set("k", [{"title": "t"}], ttl=0.2)
+    assert cache.get("k") == [{"title": "t"}]
+    time.sleep(0.3)
+    assert cache.get("k") is None
+    assert cache.stats() == {"entries": 0, "max_entries": cache.max_entries, "hits": 1, "misses": 1}
+
+
+def test_search_cache_lru_rule():
+    """
+    The least recently used entry is evicted when the cache is full
+    """
+    cache = SearchCache(max_entries=2)
+    cache.set("a", [], ttl=60)
+    cache.set("b", [], ttl=60)
+    cache.get("a")
+    cache.set("c", [], ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") == []
+    assert cache.get("c") == []
+
+
+def test_web_search_cache_hit_rule(monkeypatch):
+    """
+    Queries differing only in case, spacing or site: order share one cached search,
+    and each caller gets its own copies of the results
+    """
+    backend = _install(monkeypatch, [{"title": "t", "body": "b", "href": "https://a.example"}])
+    first = web_search("Taiwan  Earthquake site:b.org OR site:a.org")
+    first[0]["title"] = "annotated"
+    second = web_search("taiwan earthquake site:a.org OR site:b.org")
+    assert backend.calls == 1
+    assert second[0]["title"] == "t"
+    assert normalize_query("Taiwan  Earthquake site:b.org OR site:a.org") == \
+        "taiwan earthquake (site:a.org OR site:b.org)"
+
+
+def test_web_search_negative_entry_expiry_rule(monkeypatch):
+    """
+    Empty and failed searches are cached with the short negative TTL, then retried
+    """
+    backend = _install(monkeypatch, RuntimeError("rate limited"), ttl=60, negative_ttl=0.2)
+    assert web_search("query") == []
+    assert web_search("query") == []
+    assert backend.calls == 1
+
+    time.sleep(0.3)
+    backend.results = [{"title": "t", "body": "b", "href": "https://a.example"}]
+    assert len(web_search("query")) == 1
+    assert backend.calls == 2
+    # positive results use the long TTL
+    time.sleep(0.3)
+    web_search("query")
+    assert backend.calls == 2
+
+
+def test_web_search_bypass_cache_rule(monkeypatch):
+    """
+    use_cache=False always searches
+    """
+    backend = _install(monkeypatch, [{"title": "t", "body": "b", "href": "https://a.example"}])
+    web_search("query")
+    web_search("query", use_cache=False)
+    assert backend.calls == 2
@@ -0,0 +1,72 @@
+"""
+測試本地詞彙相關性過濾（不呼叫 API）
+"""
+import numpy as np
+from relevance_scorer import score_relevance, filter_by_relevance
+
+CLAIM = "台北今天凌晨發生規模6.0地震，50人受傷"
+
+OFF_TOPIC = [
+    {"title": "東京股市收盤", "body": "日經指數今天上漲1.2%，科技股領漲。"},
+    {"title": "麻疹疫情", "body": "疾管署今天公布新增2例麻疹病例，均為境外移入。"},
+    {"title": "國內新聞", "body": "國內今天新增多起車禍。"},
+    {"title": "川普關稅", "body": "美國總統川普宣布對中國進口商品加徵25%關稅。"},
+]
+
+
+def test_relevance_ranking_rule():
+    """
+    測試排序與相對門檻
+    預期：最相關的結果分數為 1 排第一；無法比較的英文結果保留並排在最後；只共用少數詞的結果被過濾
+    """
+    results = [
+        OFF_TOPIC[0],
+        {"title": "台北地震50人受傷", "body": "台北市今天凌晨發生規模6.0地震，已知50人受傷。"},
+        {"title": "Taipei earthquake", "body": "A magnitude 6.0 quake hit Taipei early today."},
+        {"title": "台北今天天氣", "body": "台北今天晴時多雲，午後可能有雷陣雨。"},
+    ]
+    scores = score_relevance(CLAIM, results)
+    assert scores[1] == 1.0
+    assert np.isnan(scores[2])
+
+    kept, dropped = filter_by_relevance(CLAIM, [dict(r) for r in results])
+    assert [r["title"] for r in kept] == ["台北地震50人受傷", "台北今天天氣", "Taipei earthquake"]
+    assert kept[-1]["relevance_score"] is None
+    assert dropped == 1
+
+
+def test_all_irrelevant_batch_rule():
+    """
+    測試整批都離題
+    預期：正規化後最高分仍為 1，但沒有結果通過 claim 詞彙覆蓋率下限，min_keep 也不會保留離題結果
+    """
+    results = [dict(r) for r in OFF_TOPIC]
+    assert np.nanmax(score_relevance(CLAIM, results)) == 1.0
+    kept, dropped = filter_by_relevance(CLAIM, results, min_keep=2)
+    assert kept == []
+    assert dropped == len(OFF_TOPIC)
+
+
+def test_zero_overlap_floor_rule():
+    """
+    測試沒有共同詞彙的結果
+    預期：覆蓋率下限與相對門檻都設為 0 時，沒有任何 claim 詞彙的結果仍被捨棄
+    """
+    results = [dict(r) for r in OFF_TOPIC]
+    kept, dropped = filter_by_relevance(CLAIM, results, threshold=0, min_keep=0, min_coverage=0)
+    assert "川普關稅" not in [r["title"] for r in kept]
+    assert dropped == 1
+
+
+def test_min_keep_rule():
+    """
+    測試 min_keep
+    預期：通過覆蓋率下限但低於相對門檻的結果中，保留最高分的一則
+    """
+    results = [
+        {"title": "台北今天天氣", "body": "台北今天晴時多雲，午後可能有雷陣雨。"},
+        {"title": "地震規模", "body": "台北今天凌晨的地震規模為6.0。"},
+    ]
+    kept, dropped = filter_by_relevance(CLAIM, [dict(r) for r in results], threshold=1.01, min_keep=1)
+    assert [r["title"] for r in kept] == ["地震規模"]
+    assert dropped == 1
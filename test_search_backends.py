@@ -0,0 +1,74 @@
+"""
+Tests for the offline BM25 search backend and query helpers
+"""
+import json
+from search_backends import BM25Backend, split_site_filters, tokenize
+
+DOCS = [
+    {"title": "台北發生地震", "body": "台北今天凌晨發生規模6.0地震，多處停電。", "href": "https://www.cwa.gov.tw/news/1"},
+    {"title": "高雄天氣", "body": "高雄今天晴時多雲，午後有雷陣雨。", "href": "https://news.example.com/weather"},
+    {"title": "Earthquake in Taipei", "body": "A magnitude 6.0 earthquake struck Taipei.", "href": "https://www.reuters.com/world/1"},
+    {"title": "地震保險", "body": "地震險理賠說明。", "href": "https://insurance.example.com/quake", "date": "2024-01-01"},
+]
+
+
+def test_tokenize_rule():
+    """
+    Latin words are lower-cased without OR/AND operators; CJK runs become bigrams
+    """
+    assert tokenize("Taipei OR Earthquake") == ["taipei", "earthquake"]
+    assert tokenize("台北地震") == ["台北", "北地", "地震"]
+    assert tokenize("雨") == ["雨"]
+
+
+def test_split_site_filters_rule():
+    """
+    site: filters are separated from keywords, including grouped OR filters
+    """
+    assert split_site_filters("taiwan gdp (site:.gov OR site:WHO.int)") == ("taiwan gdp", [".gov", "who.int"])
+    assert split_site_filters("台北 地震 site:cwa.gov.tw") == ("台北 地震", ["cwa.gov.tw"])
+    assert split_site_filters("no filters here") == ("no filters here", [])
+
+
+def test_bm25_ranking_rule():
+    """
+    Documents matching more query terms (and in the title) rank first;
+    documents without any query term are not returned
+    """
+    backend = BM25Backend(DOCS)
+    results = backend.search("台北 地震", max_results=5)
+    hrefs = [r["href"] for r in results]
+    assert hrefs[0] == "https://www.cwa.gov.tw/news/1"
+    assert "https://insurance.example.com/quake" in hrefs
+    assert "https://news.example.com/weather" not in hrefs
+
+    results = backend.search("Taipei earthquake")
+    assert [r["href"] for r in results] == ["https://www.reuters.com/world/1"]
+    assert backend.search("volcano") == []
+
+
+def test_bm25_site_filter_and_limit_rule():
+    """
+    site: filters match the host and its subdomains; max_results caps the list;
+    extra document fields are passed through as copies
+    """
+    backend = BM25Backend(DOCS)
+    results = backend.search("地震 (site:gov.tw OR site:reuters.com)")
+    assert [r["href"] for r in results] == ["https://www.cwa.gov.tw/news/1"]
+    assert len(backend.search("地震", max_results=1)) == 1
+
+    result = backend.search("地震保險")[0]
+    assert result["date"] == "2024-01-01"
+    result["title"] = "changed"
+    assert backend.documents[3]["title"] == "地震保險"
+
+
+def test_bm25_from_jsonl_rule(tmp_path):
+    """
+    A JSON Lines corpus loads into the same index, skipping blank lines
+    """
+    path = tmp_path / "corpus.jsonl"
+    path.write_text("\n".join(json.dumps(d, ensure_ascii=False) for d in DOCS) + "\n\n", encoding="utf-8")
+    backend = BM25Backend.from_jsonl(str(path))
+    assert len(backend.documents) == len(DOCS)
+    assert backend.search("高雄")[0]["href"] == "https://news.example.com/weather"
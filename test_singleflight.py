@@ -0,0 +1,127 @@
+"""
+測試 single-flight 請求合併（不呼叫 API）
+"""
+import gc
+import asyncio
+import threading
+from singleflight import SingleFlight, AsyncSingleFlight
+
+
+def test_singleflight_shared_result_rule():
+    """
+    測試執行緒版本
+    預期：同 key 的並行呼叫只執行一次並取得相同結果
+    """
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait(2)
+        return "result"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", fn)))
+    leader.start()
+    started.wait(2)
+    follower = threading.Thread(target=lambda: results.append(flight.do("k", fn)))
+    follower.start()
+    while flight.stats()["shared"] == 0:
+        pass
+    release.set()
+    leader.join()
+    follower.join()
+    assert results == ["result", "result"]
+    assert len(calls) == 1
+    assert flight.stats() == {"executed": 1, "shared": 1, "in_flight": 0}
+
+
+def test_async_singleflight_waiter_timeout_rule():
+    """
+    測試 asyncio 版本的個別等待者逾時
+    預期：其他等待者仍取得結果；只有一個等待者逾時時共用的 task 不會被取消
+    """
+    async def main():
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.2)
+            return "result"
+
+        impatient = asyncio.ensure_future(asyncio.wait_for(flight.do("k", fetch), timeout=0.05))
+        patient = asyncio.ensure_future(flight.do("k", fetch))
+        results = await asyncio.gather(impatient, patient, return_exceptions=True)
+        assert isinstance(results[0], asyncio.TimeoutError)
+        assert results[1] == "result"
+        assert len(calls) == 1
+        assert flight.stats()["in_flight"] == 0
+
+    asyncio.run(main())
+
+
+def test_async_singleflight_last_waiter_cancels_rule():
+    """
+    測試最後一個等待者離開
+    預期：共用的 task 被取消、不再佔用 in_flight；之後的相同請求重新執行
+    """
+    async def main():
+        flight = AsyncSingleFlight()
+        cancelled = []
+
+        async def fetch():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+            return "stale"
+
+        async def quick():
+            return "fresh"
+
+        waiters = [asyncio.ensure_future(flight.do("k", fetch)) for _ in range(2)]
+        await asyncio.sleep(0)
+        waiters[0].cancel()
+        try:
+            await asyncio.wait_for(waiters[1], timeout=0.05)
+        except asyncio.TimeoutError:
+            pass
+        assert flight.stats()["in_flight"] == 0
+        await asyncio.sleep(0)
+        assert cancelled == [1]
+        assert await flight.do("k", quick) == "fresh"
+
+    asyncio.run(main())
+
+
+def test_async_singleflight_exception_retrieved_rule():
+    """
+    測試等待者都已離開後 task 才失敗
+    預期：例外已被取出，event loop 不會記錄 "Task exception was never retrieved"
+    """
+    errors = []
+
+    async def main():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, ctx: errors.append(ctx))
+        flight = AsyncSingleFlight()
+
+        async def fetch():
+            try:
+                await asyncio.sleep(10)
+            finally:
+                raise RuntimeError("gateway error")
+
+        waiter = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0.05)
+        gc.collect()
+
+    asyncio.run(main())
+    gc.collect()
+    assert errors == []
@@ -0,0 +1,68 @@
+"""
+測試來源可信度分級（不呼叫 API）
+"""
+import pytest
+from source_tiers import DomainTrie, classify_host, get_source_tier, load_domain_rules
+
+
+def test_domain_trie_rule():
+    """
+    測試字典樹比對
+    預期：子網域繼承規則；取最具體的規則；以完整標籤比對；重複加入以後者為準且不重複計數
+    """
+    trie = DomainTrie([("afp.com", "wire"), ("factcheck.afp.com", "fact-checker"), ("un.org", "official")])
+    assert len(trie) == 3
+    assert trie.lookup("afp.com") == "wire"
+    assert trie.lookup("www.afp.com") == "wire"
+    assert trie.lookup("factcheck.afp.com") == "fact-checker"
+    assert trie.lookup("en.factcheck.afp.com") == "fact-checker"
+    assert trie.lookup("news.un.org") == "official"
+    assert trie.lookup("fun.org") is None
+    assert trie.lookup("com") is None
+    assert trie.lookup("example.com") is None
+
+    trie.insert("afp.com", "established")
+    assert len(trie) == 3
+    assert trie.lookup("www.afp.com") == "established"
+    assert len(DomainTrie()) == 0
+
+
+def test_classify_host_rule():
+    """
+    測試預設資料的主機分級
+    預期：不分大小寫、忽略結尾的點；使用者自行發布的平台維持 standard
+    """
+    assert classify_host("www.cna.com.tw") == "wire"
+    assert classify_host("WWW.CNA.COM.TW.") == "wire"
+    assert classify_host("factcheck.afp.com") == "fact-checker"
+    assert classify_host("www.afp.com") == "wire"
+    for host in ["www.youtube.com", "www.facebook.com", "medium.com", "www.ptt.cc", "example.com"]:
+        assert classify_host(host) == "standard", host
+
+
+def test_get_source_tier_rule():
+    """
+    測試 URL 解析
+    預期：接受不含 scheme 的網域與 port；無法解析的 URL 視為 standard
+    """
+    assert get_source_tier("https://www.cwa.gov.tw/V8/C/E/index.html") == "official"
+    assert get_source_tier("cna.com.tw/news/1") == "wire"
+    assert get_source_tier("https://WWW.BBC.CO.UK:443/news") == "established"
+    assert get_source_tier("https://fun.org.example/un.org") == "standard"
+    assert get_source_tier("") == "standard"
+    assert get_source_tier("http://[::1") == "standard"
+    assert get_source_tier(None) == "standard"
+
+
+def test_load_domain_rules_rule(tmp_path):
+    """
+    測試資料檔讀取
+    預期：略過註解與空行、網域轉小寫；未知等級報錯並指出行號
+    """
+    path = tmp_path / "tiers.tsv"
+    path.write_text("# comment\n\nExample.ORG.\tlow-credibility\ncna.com.tw\twire\n", encoding="utf-8")
+    assert load_domain_rules(str(path)) == [("example.org", "low-credibility"), ("cna.com.tw", "wire")]
+
+    path.write_text("cna.com.tw\twire\nexample.org\tbogus\n", encoding="utf-8")
+    with pytest.raises(ValueError, match=":2: unknown tier 'bogus'"):
+        load_domain_rules(str(path))
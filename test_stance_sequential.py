@@ -0,0 +1,63 @@
+"""
+測試 sequential 立場判斷的提前停止（不呼叫 API，以固定立場取代 LLM 判斷）
+"""
+import evidence_processor
+from evidence_processor import analyze_evidence_stances_sequential
+
+
+def _evidences(*hosts):
+    return [{"title": f"t{i}", "body": "b", "href": f"https://{host}/a/{i}"} for i, host in enumerate(hosts)]
+
+
+def _fake_stances(monkeypatch, stances):
+    """以 href 順序對應固定立場，並記錄每一輪判斷的證據數"""
+    waves = []
+
+    def fake_parallel(claim, batch, max_workers=None):
+        waves.append(len(batch))
+        return [stances[int(ev["href"].rsplit("/", 1)[1])] for ev in batch]
+
+    monkeypatch.setattr(evidence_processor, "analyze_evidence_stances_parallel", fake_parallel)
+    return waves
+
+
+def test_sequential_early_stop_rule(monkeypatch, capsys):
+    """
+    測試 k 個可信來源一致支持
+    預期：第一輪判斷 k 則後停止，其餘項目為 None，並印出略過的數量
+    """
+    evidences = _evidences(*["news.example.com"] * 8)
+    waves = _fake_stances(monkeypatch, ["support"] * 8)
+    stances = analyze_evidence_stances_sequential("claim", evidences, k=3)
+    assert waves == [3]
+    assert stances == ["support"] * 3 + [None] * 5
+    assert "skipped 5 remaining" in capsys.readouterr().out
+
+
+def test_sequential_waves_rule(monkeypatch, capsys):
+    """
+    測試無關證據與低可信度來源
+    預期：每一輪只判斷還差的數量；低可信度來源的一致立場不計入門檻
+    """
+    evidences = _evidences("a.example.com", "b.example.com", "kknews.cc", "c.example.com",
+                           "d.example.com", "e.example.com")
+    waves = _fake_stances(monkeypatch, ["support", "irrelevant", "support", "support", "support", "support"])
+    monkeypatch.setattr(evidence_processor, "get_source_credibility_tier",
+                        lambda url: "low-credibility" if "kknews.cc" in url else "standard")
+    stances = analyze_evidence_stances_sequential("claim", evidences, k=3)
+    assert waves == [3, 2]
+    assert stances == ["support", "irrelevant", "support", "support", "support", None]
+    assert "skipped 1 remaining" in capsys.readouterr().out
+
+
+def test_sequential_conflict_no_early_stop_rule(monkeypatch, capsys):
+    """
+    測試出現相反立場
+    預期：剩下的證據一次判斷完，不提前停止、沒有 None
+    """
+    evidences = _evidences(*["news.example.com"] * 7)
+    waves = _fake_stances(monkeypatch, ["support", "refute", "support", "support", "support", "support", "irrelevant"])
+    stances = analyze_evidence_stances_sequential("claim", evidences, k=3)
+    assert waves == [3, 4]
+    assert None not in stances
+    assert "Early stop" not in capsys.readouterr().out
@@ -2,6 +2,9 @@
 測試時間相關性檢查功能
 """
 from fake_news_agent import FakeNewsAgent
+from temporal_checker import normalize_time_expression, is_temporally_relevant, check_temporal_relevance_batch
+from time_parser import parse_time_expression
+from datetime import datetime
 import json
 
 
@@ -105,6 +108,125 @@ Content:
     print("\n")
 
 
+def test_rule_based_time_parsing():
+    """
+    測試規則式時間解析（不呼叫 API）
+    預期：常見時間表達式直接由規則解析，結果格式與 LLM 相同
+    """
+    cases = [
+        ("今天", "2026-01-01", "2026-01-01", "specific_recent"),
+        ("今天凌晨3點", "2026-01-01", "2026-01-01", "specific_recent"),
+        ("yesterday", "2026-01-01", "2025-12-31", "specific_recent"),
+        ("昨(31日)", "2026-01-01", "2025-12-31", "specific_recent"),
+        ("昨(31日)", "2026-02-01", "2026-01-31", "specific_recent"),
+        ("3天前", "2026-01-01", "2025-12-29", "specific_recent"),
+        ("上週", "2026-01-01", "2025-12-25", "relative_recent"),
+        ("last month", "2026-01-01", "2025-12-15", "relative_past"),
+        ("去年", "2025-06-01", "2024-06-15", "relative_past"),
+        ("2025-05-01", "2026-01-01", "2025-05-01", "absolute"),
+        ("民國114年5月1日", "2026-01-01", "2025-05-01", "absolute"),
+        ("Dec 25, 2024", "2026-01-01", "2024-12-25", "absolute"),
+    ]
+
+    for time_text, ref_date, expected_date, expected_type in cases:
+        result = normalize_time_expression(time_text, ref_date)
+        print(f"'{time_text}' (參考日期: {ref_date}) → {result['parsed_date']} ({result['time_type']})")
+        assert result["parsed_date"] == expected_date
+        assert result["time_type"] == expected_type
+        assert result["original_expression"] == time_text
+
+
+def test_rule_based_time_parsing_fallback():
+    """
+    測試規則無法完整解析的表達式
+    預期：parse_time_expression 返回 None，交給 LLM 處理
+    """
+    reference = datetime(2026, 1, 1)
+    for time_text in ["最近", "近年來", "疫情期間", "今", "this", "今年", ""]:
+        assert parse_time_expression(time_text, reference) is None
+
+
+
+def test_rule_based_absolute_date_range():
+    """
+    測試明確日期的時間範圍（不呼叫 API）
+    預期：範圍就是寫出來的那一天 / 那個月 / 那一年，不會被當成「去年」往前推一年
+    """
+    cases = [
+        ("2024年12月25日", "2024-12-25", "relevant"),
+        ("2024年12月25日", "2023-12-25", "too_old"),
+        ("2024年12月25日", "2024-12-28", "too_recent"),
+        ("2024年12月", "2024-12-01", "relevant"),
+        ("2024年12月", "2024-11-30", "too_old"),
+        ("2024年", "2024-03-01", "relevant"),
+        ("2024年", "2025-01-02", "too_recent"),
+        ("May 2025", "2025-05-31", "relevant"),
+    ]
+
+    for time_text, evidence_date, expected_status in cases:
+        claim_info = normalize_time_expression(time_text, "2026-01-01")
+        result = is_temporally_relevant(claim_info, {"parsed_date": evidence_date})
+        print(f"'{time_text}' 證據 {evidence_date} → {result['status']} ({result['expected_range']})")
+        assert result["status"] == expected_status
+
+
+def test_rule_based_relative_date_range():
+    """
+    測試相對時間的時間範圍（不呼叫 API）
+    預期：規則已依參考日期往前推，範圍就是那一天 / 那一週 / 那個月 / 那一年，不會再推一次
+    """
+    cases = [
+        ("今天", "2025-12-31 ~ 2026-01-02"),
+        ("3天前", "2025-12-28 ~ 2025-12-30"),
+        ("本週", "2025-12-25 ~ 2026-01-01"),
+        ("上週", "2025-12-18 ~ 2025-12-25"),
+        ("2週前", "2025-12-11 ~ 2025-12-18"),
+        ("上個月", "2025-12-01 ~ 2025-12-31"),
+        ("3個月前", "2025-10-01 ~ 2025-10-31"),
+        ("去年", "2025-01-01 ~ 2025-12-31"),
+        ("前年", "2024-01-01 ~ 2024-12-31"),
+        ("2年前", "2024-01-01 ~ 2024-12-31"),
+    ]
+
+    for time_text, expected_range in cases:
+        claim_info = normalize_time_expression(time_text, "2026-01-01")
+        result = is_temporally_relevant(claim_info, {"parsed_date": expected_range[:10]})
+        print(f"'{time_text}' → {result['expected_range']}")
+        assert result["expected_range"] == expected_range
+        assert result["status"] == "relevant"
+
+
+def test_rule_based_batch_relevance():
+    """
+    測試批次時間相關性檢查（不呼叫 API）
+    預期：與逐筆的 is_temporally_relevant 結果相同，沒有日期的證據為 None
+    """
+    claim_info = normalize_time_expression("上個月", "2026-01-01")
+    evidence_dates = ["2025-11-15", "2025-11-30", "2025-12-01", "2025-12-20", "2025-12-31", "2026-01-01", "2026-03-01"]
+    infos = [{"parsed_date": d} for d in evidence_dates] + [None, {"parsed_date": None}]
+
+    results = check_temporal_relevance_batch(claim_info, infos)
+    assert results[-2:] == [None, None]
+    for info, result in zip(infos, results):
+        if info and info["parsed_date"]:
+            assert result == is_temporally_relevant(claim_info, info)
+    assert [r["status"] for r in results[:-2]] == \
+        ["too_old", "too_old", "relevant", "relevant", "relevant", "too_recent", "too_recent"]
+
+
+def test_rule_based_roc_year():
+    """
+    測試民國年的判斷（不呼叫 API）
+    預期：只有「民國」前綴或三位數年份視為民國年；沒有前綴的兩位數年份交給 LLM
+    """
+    reference = datetime(2026, 1, 1)
+    assert parse_time_expression("民國99年5月1日", reference)["parsed_date"] == "2010-05-01"
+    assert parse_time_expression("114/05/01", reference)["parsed_date"] == "2025-05-01"
+    assert parse_time_expression("民國113年", reference)["parsed_date"] == "2024-06-15"
+    for time_text in ["24.12.25", "05/01/25", "24年12月"]:
+        assert parse_time_expression(time_text, reference) is None
+
+
 if __name__ == "__main__":
     print("\n" + "=" * 80)
     print("開始測試時間相關性檢查功能")
@@ -0,0 +1,421 @@
+"""
+規則式時間表達式解析器（中文 / 英文）
+normalize_time_expression 的快速路徑：常見的時間描述以正規表示式在本地解析，
+無法完整比對的表達式才交給 LLM
+
+支援：
+- 絕對日期：2025-05-01、2025/5/1、2025年5月1日、May 1, 2025、1 May 2025、2025年5月、2025年
+- 民國年：民國114年5月1日、114年5月1日、114/05/01
+- 相對日期：今天、昨天、前天、3天前、上週、兩週前、上個月、3個月前、去年、前年、2年前
+  （英文：today、yesterday、3 days ago、last week、last month、last year ...）
+- 日期數字：昨(31日)、31日、5月1日、the 31st
+
+extract_dates 則在證據文本中搜尋發布日期與事件時間描述（extract_time_from_evidence 的快速路徑），
+find_time_expression 找出 claim 中的時間描述
+"""
+import calendar
+import re
+from datetime import datetime, timedelta
+
+# 時段描述不影響日期：今天凌晨 = 今天
+_TIME_OF_DAY_RE = re.compile(
+    r"(凌晨|清晨|早上|上午|中午|下午|傍晚|晚上|晚間|夜間|深夜|稍早|稍晚|"
+    r"\d{1,2}\s*[點点時时](?:\d{1,2}\s*分)?|\d{1,2}:\d{2}(?::\d{2})?\s*(?:am|pm)?|"
+    r"\b(?:in the |at )?(?:morning|afternoon|evening|noon)\b)"
+)
+_PUNCT_RE = re.compile(r"[\s,，。、]+")
+# 「今」「this」只在後面接時段時表示今天（今凌晨、this morning），移除時段前先換成完整的詞
+_TODAY_PREFIX_RE = re.compile(
+    r"今(?=凌晨|清晨|早上|上午|中午|下午|傍晚|晚上|晚間|夜間|深夜)|\bthis(?=\s+(?:morning|afternoon|evening)\b)"
+)
+
+_CN_DIGITS = {"零": 0, "〇": 0, "一": 1, "二": 2, "兩": 2, "两": 2, "三": 3, "四": 4,
+              "五": 5, "六": 6, "七": 7, "八": 8, "九": 9}
+_EN_NUMBERS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+               "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12}
+_MONTHS = {name: idx for idx, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+
+_NUM = r"(\d{1,3}|[零〇一二兩两三四五六七八九十]{1,3}|a|an|one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve)"
+_MONTH_NAME = r"(jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DAY_SUFFIX = r"(?:st|nd|rd|th)?"
+
+
+def _to_int(token):
+    """阿拉伯數字、中文數字（至 99）或英文數字轉為整數"""
+    if token.isdigit():
+        return int(token)
+    if token in _EN_NUMBERS:
+        return _EN_NUMBERS[token]
+    if "十" in token:
+        tens, _, ones = token.partition("十")
+        return (_CN_DIGITS.get(tens, 1) if tens else 1) * 10 + (_CN_DIGITS.get(ones, 0) if ones else 0)
+    value = 0
+    for ch in token:
+        value = value * 10 + _CN_DIGITS[ch]
+    return value
+
+
+def _shift_months(date, months, day=None):
+    """往前/往後移動月份，日期超出該月天數時取月底"""
+    index = date.year * 12 + (date.month - 1) + months
+    year, month = divmod(index, 12)
+    month += 1
+    day = day or date.day
+    return datetime(year, month, min(day, calendar.monthrange(year, month)[1]))
+
+
+def _make_date(year, month, day):
+    """建立日期；數值不合法時返回 None"""
+    try:
+        return datetime(year, month, day)
+    except ValueError:
+        return None
+
+
+def _recent_day_of_month(day, ref):
+    """不晚於參考日期、且日期數字為 day 的最近一天（例如參考日 1/1 的「31日」是 12/31）"""
+    candidate = ref
+    for back in range(0, 13):
+        candidate = _shift_months(ref.replace(day=1), -back)
+        if day <= calendar.monthrange(candidate.year, candidate.month)[1]:
+            candidate = candidate.replace(day=day)
+            if candidate <= ref:
+                return candidate
+    return None
+
+
+def _recent_month_day(month, day, ref):
+    """不晚於參考日期的最近一個 month/day（沒寫年份的「5月1日」）"""
+    for year in (ref.year, ref.year - 1):
+        candidate = _make_date(year, month, day)
+        if candidate and candidate <= ref:
+            return candidate
+    return None
+
+
+def _absolute_type(date, ref):
+    """絕對日期的 time_type：參考日前後一天內視為 specific_recent，其餘為 absolute"""
+    return "specific_recent" if abs((ref - date).days) <= 1 else "absolute"
+
+
+def _year(token, roc=False):
+    """
+    四位數為西元年；有「民國」前綴或三位數為民國年
+    沒有「民國」前綴的兩位數年份（24.12.25、05/01/25）無法判斷格式，返回 None
+    """
+    if roc or len(token) == 3:
+        return int(token) + 1911 if len(token) <= 3 else None
+    return int(token) if len(token) == 4 else None
+
+
+# 規則表：(pattern, handler)；handler(match, ref) -> (date, time_type, confidence, explanation) 或 None
+# time_type 為 absolute 時另外返回 granularity（"day" / "month" / "year"）
+_RULES = []
+
+
+def _rule(pattern):
+    def register(handler):
+        _RULES.append((re.compile(pattern), handler))
+        return handler
+    return register
+
+
+@_rule(r"(?:今天|今日|本日|今晨|今早|今晚|today|tonight)")
+def _today(m, ref):
+    return ref, "specific_recent", "high", "Today relative to reference date"
+
+
+@_rule(r"(?:昨天|昨日|昨晚|昨夜|昨|yesterday|last night)")
+def _yesterday(m, ref):
+    return ref - timedelta(days=1), "specific_recent", "high", "One day before reference date"
+
+
+@_rule(r"(?:前天|前日|the day before yesterday|day before yesterday)")
+def _day_before_yesterday(m, ref):
+    return ref - timedelta(days=2), "specific_recent", "high", "Two days before reference date"
+
+
+@_rule(r"(?:(?:今天?|昨天?|前天?|本月)?[(（]?(\d{1,2})\s*[日號号][)）]?|(?:on )?the (\d{1,2})" + _DAY_SUFFIX + r")")
+def _day_of_month(m, ref):
+    day = int(m.group(1) or m.group(2))
+    if not 1 <= day <= 31:
+        return None
+    date = _recent_day_of_month(day, ref)
+    if date is None:
+        return None
+    return date, "specific_recent", "high", f"Day {day} resolved to the most recent matching date"
+
+
+@_rule(_NUM + r"\s*(?:天前|日前|days? ago)")
+def _days_ago(m, ref):
+    days = _to_int(m.group(1))
+    return ref - timedelta(days=days), "specific_recent", "high", f"{days} day(s) before reference date"
+
+
+@_rule(_NUM + r"\s*(?:小時前|小时前|分鐘前|分钟前|hours? ago|hrs? ago|minutes? ago|mins? ago)")
+def _hours_ago(m, ref):
+    return ref, "specific_recent", "high", "Within the reference day"
+
+
+@_rule(r"(?:本週|本周|這週|这周|這星期|本星期|this week)")
+def _this_week(m, ref):
+    return ref, "relative_recent", "high", "This week relative to reference date"
+
+
+@_rule(r"(?:上週|上周|上星期|上禮拜|last week)")
+def _last_week(m, ref):
+    return ref - timedelta(days=7), "relative_recent", "medium", "Previous week relative to reference date"
+
+
+@_rule(_NUM + r"\s*(?:週前|周前|星期前|個?禮拜前|weeks? ago)")
+def _weeks_ago(m, ref):
+    weeks = _to_int(m.group(1))
+    return ref - timedelta(weeks=weeks), "relative_recent", "medium", f"{weeks} week(s) before reference date"
+
+
+@_rule(r"(?:上個月|上个月|上月|last month)")
+def _last_month(m, ref):
+    return _shift_months(ref, -1, day=15), "relative_past", "medium", "Previous month relative to reference date"
+
+
+@_rule(_NUM + r"\s*(?:個月前|个月前|月前|months? ago)")
+def _months_ago(m, ref):
+    months = _to_int(m.group(1))
+    return _shift_months(ref, -months), "relative_past", "medium", f"{months} month(s) before reference date"
+
+
+@_rule(r"(?:去年|last year)")
+def _last_year(m, ref):
+    return datetime(ref.year - 1, 6, 15), "relative_past", "medium", "Previous year relative to reference date"
+
+
+@_rule(r"(?:前年|the year before last)")
+def _year_before_last(m, ref):
+    return datetime(ref.year - 2, 6, 15), "relative_past", "medium", "Two years before reference date"
+
+
+@_rule(_NUM + r"\s*(?:年前|years? ago)")
+def _years_ago(m, ref):
+    years = _to_int(m.group(1))
+    return _shift_months(ref, -12 * years), "relative_past", "medium", f"{years} year(s) before reference date"
+
+
+@_rule(r"(民國)?(\d{2,4})\s*[-/.年]\s*(\d{1,2})\s*[-/.月]\s*(\d{1,2})\s*[日號号]?")
+def _ymd(m, ref):
+    year = _year(m.group(2), roc=bool(m.group(1)))
+    date = year and _make_date(year, int(m.group(3)), int(m.group(4)))
+    if not date:
+        return None
+    return date, _absolute_type(date, ref), "high", "Specific date provided", "day"
+
+
+@_rule(r"(民國)?(\d{2,4})\s*年\s*(\d{1,2})\s*月(?:份)?")
+def _year_month(m, ref):
+    year = _year(m.group(2), roc=bool(m.group(1)))
+    date = year and _make_date(year, int(m.group(3)), 15)
+    if not date:
+        return None
+    return date, "absolute", "medium", "Month provided without day", "month"
+
+
+@_rule(r"(?:民國\s*(\d{2,3})|(\d{4}))\s*年")
+def _year_only(m, ref):
+    year = _year(m.group(1), roc=True) if m.group(1) else _year(m.group(2))
+    return datetime(year, 6, 15), "absolute", "medium", "Year provided without month", "year"
+
+
+@_rule(r"(\d{1,2})\s*月\s*(\d{1,2})\s*[日號号]")
+def _month_day(m, ref):
+    date = _recent_month_day(int(m.group(1)), int(m.group(2)), ref)
+    if date is None:
+        return None
+    return date, _absolute_type(date, ref), "high", "Month and day resolved to the most recent matching date", "day"
+
+
+@_rule(_MONTH_NAME + r"\s*(\d{1,2})" + _DAY_SUFFIX + r"(?:\s*(\d{4}))?")
+def _en_month_day(m, ref):
+    month, day = _MONTHS[m.group(1)[:3]], int(m.group(2))
+    date = _make_date(int(m.group(3)), month, day) if m.group(3) else _recent_month_day(month, day, ref)
+    if date is None:
+        return None
+    return date, _absolute_type(date, ref), "high", "Specific date provided", "day"
+
+
+@_rule(r"(\d{1,2})" + _DAY_SUFFIX + r"\s*(?:of\s*)?" + _MONTH_NAME + r"(?:\s*(\d{4}))?")
+def _en_day_month(m, ref):
+    month, day = _MONTHS[m.group(2)[:3]], int(m.group(1))
+    date = _make_date(int(m.group(3)), month, day) if m.group(3) else _recent_month_day(month, day, ref)
+    if date is None:
+        return None
+    return date, _absolute_type(date, ref), "high", "Specific date provided", "day"
+
+
+@_rule(_MONTH_NAME + r"\s*(\d{4})")
+def _en_month_year(m, ref):
+    return datetime(int(m.group(2)), _MONTHS[m.group(1)[:3]], 15), "absolute", "medium", "Month provided without day", "month"
+
+
+def _clean(time_text):
+    """小寫、移除時段描述與標點"""
+    text = time_text.strip().lower()
+    text = _TODAY_PREFIX_RE.sub(lambda m: "今天" if m.group() == "今" else "today", text)
+    text = _TIME_OF_DAY_RE.sub(" ", text)
+    text = _PUNCT_RE.sub(" ", text).strip()
+    # 中文之間的空白沒有意義
+    text = re.sub(r"(?<=[^\x00-\x7f])\s+|\s+(?=[^\x00-\x7f])", "", text)
+    return text
+
+
+def parse_time_expression(time_text, reference_date):
+    """
+    以規則表解析時間表達式；整個表達式都能被某條規則完整比對才算成功
+
+    Args:
+        time_text: 時間表達式
+        reference_date: 參考日期（datetime）
+
+    Returns:
+        與 normalize_time_expression 相同格式的 dict；無法以規則解析則返回 None
+    """
+    if not time_text or not isinstance(time_text, str):
+        return None
+
+    text = _clean(time_text)
+    if not text:
+        return None
+
+    ref = datetime(reference_date.year, reference_date.month, reference_date.day)
+    for pattern, handler in _RULES:
+        m = pattern.fullmatch(text)
+        if not m:
+            continue
+        parsed = handler(m, ref)
+        if parsed is None:
+            return None
+        date, time_type, confidence, explanation = parsed[:4]
+        result = {
+            "parsed_date": date.strftime("%Y-%m-%d"),
+            "confidence": confidence,
+            "time_type": time_type,
+            "original_expression": time_text,
+            "explanation": f"Rule-based: {explanation}",
+        }
+        if time_type == "absolute":
+            result["granularity"] = parsed[4]
+        return result
+    return None
+
+
+# 文本掃描用：絕對日期（視為發布日期）
+_ABSOLUTE_SCAN_RE = re.compile(
+    r"(?<!\d)(?:(?:民國\s*)?\d{3,4}\s*年\s*\d{1,2}\s*月\s*\d{1,2}\s*[日號号]"
+    r"|\d{4}[-/.]\d{1,2}[-/.]\d{1,2}"
+    r"|" + _MONTH_NAME + r"\s*\d{1,2}" + _DAY_SUFFIX + r",?\s*\d{4}"
+    r"|\d{1,2}" + _DAY_SUFFIX + r"\s+" + _MONTH_NAME + r",?\s*\d{4})(?!\d)",
+    re.IGNORECASE,
+)
+# 文本掃描用：相對時間描述（中文沒有詞界，排除「目前天」「之前年」這類誤判）
+_RELATIVE_SCAN_RE = re.compile(
+    r"(?:今天|今日|昨天|昨日|昨晚|昨[(（]\d{1,2}[日號号][)）]|(?<![目之提事以面眼當当生日向])前天|"
+    r"去年|(?<![目之提事以面眼當当生日向])前年|上個月|上个月|上週|上周|上星期|本週|本周|"
+    r"(?:\d{1,3}|[一二兩两三四五六七八九十]{1,3})\s*(?:小時前|小时前|分鐘前|分钟前|天前|週前|周前|個月前|个月前|年前)|"
+    r"\b(?:today|yesterday|last (?:night|week|month|year)|"
+    r"(?:\d{1,3}|an?|one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve)\s+"
+    r"(?:minutes?|mins?|hours?|hrs?|days?|weeks?|months?|years?) ago)\b)",
+    re.IGNORECASE,
+)
+# 出現在文本開頭的相對時間（例如搜尋結果的 "3 days ago · ..."）是發布時間戳記
+_STAMP_CHARS = 3
+
+
+def find_time_expression(text):
+    """
+    找出文本中第一個時間描述（絕對日期或相對時間，依出現位置）
+
+    Args:
+        text: 任意文本（例如 claim）
+
+    Returns:
+        時間描述原文；找不到則返回 None
+    """
+    if not text:
+        return None
+    matches = [m for m in (_ABSOLUTE_SCAN_RE.search(text), _RELATIVE_SCAN_RE.search(text)) if m]
+    if not matches:
+        return None
+    return min(matches, key=lambda m: m.start()).group(0)
+
+
+def parse_date_field(value):
+    """
+    解析搜尋後端回傳的日期欄位（ISO 8601 時間戳記或一般日期字串）
+
+    Args:
+        value: 日期欄位的值
+
+    Returns:
+        "YYYY-MM-DD"；無法解析則返回 None
+    """
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.strip().replace("Z", "+00:00")).strftime("%Y-%m-%d")
+    except ValueError:
+        parsed = parse_time_expression(value, datetime.now())
+        return parsed["parsed_date"] if parsed else None
+
+
+def extract_dates(text, reference_date):
+    """
+    在證據文本中搜尋發布日期與事件時間描述（不呼叫 LLM）
+
+    - 第一個絕對日期視為發布日期
+    - 文本開頭的相對時間（"3 days ago"、"2小時前"）是發布時間戳記，以參考日期換算
+    - 其餘第一個相對時間描述視為事件時間
+
+    Args:
+        text: 證據文本
+        reference_date: 參考日期（datetime，通常是今天）
+
+    Returns:
+        {"publish_date": "YYYY-MM-DD" or None, "time_expression": str or None}
+    """
+    publish_date = None
+    time_expression = None
+    if not text:
+        return {"publish_date": None, "time_expression": None}
+
+    for m in _ABSOLUTE_SCAN_RE.finditer(text):
+        parsed = parse_time_expression(m.group(0), reference_date)
+        if parsed:
+            publish_date = parsed["parsed_date"]
+            break
+
+    for m in _RELATIVE_SCAN_RE.finditer(text):
+        is_stamp = m.start() < _STAMP_CHARS and m.group(0).lower().endswith(("ago", "前"))
+        if is_stamp and publish_date is None:
+            parsed = parse_time_expression(m.group(0), reference_date)
+            if parsed:
+                publish_date = parsed["parsed_date"]
+                continue
+        time_expression = m.group(0)
+        break
+
+    return {"publish_date": publish_date, "time_expression": time_expression}
+
+
+if __name__ == "__main__":
+    ref = datetime(2026, 1, 1)
+    for expr in ["今天", "今天凌晨", "昨天", "yesterday", "昨(31日)", "31日", "前天", "3天前", "三天前",
+                 "3 days ago", "上週", "two weeks ago", "上個月", "last month", "3個月前", "去年", "前年",
+                 "2年前", "2025-05-01", "2025/5/1", "2025年5月1日", "民國114年5月1日", "114/05/01",
+                 "2025年5月", "2024年", "12月25日", "Dec 25, 2024", "25 December 2024", "May 2025",
+                 "24.12.25", "05/01/25", "最近", "近年來"]:
+        print(f"{expr:18} -> {parse_time_expression(expr, ref)}")
+
+    for text in ["3 days ago · Taiwan's economy grew 5.8 percent last year.",
+                 "2024年12月25日報導，去年台灣GDP成長5.8%。",
+                 "Dec 25, 2024 — The quake struck yesterday morning.",
+                 "目前天氣晴朗，氣象署表示無異常。"]:
+        print(f"{text[:30]:32} -> {extract_dates(text, ref)}")
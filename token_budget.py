@@ -0,0 +1,207 @@
+"""
+Token Budget
+估算 prompt 大小、去除重複證據片段、依句子邊界截斷到各呼叫位置的 token 預算
+"""
+import re
+import threading
+
+# 各呼叫位置的 token 預算（僅計算證據/搜尋結果的 context，不含固定的指令文字）
+TOKEN_BUDGETS = {
+    "verdict": 1200,        # verify_claim 最終判斷的證據摘要
+    "qa_context": 1500,     # QAAgent._build_context 的搜尋結果
+    "evidence_time": 200,   # extract_time_from_evidence 的證據文本
+}
+
+# 中日韓文字與全形標點：約 1 字 1 token；其他文字約 4 字元 1 token
+_CJK_RE = re.compile(r"[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]")
+# 句子：到句末標點（中英文）、換行或文字結尾為止，保留後面的空白
+_SENTENCE_RE = re.compile(r".+?(?:[。！？!?；;]+|\.(?=\s)|\n|$)\s*", re.S)
+_SHINGLE_SIZE = 4
+
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def estimate_tokens(text):
+    """
+    粗估文字的 token 數（不需 tokenizer）
+
+    Args:
+        text: 任意文字
+
+    Returns:
+        估計的 token 數
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    other = len(text) - cjk
+    return cjk + (other + 3) // 4
+
+
+def _cut_to_tokens(text, max_tokens):
+    """逐字元截斷到 max_tokens（單一句子就超過預算時使用）"""
+    used = 0.0
+    for i, ch in enumerate(text):
+        used += 1 if _CJK_RE.match(ch) else 0.25
+        if used > max_tokens:
+            return text[:i]
+    return text
+
+
+def split_sentences(text):
+    """
+    依句末標點與換行切句
+
+    Args:
+        text: 任意文字
+
+    Returns:
+        句子列表（保留結尾標點與空白，依序串接即為原文）
+    """
+    return _SENTENCE_RE.findall(text) if text else []
+
+
+def truncate_to_budget(text, max_tokens, ellipsis="..."):
+    """
+    在句子邊界截斷文字，使其不超過 max_tokens
+
+    Args:
+        text: 原始文字
+        max_tokens: token 上限
+        ellipsis: 有截斷時附加的結尾
+
+    Returns:
+        截斷後的文字（未超過預算則原樣返回）
+    """
+    if not text or estimate_tokens(text) <= max_tokens:
+        return text
+
+    kept = ""
+    for sentence in split_sentences(text):
+        if estimate_tokens(kept + sentence) > max_tokens:
+            break
+        kept += sentence
+
+    # 第一句就超過預算：退而逐字元截斷
+    if not kept:
+        kept = _cut_to_tokens(text, max_tokens)
+
+    return kept.rstrip() + ellipsis
+
+
+def fit_to_budget(text, call_site):
+    """
+    依呼叫位置的預算截斷文字，並記錄節省的 token 數
+
+    Args:
+        text: 原始文字
+        call_site: TOKEN_BUDGETS 中的呼叫位置
+
+    Returns:
+        截斷後的文字
+    """
+    fitted = truncate_to_budget(text, TOKEN_BUDGETS[call_site])
+    before, after = estimate_tokens(text), estimate_tokens(fitted)
+    record_savings(call_site, {
+        "tokens_before": before,
+        "tokens_after": after,
+        "tokens_saved": max(before - after, 0),
+        "duplicates_removed": 0,
+    })
+    return fitted
+
+
+def _shingles(text):
+    normalized = re.sub(r"\s+", " ", text.lower()).strip()
+    if len(normalized) <= _SHINGLE_SIZE:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + _SHINGLE_SIZE] for i in range(len(normalized) - _SHINGLE_SIZE + 1)}
+
+
+def dedupe_texts(texts, threshold=0.8):
+    """
+    去除內容高度重疊的片段（例如同一則新聞被多個網站轉載）
+    以字元 shingle 的包含率判斷：較短片段有 threshold 以上內容出現在已保留片段中即視為重複
+
+    Args:
+        texts: 文字列表（依優先順序排列）
+        threshold: 包含率門檻（0~1）
+
+    Returns:
+        保留項目的索引列表（維持原順序）
+    """
+    kept = []
+    kept_shingles = []
+    for idx, text in enumerate(texts):
+        sh = _shingles(text or "")
+        duplicate = False
+        for other in kept_shingles:
+            smaller = min(len(sh), len(other))
+            if smaller and len(sh & other) / smaller >= threshold:
+                duplicate = True
+                break
+        if not duplicate:
+            kept.append(idx)
+            kept_shingles.append(sh)
+    return kept
+
+
+def compact_evidence(items, budget, text_key="body", dedupe=True):
+    """
+    壓縮證據列表：去重後平均分配 token 預算，並在句子邊界截斷每則內容
+
+    Args:
+        items: 證據 dict 列表（依重要性排列）
+        budget: 全部內容的 token 預算
+        text_key: 內容欄位名稱
+        dedupe: 是否去除重複內容
+
+    Returns:
+        (compacted_items, report)
+        compacted_items: 新的 dict 列表（text_key 已截斷）
+        report: {"tokens_before", "tokens_after", "tokens_saved", "duplicates_removed"}
+    """
+    tokens_before = sum(estimate_tokens(it.get(text_key, "")) for it in items)
+
+    kept_idx = dedupe_texts([it.get(text_key, "") for it in items]) if dedupe else list(range(len(items)))
+    kept = [items[i] for i in kept_idx]
+
+    compacted = []
+    remaining = budget
+    for pos, item in enumerate(kept):
+        # 平均分配剩餘預算，前面項目沒用完的額度留給後面
+        share = max(remaining // (len(kept) - pos), 1)
+        text = truncate_to_budget(item.get(text_key, ""), share)
+        remaining -= estimate_tokens(text)
+        new_item = dict(item)
+        new_item[text_key] = text
+        compacted.append(new_item)
+
+    tokens_after = sum(estimate_tokens(it.get(text_key, "")) for it in compacted)
+    report = {
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": max(tokens_before - tokens_after, 0),
+        "duplicates_removed": len(items) - len(kept),
+    }
+    return compacted, report
+
+
+def record_savings(call_site, report):
+    """累計各呼叫位置節省的 token 數（供 /stats 顯示）"""
+    with _stats_lock:
+        site = _stats.setdefault(call_site, {"calls": 0, "tokens_before": 0, "tokens_saved": 0, "duplicates_removed": 0})
+        site["calls"] += 1
+        site["tokens_before"] += report.get("tokens_before", 0)
+        site["tokens_saved"] += report.get("tokens_saved", 0)
+        site["duplicates_removed"] += report.get("duplicates_removed", 0)
+
+
+def get_budget_stats():
+    """
+    Returns:
+        {call_site: {"calls", "tokens_before", "tokens_saved", "duplicates_removed"}}
+    """
+    with _stats_lock:
+        return {site: dict(values) for site, values in _stats.items()}